@@ -0,0 +1,79 @@
+"""
+Benchmark: first-deny AdaptiveGate vs full evaluation.
+
+Checks that the gate's allow/deny always matches run_policy, including while it
+reorders, then times both on a rule list where an expensive rule that rarely fails
+comes first and a cheap rule that often fails comes last: the order the gate has to
+learn its way out of.
+Run: python3 benchmarks/bench_adaptive.py
+"""
+
+import os
+import random
+import sys
+import time
+from typing import Any, Mapping
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from adaptive import AdaptiveGate  # noqa: E402
+from policy import (  # noqa: E402
+    DEFAULT_RULES, evaluate, rule_age, rule_region, rule_verified, run_policy, validate,
+)
+from results import PASSED, failed, reason_code  # noqa: E402
+
+N = 300_000
+
+_SLOW_FAILED = failed(reason_code("Score too low"))
+
+
+def rule_slow_score(record: dict[str, Any]) -> Mapping[str, Any]:
+    """Expensive stand-in (e.g. a scoring call) that almost always passes."""
+    score = sum(ord(c) for c in str(record.get("id")) * 20)
+    return _SLOW_FAILED if score % 997 == 0 else PASSED
+
+
+def random_record(rng: random.Random, i: int) -> dict[str, Any]:
+    return {"id": i, "age": rng.choice([rng.randint(0, 90), 17.5, "x", None]),
+            "verified": rng.choice([True, True, False, 1]),
+            "region": rng.choice(["US", "UK", "XX", "YY"])}
+
+
+def check_equivalence() -> None:
+    rng = random.Random(0)
+    rule_sets = [DEFAULT_RULES, [rule_slow_score, rule_age, rule_verified, rule_region]]
+    for rules in rule_sets:
+        gate = AdaptiveGate(rules, reorder_every=500, sample_every=3)
+        for i in range(50_000):
+            rec = random_record(rng, i)
+            assert gate(rec) == (run_policy(rec, rules) == "Allowed"), rec
+        print("equivalence: ok, order",
+              [getattr(r, "__name__", r) for r in gate.order()], "reorders", gate.reorders)
+
+
+def main() -> None:
+    check_equivalence()
+    rng = random.Random(1)
+    records = [random_record(rng, i) for i in range(N)]
+    rules = [rule_slow_score, rule_verified, rule_age, rule_region]
+
+    start = time.perf_counter()
+    for rec in records:
+        if validate(rec)["valid"]:
+            evaluate(rec, rules).allowed
+    full = N / (time.perf_counter() - start)
+    print(f"full evaluation: {full:>12,.0f} rec/s")
+
+    gate = AdaptiveGate(rules)
+    start = time.perf_counter()
+    for rec in records:
+        gate(rec)
+    rate = N / (time.perf_counter() - start)
+    print(f"first-deny gate: {rate:>12,.0f} rec/s  ({rate / full:.2f}x)")
+    for row in gate.stats():
+        print(f"  {row['rule']:<16} calls {row['calls']:>8}  fail {row['fail_rate']:.3f}  "
+              f"mean {row['mean_ns']:>8.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark: columnar evaluate_columns vs the per-record evaluate loop.
+
+First checks on randomized columns that both paths give identical decisions and
+reasons, and that validate_ages / decide_columns match validate + evaluate on dirty
+raw ages. Then times each at several sizes.
+Run: python3 benchmarks/bench_batch.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from batch import (  # noqa: E402
+    MISSING, VALID_CODE, age_column, decide_columns, evaluate_columns, reasons_for, row_record,
+    to_columns, validate_ages,
+)
+from policy import DEFAULT_RULES, Rule, evaluate, rule_age, rule_region, validate  # noqa: E402
+from results import reason_code  # noqa: E402
+
+SIZES = [1_000, 100_000, 1_000_000]
+REGIONS = np.array(["US", "UK", "CA", "XX", "YY", ""])
+
+
+def random_columns(rng: np.random.Generator, n: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    if rng.random() < 0.5:
+        age = rng.integers(0, 121, n)
+    else:
+        age = rng.uniform(0, 120, n)
+    verified = rng.random(n) < 0.7
+    region = REGIONS[rng.integers(0, len(REGIONS), n)]
+    return age, verified, region
+
+
+def check_equivalence(rounds: int = 200) -> None:
+    rng = np.random.default_rng(0)
+
+    def rule_user_even_age(record: dict) -> dict:
+        if int(record["age"]) % 2 == 0:
+            return {"passed": True, "reason": None}
+        return {"passed": False, "reason": "odd age"}
+
+    rule_sets: list[list[Rule]] = [
+        DEFAULT_RULES, [rule_region, rule_age], [], [rule_age, rule_user_even_age],
+    ]
+    for _ in range(rounds):
+        age, verified, region = random_columns(rng, int(rng.integers(0, 200)))
+        cols = to_columns(age, verified, region)
+        for rules in rule_sets:
+            result = evaluate_columns(age, verified, region, rules)
+            for i in range(len(age)):
+                expected = evaluate(row_record(cols, i), rules)
+                assert bool(result.allowed[i]) == expected["allowed"]
+                if rule_user_even_age not in rules:
+                    assert reasons_for(result.failures[i], rules) == expected["reasons"]
+    print("equivalence: ok")
+
+
+DIRTY_AGES = [MISSING, None, "25", 17, 18, 25.5, -1, 121, 120, 0, True, float("nan"), 10 ** 30,
+              [18], np.float64(30.0)]
+
+
+def random_dirty_ages(rng: np.random.Generator, n: int) -> list:
+    return [DIRTY_AGES[i] if i < len(DIRTY_AGES) else int(i) for i in
+            rng.integers(0, len(DIRTY_AGES) + 100, n)]
+
+
+def check_validation(rounds: int = 200) -> None:
+    rng = np.random.default_rng(2)
+    for _ in range(rounds):
+        n = int(rng.integers(0, 200))
+        ages = random_dirty_ages(rng, n)
+        verified = rng.random(n) < 0.7
+        region = REGIONS[rng.integers(0, len(REGIONS), n)]
+        records = [{} if a is MISSING else {"age": a} for a in ages]
+        valid, codes = validate_ages(age_column(records))
+        result = decide_columns(ages, verified, region, DEFAULT_RULES)
+        assert (valid == result.valid).all() and (codes == result.codes).all()
+        for i, rec in enumerate(records):
+            validation = validate(rec)
+            assert bool(valid[i]) == validation["valid"]
+            if validation["valid"]:
+                assert codes[i] == VALID_CODE
+                rec.update(verified=bool(verified[i]), region=str(region[i]))
+                expected = evaluate(rec, DEFAULT_RULES)
+                assert bool(result.allowed[i]) == expected["allowed"]
+                assert reasons_for(result.failures[i], DEFAULT_RULES) == expected["reasons"]
+            else:
+                assert codes[i] == reason_code(validation["reason"])
+                assert not result.allowed[i] and result.failures[i] == 0
+    print("validation equivalence: ok")
+
+
+def main() -> None:
+    check_equivalence()
+    check_validation()
+    rng = np.random.default_rng(1)
+    print(f"{'records':>10} {'batch rec/s':>14} {'per-record rec/s':>17}")
+    for n in SIZES:
+        age, verified, region = random_columns(rng, n)
+        start = time.perf_counter()
+        evaluate_columns(age, verified, region, DEFAULT_RULES)
+        batch_rate = n / (time.perf_counter() - start)
+
+        records = [
+            {"age": a, "verified": v, "region": r}
+            for a, v, r in zip(age.tolist(), verified.tolist(), region.tolist())
+        ]
+        start = time.perf_counter()
+        for rec in records:
+            evaluate(rec, DEFAULT_RULES)
+        loop_rate = n / (time.perf_counter() - start)
+        print(f"{n:>10} {batch_rate:>14,.0f} {loop_rate:>17,.0f}")
+
+    print(f"\ndirty ages (~12% invalid)\n{'records':>10} {'validate_ages':>14} "
+          f"{'decide_columns':>15} {'per-record validate':>20}")
+    for n in SIZES:
+        ages = random_dirty_ages(rng, n)
+        verified = rng.random(n) < 0.7
+        region = REGIONS[rng.integers(0, len(REGIONS), n)]
+        records = [{} if a is MISSING else {"age": a} for a in ages]
+        column = age_column(records)
+        start = time.perf_counter()
+        validate_ages(column)
+        column_rate = n / (time.perf_counter() - start)
+        start = time.perf_counter()
+        decide_columns(column, verified, region, DEFAULT_RULES)
+        decide_rate = n / (time.perf_counter() - start)
+        start = time.perf_counter()
+        for rec in records:
+            validate(rec)
+        loop_rate = n / (time.perf_counter() - start)
+        print(f"{n:>10} {column_rate:>14,.0f} {decide_rate:>15,.0f} {loop_rate:>20,.0f}")
+
+
+if __name__ == "__main__":
+    main()
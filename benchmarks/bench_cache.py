@@ -0,0 +1,66 @@
+"""
+Benchmark: DecisionCache in front of run_policy under repeated traffic.
+
+Checks that cached results always equal run_policy (including values like 1 vs
+True that compare equal but decide differently), then replays a skewed stream of
+user lookups at several cache sizes and prints throughput and counters.
+Run: python3 benchmarks/bench_cache.py
+"""
+
+import os
+import random
+import sys
+import time
+from typing import Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from cache import DecisionCache  # noqa: E402
+from policy import DEFAULT_RULES, rule_age, run_policy  # noqa: E402
+
+USERS = 50_000
+LOOKUPS = 500_000
+
+
+def random_record(rng: random.Random, i: int) -> dict[str, Any]:
+    return {"id": i, "age": rng.choice([rng.randint(0, 90), 17.5, 18.0]),
+            "verified": rng.choice([True, False, 1, 0]),
+            "region": rng.choice(["US", "UK", "XX"])}
+
+
+def check_equivalence() -> None:
+    rng = random.Random(0)
+    cache = DecisionCache(max_size=50)
+    for i in range(20_000):
+        rec = random_record(rng, i)
+        rules = DEFAULT_RULES if rng.random() < 0.9 else [rule_age]
+        assert cache(rec, rules) == run_policy(rec, rules), rec
+    print("equivalence: ok", cache.stats())
+
+
+def main() -> None:
+    check_equivalence()
+    rng = random.Random(1)
+    users = [random_record(rng, i) for i in range(USERS)]
+    # Skewed traffic: a small set of users gets most of the lookups.
+    stream = [users[min(int(rng.paretovariate(1.2)) - 1, USERS - 1)] for _ in range(LOOKUPS)]
+
+    start = time.perf_counter()
+    for rec in stream:
+        run_policy(rec, DEFAULT_RULES)
+    base = LOOKUPS / (time.perf_counter() - start)
+    print(f"no cache: {base:>12,.0f} lookups/s")
+
+    for size in [10, 100, 1_000, 10_000]:
+        cache = DecisionCache(max_size=size)
+        start = time.perf_counter()
+        for rec in stream:
+            cache(rec, DEFAULT_RULES)
+        rate = LOOKUPS / (time.perf_counter() - start)
+        stats = cache.stats()
+        print(f"size {size:>6}: {rate:>12,.0f} lookups/s  hit_rate={stats['hit_rate']:.3f}"
+              f"  evictions={stats['evictions']}")
+
+
+if __name__ == "__main__":
+    main()
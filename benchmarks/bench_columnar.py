@@ -0,0 +1,83 @@
+"""
+Benchmark: bytes per user and access times, UserStore (a dict per user) vs
+ColumnarUserStore.
+
+Each store is filled with the same generated users in add_many chunks while
+tracemalloc counts what stays allocated (for UserStore that includes the record
+dicts themselves, which it keeps; ColumnarUserStore lets them go). A second,
+untraced fill is timed, then random gets and a full iteration; both stores must
+return equal records.
+Run: python3 benchmarks/bench_columnar.py [--users 1000000]
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from columnar_store import ColumnarUserStore  # noqa: E402
+from datagen import generate_chunks  # noqa: E402
+from store import UserStore  # noqa: E402
+
+
+def fill(make: Callable[[], Any], n: int) -> Any:
+    users = make()
+    for chunk in generate_chunks(n, 100_000, seed=0):
+        users.add_many(chunk)
+    return users
+
+
+def retained_bytes(make: Callable[[], Any], n: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    users = fill(make, n)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(users) == n
+    return size / n
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--gets", type=int, default=200_000)
+    args = parser.parse_args()
+    n = args.users
+    ids = ["u" + str(i) for i in random.Random(1).choices(range(n), k=args.gets)]
+    stores = (("UserStore", lambda: UserStore()),
+              ("ColumnarUserStore", lambda: ColumnarUserStore()))
+    filled = {}
+    for name, make in stores:
+        per_user = retained_bytes(make, n)
+        start = time.perf_counter()
+        users = filled[name] = fill(make, n)
+        load = time.perf_counter() - start
+        start = time.perf_counter()
+        for user_id in ids:
+            users.get(user_id)
+        get = time.perf_counter() - start
+        start = time.perf_counter()
+        count = sum(1 for _ in users)
+        scan = time.perf_counter() - start
+        assert count == n
+        print(f"{name:<18} {per_user:7.1f} bytes/user  load {n / load:>10,.0f}/s  "
+              f"get {len(ids) / get:>10,.0f}/s  iterate {n / scan:>10,.0f}/s")
+        if len(filled) == 1:
+            continue
+        plain, columnar = filled.values()
+        assert all(plain.get(user_id) == columnar.get(user_id) for user_id in ids)
+        assert all(a == b for a, b in zip(plain, columnar))
+        print("same records from both stores")
+        del filled["UserStore"]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: equivalence-class dedup (dedup.py) vs write_decisions.
+
+1. Generated users: ids are unique but age/verified/region take few values, so
+   most records share a projection.
+2. The same users with fractional ages: nearly every projection is distinct, so
+   the memo fills up once, is cleared, and the run falls back to plain evaluation.
+Each case runs with the built-in rules (which compile_rules inlines, so a key
+costs about as much as an evaluation) and with a slower declared rule added.
+Both paths write to the same kind of BulkWriter and must produce identical output;
+tracemalloc reports the peak memory of a second dedup pass (output discarded).
+Run: python3 benchmarks/bench_dedup.py [--records 1000000] [--max-classes 100000]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datagen import generate_records  # noqa: E402
+from dedup import DedupStats, write_decisions_deduped  # noqa: E402
+from output import BulkWriter  # noqa: E402
+from policy import DEFAULT_RULES, declare_fields  # noqa: E402
+from stream import write_decisions  # noqa: E402
+
+
+def rule_region_age_limit(record: dict) -> dict:
+    # Stand-in for a rule that does real work per call (a lookup, a parse).
+    limits = {region: 18 + len(region) * 2 for region in ("US", "CA", "UK", "DE", "IN", "BR")}
+    age = record.get("age", 0)
+    return {"passed": age >= limits.get(record.get("region", ""), 21),
+            "reason": "below regional age limit"}
+
+
+declare_fields(rule_region_age_limit, ("age", "region"))
+SLOW_RULES = [*DEFAULT_RULES, rule_region_age_limit]
+
+
+def run(fn, *args) -> tuple[str, float]:
+    out = io.StringIO()
+    writer = BulkWriter(out)
+    start = time.perf_counter()
+    fn(*args, writer)
+    writer.flush()
+    return out.getvalue(), time.perf_counter() - start
+
+
+def bench(name: str, records: list, rule_list: list, max_classes: int) -> None:
+    expected, plain = run(write_decisions, records, rule_list)
+    stats = DedupStats()
+
+    def deduped_run(rows: list, rules: list, writer: BulkWriter) -> int:
+        return write_decisions_deduped(rows, rules, writer, stats, max_classes)
+
+    got, deduped = run(deduped_run, records, rule_list)
+    assert got == expected
+    # Memory in a second, traced pass to /dev/null (tracemalloc slows
+    # allocation-heavy code a lot, and the output would dominate the peak).
+    with open(os.devnull, "w", encoding="utf-8") as null:
+        tracemalloc.start()
+        write_decisions_deduped(records, rule_list, BulkWriter(null), DedupStats(), max_classes)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    n = len(records)
+    print(f"{name}: {stats.evaluated:,} evaluations for {n:,} records "
+          f"(ratio {stats.ratio:.1f}x, {stats.resets} memo resets, "
+          f"{'bypassed' if stats.bypassed else 'not bypassed'})")
+    print(f"  write_decisions {n / plain:>12,.0f}/s")
+    print(f"  dedup           {n / deduped:>12,.0f}/s ({plain / deduped:.2f}x), "
+          f"peak {peak / 2**20:.1f} MiB, same output")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--max-classes", type=int, default=100_000)
+    args = parser.parse_args()
+    records = list(generate_records(args.records, seed=0))
+    spread = [{**r, "age": r["age"] + i % 1000 / 1000}
+              if type(r.get("age")) is int and 0 <= r["age"] < 120 else r
+              for i, r in enumerate(records)]
+    for label, rule_list in (("built-in rules", DEFAULT_RULES), ("+ slow rule", SLOW_RULES)):
+        bench(f"low cardinality, {label}", records, rule_list, args.max_classes)
+        bench(f"high cardinality, {label}", spread, rule_list, args.max_classes)
+
+
+if __name__ == "__main__":
+    main()
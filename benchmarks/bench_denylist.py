@@ -0,0 +1,106 @@
+"""
+Benchmark: building, opening and querying a deny-list at 10M entries.
+
+Writes a key file ("dev-<n>" per line), builds deny-list files with and without a
+Bloom prefilter, then reports build time, open time (in this process and in a
+fresh one), file size, and lookup rates for members and non-members. A Python set
+of the same keys is built for comparison at --set-entries (its memory is the point).
+Run: python3 benchmarks/bench_denylist.py [--entries 10000000]
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+
+from denylist import DenyList, build_denylist_file, membership_rule  # noqa: E402
+from policy import run_policy  # noqa: E402
+
+LOOKUPS = 200_000
+
+
+def write_keys(path: str, n: int) -> None:
+    with open(path, "w", encoding="utf-8") as handle:
+        for start in range(0, n, 100_000):
+            handle.write("".join(f"dev-{i}\n" for i in range(start, min(n, start + 100_000))))
+
+
+def time_lookups(denylist: DenyList, keys: list[str]) -> float:
+    start = time.perf_counter()
+    for key in keys:
+        key in denylist  # noqa: B015
+    return len(keys) / (time.perf_counter() - start)
+
+
+def open_in_fresh_process(path: str) -> float:
+    code = (f"import sys,time; sys.path.insert(0, {SRC!r}); t=time.perf_counter(); "
+            f"from denylist import DenyList; d=DenyList({path!r}); 'dev-1' in d; "
+            "print(time.perf_counter()-t)")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return float(out.stdout)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=10_000_000)
+    parser.add_argument("--set-entries", type=int, default=1_000_000)
+    args = parser.parse_args()
+    n = args.entries
+    rng = random.Random(0)
+    hits = [f"dev-{rng.randrange(n)}" for _ in range(LOOKUPS)]
+    misses = [f"other-{rng.randrange(n)}" for _ in range(LOOKUPS)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        key_path = os.path.join(tmp, "keys.txt")
+        start = time.perf_counter()
+        write_keys(key_path, n)
+        print(f"{n:,} keys written in {time.perf_counter() - start:.1f}s "
+              f"({os.path.getsize(key_path) / 1e6:.0f} MB text)")
+
+        for bits in (0, 10):
+            path = os.path.join(tmp, f"deny-{bits}.bin")
+            start = time.perf_counter()
+            build_denylist_file(key_path, path, bloom_bits_per_key=bits)
+            build = time.perf_counter() - start
+            start = time.perf_counter()
+            denylist = DenyList(path)
+            opened = time.perf_counter() - start
+            size = os.path.getsize(path)
+            label = f"bloom {bits} bits/key" if bits else "no bloom"
+            print(f"\n{label}: build {build:.1f}s, open {opened * 1e3:.3f} ms "
+                  f"(fresh process incl. import {open_in_fresh_process(path) * 1e3:.1f} ms), "
+                  f"{size / 1e6:.0f} MB = {size / n:.1f} bytes/entry")
+            print(f"  member lookups:     {time_lookups(denylist, hits):>10,.0f}/s")
+            denylist.bloom_rejects = 0
+            print(f"  non-member lookups: {time_lookups(denylist, misses):>10,.0f}/s  "
+                  f"(bloom settled {denylist.bloom_rejects / LOOKUPS:.1%})")
+            assert all(key in denylist for key in hits[:1000])
+            rule = membership_rule("device", denylist, "Device denied")
+            assert run_policy({"age": 30, "verified": True, "device": hits[0]}, [rule]) \
+                == "Denied: Device denied"
+            denylist.close()
+
+    m = args.set_entries
+    tracemalloc.start()
+    start = time.perf_counter()
+    as_set = {f"dev-{i}" for i in range(m)}
+    build = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for key in misses:
+        key in as_set  # noqa: B015
+    rate = LOOKUPS / (time.perf_counter() - start)
+    print(f"\nPython set of {m:,}: build {build:.1f}s, {current / m:.0f} bytes/entry per process, "
+          f"{rate:,.0f} lookups/s")
+
+
+if __name__ == "__main__":
+    main()
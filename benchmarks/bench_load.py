@@ -0,0 +1,87 @@
+"""
+Benchmark: `load <path>` vs one `add` command per user.
+
+Writes the same users as an add-command script, a CSV file and a JSONL file, then
+times:
+  - the script piped through `engine.py cli` (what loading users took before),
+  - the same add lines through dispatch() in-process (no terminal I/O),
+  - `load` of the CSV and of the JSONL file,
+and checks every path ends with the same store contents.
+Run: python3 benchmarks/bench_load.py [--users 1000000]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cli import dispatch, handle_load  # noqa: E402
+from datagen import generate_records  # noqa: E402
+from policy import DEFAULT_RULES, run_policy  # noqa: E402
+from store import UserStore  # noqa: E402
+
+INDEX_FIELDS = ("region", "verified")
+
+
+def write_inputs(tmp: str, n: int) -> tuple[str, str, str]:
+    script, csv_path, jsonl_path = (os.path.join(tmp, name)
+                                    for name in ("adds.txt", "users.csv", "users.jsonl"))
+    with open(script, "w", encoding="utf-8") as adds, \
+            open(csv_path, "w", encoding="utf-8") as csv_out, \
+            open(jsonl_path, "w", encoding="utf-8") as jsonl_out:
+        csv_out.write("id,age,verified,region\n")
+        for rec in generate_records(n, seed=0, invalid_rate=0.0):
+            age = int(rec["age"])
+            adds.write(f"add {rec['id']} {age} {rec['verified']} {rec['region']}\n")
+            csv_out.write(f"{rec['id']},{age},{rec['verified']},{rec['region']}\n")
+            jsonl_out.write(json.dumps({"id": rec["id"], "age": age, "verified": rec["verified"],
+                                        "region": rec["region"]}) + "\n")
+        adds.write("quit\n")
+    return script, csv_path, jsonl_path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1_000_000)
+    args = parser.parse_args()
+    n = args.users
+    with tempfile.TemporaryDirectory() as tmp:
+        script, csv_path, jsonl_path = write_inputs(tmp, n)
+
+        with open(script, encoding="utf-8") as stdin:
+            start = time.perf_counter()
+            subprocess.run([sys.executable, os.path.join(SRC, "engine.py"), "cli"],
+                           stdin=stdin, stdout=subprocess.DEVNULL, check=True)
+            session = time.perf_counter() - start
+        print(f"add x{n:,} via engine.py cli:    {n / session:>10,.0f} users/s")
+
+        with open(script, encoding="utf-8") as handle:
+            lines = handle.read().splitlines()[:-1]
+        reference = UserStore(INDEX_FIELDS)
+        start = time.perf_counter()
+        for line in lines:
+            dispatch(line, reference, DEFAULT_RULES, run_policy)
+        in_process = time.perf_counter() - start
+        print(f"add x{n:,} via dispatch():       {n / in_process:>10,.0f} users/s")
+
+        for path in (csv_path, jsonl_path):
+            users = UserStore(INDEX_FIELDS)
+            start = time.perf_counter()
+            summary = handle_load([path], users)
+            elapsed = time.perf_counter() - start
+            assert summary.endswith(", 0 errors"), summary
+            assert list(users) == list(reference)
+            print(f"load {os.path.basename(path):<12}               {n / elapsed:>10,.0f} users/s "
+                  f"({session / elapsed:.1f}x the cli session, "
+                  f"{in_process / elapsed:.1f}x dispatch)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark: bytes per retained decision, plain dicts vs results.py types.
+
+Builds N decisions both ways from the same records, keeps them all in a list and
+measures the traced allocation with tracemalloc.
+Run: python3 benchmarks/bench_memory.py
+"""
+
+import os
+import random
+import sys
+import tracemalloc
+from typing import Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from policy import DEFAULT_RULES, compile_rules, evaluate  # noqa: E402
+
+N = 200_000
+
+
+def dict_evaluate(record: dict[str, Any]) -> dict[str, Any]:
+    """The original dict-building evaluate over the three built-in rules."""
+    reasons: list[Any] = []
+    for passed, reason in (
+        (record.get("age", 0) >= 18, "age below minimum"),
+        (record.get("verified", False) is True, "account not verified"),
+        (record.get("region", "") not in ["XX", "YY"], "region restricted"),
+    ):
+        result = {"passed": passed, "reason": None if passed else reason}
+        if not result["passed"]:
+            reasons.append(result["reason"])
+    return {"allowed": len(reasons) == 0, "reasons": reasons}
+
+
+def retained_bytes(build: Any, records: list[dict[str, Any]]) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(rec) for rec in records]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(kept) == len(records)
+    return (after - before) / len(records)
+
+
+def main() -> None:
+    rng = random.Random(0)
+    records = [
+        {"age": rng.randint(0, 90), "verified": rng.random() < 0.8,
+         "region": rng.choice(["US", "UK", "CA", "XX"])}
+        for _ in range(N)
+    ]
+    compiled = compile_rules(DEFAULT_RULES)
+    denied = sum(1 for rec in records if not compiled(rec).allowed)
+    print(f"{N} decisions, {denied / N:.0%} denied")
+    print(f"dict decisions:          {retained_bytes(dict_evaluate, records):7.1f} bytes/decision")
+    print(f"Decision via evaluate:   "
+          f"{retained_bytes(lambda r: evaluate(r, DEFAULT_RULES), records):7.1f} bytes/decision")
+    print(f"Decision via compiled:   {retained_bytes(compiled, records):7.1f} bytes/decision")
+
+
+if __name__ == "__main__":
+    main()
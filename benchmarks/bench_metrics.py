@@ -0,0 +1,55 @@
+"""
+Benchmark: run_policy cost with instrumentation off vs on.
+
+"off" is the default run_policy(record, rules) call; "on" passes a PolicyMetrics.
+Also checks both return the same strings.
+Run: python3 benchmarks/bench_metrics.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datagen import generate_records  # noqa: E402
+from metrics import PolicyMetrics  # noqa: E402
+from policy import DEFAULT_RULES, compile_rules, format_result, run_policy, validate  # noqa: E402
+
+N = 300_000
+
+
+def main() -> None:
+    records = list(generate_records(N, seed=0, invalid_rate=0.05))
+    metrics = PolicyMetrics()
+    for rec in records[:10_000]:
+        assert run_policy(rec, DEFAULT_RULES) == run_policy(rec, DEFAULT_RULES, metrics)
+    metrics.reset()
+
+    evaluate_fn = compile_rules(DEFAULT_RULES)
+
+    def bare(rec: dict) -> str:
+        """run_policy's body without the metrics check, for the overhead baseline."""
+        validation = validate(rec)
+        if not validation["valid"]:
+            return format_result(validation)
+        return format_result(evaluate_fn(rec))
+
+    timings = {}
+    for label, call in [
+        ("bare pipeline", bare),
+        ("metrics=None", lambda rec: run_policy(rec, DEFAULT_RULES)),
+        ("metrics on", lambda rec: run_policy(rec, DEFAULT_RULES, metrics)),
+    ]:
+        start = time.perf_counter()
+        for rec in records:
+            call(rec)
+        timings[label] = time.perf_counter() - start
+        print(f"{label:<14} {N / timings[label]:>12,.0f} rec/s")
+    overhead = timings["metrics=None"] / timings["bare pipeline"] - 1
+    print(f"disabled overhead: {overhead:+.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: buffered bulk output vs per-row strings.
+
+1. Decisions: decide_stream + write_jsonl (a dict and a json.dumps per record)
+   against write_decisions into a BulkWriter (memoized text/JSON per result), and
+   checks the two produce identical bytes. Also times the text and CSV formats.
+2. Listing: handle_list (one joined string) against write_users streaming to a
+   file, with the peak memory each needs on top of the store.
+Run: python3 benchmarks/bench_output.py [--records 1000000] [--users 1000000]
+"""
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cli import handle_list  # noqa: E402
+from datagen import generate_chunks, generate_records  # noqa: E402
+from output import BulkWriter, write_users  # noqa: E402
+from policy import DEFAULT_RULES  # noqa: E402
+from store import UserStore  # noqa: E402
+from stream import decide_stream, write_decisions, write_jsonl  # noqa: E402
+
+
+def bench_decisions(n: int) -> None:
+    records = list(generate_records(n, seed=0))
+    old, new = io.StringIO(), io.StringIO()
+    start = time.perf_counter()
+    write_jsonl(decide_stream(records, DEFAULT_RULES), old)
+    old_rate = n / (time.perf_counter() - start)
+    start = time.perf_counter()
+    with BulkWriter(new, "jsonl") as writer:
+        write_decisions(records, DEFAULT_RULES, writer)
+    new_rate = n / (time.perf_counter() - start)
+    assert old.getvalue() == new.getvalue()
+    print(f"decisions x{n:,}: write_jsonl(decide_stream) {old_rate:>10,.0f}/s, "
+          f"BulkWriter jsonl {new_rate:>10,.0f}/s ({new_rate / old_rate:.2f}x), identical output")
+    for fmt in ("text", "csv"):
+        start = time.perf_counter()
+        with BulkWriter(io.StringIO(), fmt) as writer:
+            write_decisions(records, DEFAULT_RULES, writer)
+        print(f"  BulkWriter {fmt:<5} {n / (time.perf_counter() - start):>10,.0f}/s")
+
+
+def bench_listing(n: int) -> None:
+    users = UserStore()
+    for chunk in generate_chunks(n, 100_000, seed=1, invalid_rate=0.0):
+        users.add_many(chunk)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "users.txt")
+        tracemalloc.start()
+        start = time.perf_counter()
+        with open(path, "w", encoding="utf-8") as handle:
+            write_users(users, handle)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        size = os.path.getsize(path)
+        print(f"listing x{n:,}: write_users {n / elapsed:>10,.0f}/s, "
+              f"peak {peak / 2**20:.1f} MiB for {size / 2**20:.0f} MiB of output")
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    text = handle_list(users)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del text
+    print(f"  handle_list (joined string) {n / elapsed:>10,.0f}/s, peak {peak / 2**20:.1f} MiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    args = parser.parse_args()
+    bench_decisions(args.records)
+    bench_listing(args.users)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: process-pool evaluation scaling across 1/2/4/8/N workers.
+
+Checks first that evaluate_parallel matches the serial evaluate_records on random
+records (including invalid ones and a user rule), then times each worker count.
+Run: python3 benchmarks/bench_parallel.py [records]
+"""
+
+import os
+import random
+import sys
+import time
+from typing import Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from parallel import evaluate_parallel, evaluate_records  # noqa: E402
+from policy import DEFAULT_RULES  # noqa: E402
+
+
+def rule_id_not_banned(record: dict[str, Any]) -> dict[str, Any]:
+    """User rule with its own reason text (interned separately in each worker)."""
+    if record.get("id") != "banned":
+        return {"passed": True, "reason": None}
+    return {"passed": False, "reason": "id banned"}
+
+
+def random_records(rng: random.Random, n: int) -> list[dict[str, Any]]:
+    records = []
+    for i in range(n):
+        rec: dict[str, Any] = {"id": "banned" if rng.random() < 0.01 else i}
+        if rng.random() < 0.97:
+            rec["age"] = rng.choice([rng.randint(-5, 130), "n/a"])
+        rec["verified"] = rng.random() < 0.8
+        rec["region"] = rng.choice(["US", "UK", "CA", "XX", "YY"])
+        records.append(rec)
+    return records
+
+
+def check_equivalence() -> None:
+    rng = random.Random(0)
+    records = random_records(rng, 5_000)
+    rules = DEFAULT_RULES + [rule_id_not_banned]
+    expected = evaluate_records(records, rules)
+    for workers, chunk_size in [(1, 7), (2, 100), (3, 999), (4, 10_000)]:
+        assert evaluate_parallel(records, rules, workers, chunk_size) == expected
+    print("equivalence: ok")
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    check_equivalence()
+    records = random_records(random.Random(1), n)
+    cpu = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, 8, cpu})
+    print(f"{n} records, {cpu} CPUs")
+    print(f"{'workers':>8} {'rec/s':>12} {'speedup':>8}")
+    base = 0.0
+    for workers in counts:
+        start = time.perf_counter()
+        evaluate_parallel(records, DEFAULT_RULES, workers, chunk_size=20_000)
+        rate = n / (time.perf_counter() - start)
+        if workers == 1:
+            base = rate
+        print(f"{workers:>8} {rate:>12,.0f} {rate / base:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
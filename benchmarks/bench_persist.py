@@ -0,0 +1,55 @@
+"""
+Benchmark: PersistentUserStore startup from a snapshot, and logged-add throughput.
+
+Startup (snapshot load + index build) is timed for growing stores; pass a larger
+size, e.g. 10000000, to check the 10M-user case (needs several GB of RAM).
+Run: python3 benchmarks/bench_persist.py [max_users]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from persist import SNAPSHOT_FILE, PersistentUserStore, write_snapshot  # noqa: E402
+
+
+def main() -> None:
+    max_users = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(0)
+    sizes = [n for n in (10_000, 100_000, 1_000_000, 10_000_000) if n <= max_users]
+    print(f"{'users':>10} {'snapshot MB':>12} {'startup s':>10}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            records = (
+                {"id": "u" + str(i), "age": rng.randint(0, 90),
+                 "verified": rng.random() < 0.8, "region": rng.choice(["US", "UK", "XX"])}
+                for i in range(n)
+            )
+            write_snapshot(os.path.join(tmp, SNAPSHOT_FILE), records)
+            size_mb = os.path.getsize(os.path.join(tmp, SNAPSHOT_FILE)) / 1e6
+            start = time.perf_counter()
+            store = PersistentUserStore(tmp)
+            elapsed = time.perf_counter() - start
+            assert len(store) == n
+            store.close()
+            print(f"{n:>10} {size_mb:>12.1f} {elapsed:>10.2f}")
+
+    adds = 20_000
+    print(f"\n{'fsync':>8} {'adds/s':>12}")
+    for policy in ("never", "batch", "always"):
+        count = adds if policy != "always" else adds // 20
+        with tempfile.TemporaryDirectory() as tmp:
+            store = PersistentUserStore(tmp, fsync=policy, snapshot_every=0)
+            start = time.perf_counter()
+            for i in range(count):
+                store.add({"id": str(i), "age": 30, "verified": True, "region": "US"})
+            store.close()
+            print(f"{policy:>8} {count / (time.perf_counter() - start):>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark: population reason report vs a per-record evaluate_all_rules loop.
+
+Fills a UserStore with generated users (some invalid), then times
+population_report over the whole store, with and without a breakdown by region,
+against the ad-hoc script it replaces: validate + evaluate_all_rules per record,
+counting reasons and reason pairs in Counters. The loop runs on the first
+--loop-users records and is extrapolated; the counts it produces are checked
+against a report over the same records.
+Run: python3 benchmarks/bench_report.py [--users 10000000] [--loop-users 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from itertools import combinations, islice
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datagen import generate_chunks  # noqa: E402
+from policy import DEFAULT_RULES, evaluate_all_rules, validate  # noqa: E402
+from report import population_report  # noqa: E402
+from store import UserStore  # noqa: E402
+
+
+def loop_report(records: list) -> dict:
+    reasons: Counter = Counter()
+    pairs: Counter = Counter()
+    allowed = denied = invalid = 0
+    for record in records:
+        validation = validate(record)
+        if not validation["valid"]:
+            invalid += 1
+            reasons[validation["reason"]] += 1
+            continue
+        decision = evaluate_all_rules(record, DEFAULT_RULES)
+        if decision["allowed"]:
+            allowed += 1
+            continue
+        denied += 1
+        reasons.update(decision["reasons"])
+        pairs.update(first + " + " + second
+                     for first, second in combinations(decision["reasons"], 2))
+    return {"users": len(records), "allowed": allowed, "denied": denied, "invalid": invalid,
+            "reasons": dict(reasons), "reason_pairs": dict(pairs)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=10_000_000)
+    parser.add_argument("--loop-users", type=int, default=1_000_000)
+    args = parser.parse_args()
+    n = args.users
+
+    users = UserStore()
+    for chunk in generate_chunks(n, 100_000, seed=0):
+        users.add_many(chunk)
+
+    for field in (None, "region"):
+        start = time.perf_counter()
+        report = population_report(users, DEFAULT_RULES, field)
+        elapsed = time.perf_counter() - start
+        totals = report.to_dict()
+        assert totals["users"] == n
+        print(f"report{' by ' + field if field else '':<10} x{n:,}: {elapsed:6.2f} s "
+              f"({n / elapsed:,.0f} users/s)")
+
+    sample = list(islice(users, args.loop_users))
+    start = time.perf_counter()
+    expected = loop_report(sample)
+    loop_elapsed = time.perf_counter() - start
+    got = population_report(sample, DEFAULT_RULES).to_dict()
+    assert got == {**expected, "reasons": got["reasons"], "reason_pairs": got["reason_pairs"]}
+    assert got["reasons"] == expected["reasons"] and got["reason_pairs"] == expected["reason_pairs"]
+    print(f"per-record loop x{len(sample):,}: {loop_elapsed:6.2f} s "
+          f"(~{loop_elapsed * n / len(sample):,.0f} s for {n:,}); same counts as the report")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark: evaluation throughput while the rule set is being swapped.
+
+Reader threads evaluate records against registry.current (one snapshot per
+evaluation) while a publisher thread alternates between two rule sets as fast as
+it can. Every decision is checked against the expected result for the version it
+reports, and throughput is compared with a run where nothing is published, so a
+swap that blocked or tore an evaluation shows up as a slowdown or a mismatch.
+Run: python3 benchmarks/bench_ruleswap.py [--records 20000] [--threads 4] [--seconds 2]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datagen import generate_records  # noqa: E402
+from policy import DEFAULT_RULES, rule_age, rule_region, run_policy  # noqa: E402
+from ruleset import RuleRegistry  # noqa: E402
+
+ALTERNATE_RULES = [rule_region, rule_age]
+
+
+def run(records: list, threads: int, seconds: float, swap: bool) -> tuple[int, int, int]:
+    """Return (evaluations, swaps, mismatches)."""
+    expected = {
+        tuple(rules): [run_policy(record, rules) for record in records]
+        for rules in (DEFAULT_RULES, ALTERNATE_RULES)
+    }
+    registry = RuleRegistry(DEFAULT_RULES)
+    stop = threading.Event()
+    counts = [0] * threads
+    mismatches = [0] * threads
+    swaps = 0
+
+    def reader(slot: int) -> None:
+        done = bad = 0
+        while not stop.is_set():
+            for i, record in enumerate(records):
+                rule_set = registry.current
+                if run_policy(record, rule_set) != expected[rule_set.rules][i]:
+                    bad += 1
+            done += len(records)
+        counts[slot] = done
+        mismatches[slot] = bad
+
+    def publisher() -> None:
+        nonlocal swaps
+        while not stop.is_set():
+            registry.publish(ALTERNATE_RULES if swaps % 2 == 0 else DEFAULT_RULES)
+            swaps += 1
+            time.sleep(0)
+
+    workers = [threading.Thread(target=reader, args=(slot,)) for slot in range(threads)]
+    if swap:
+        workers.append(threading.Thread(target=publisher))
+    for worker in workers:
+        worker.start()
+    time.sleep(seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    return sum(counts), swaps, sum(mismatches)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=20_000)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    records = list(generate_records(args.records, seed=0))
+    base, _, _ = run(records, args.threads, args.seconds, swap=False)
+    total, swaps, bad = run(records, args.threads, args.seconds, swap=True)
+    print(f"no swaps:   {base / args.seconds:>12,.0f} evals/s")
+    print(f"with swaps: {total / args.seconds:>12,.0f} evals/s ({total / base:.2f}x), "
+          f"{swaps:,} swaps, {bad} decisions inconsistent with their version")
+    assert bad == 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: shadow evaluation vs two separate runs and a diff.
+
+The candidate keeps rule_age and rule_region, drops rule_verified and adds a
+declared user rule. The old way runs write_decisions once per rule list over the
+records and then compares the two outputs line by line; the shadow pass reads
+and validates each record once, runs the four distinct rules once and writes
+the primary's decisions plus diff rows. The two must find the same changed
+records, and the shadow pass's decisions must be identical to the primary run's.
+The shadow pass is also timed with the summary only (no diff rows), and the
+batch path (decide_columns_shadow vs two decide_columns calls) when numpy is
+installed.
+Run: python3 benchmarks/bench_shadow.py [--records 1000000]
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datagen import generate_records  # noqa: E402
+from output import BulkWriter  # noqa: E402
+from policy import DEFAULT_RULES, declare_fields, rule_age, rule_region  # noqa: E402
+from shadow import Shadow, write_decisions_shadow  # noqa: E402
+from stream import write_decisions  # noqa: E402
+
+
+def rule_kyc(record: dict) -> dict:
+    return {"passed": record.get("region", "") != "CA" or record.get("age", 0) >= 21,
+            "reason": "kyc incomplete"}
+
+
+declare_fields(rule_kyc, ("age", "region"))
+CANDIDATE = [rule_age, rule_region, rule_kyc]
+
+
+def two_runs(records: list) -> tuple[str, set]:
+    outputs = []
+    for rule_list in (DEFAULT_RULES, CANDIDATE):
+        out = io.StringIO()
+        with BulkWriter(out) as writer:
+            write_decisions(records, rule_list, writer)
+        outputs.append(out.getvalue())
+    changed = {json.loads(a)["id"] for a, b in zip(outputs[0].splitlines(), outputs[1].splitlines())
+               if a != b}
+    return outputs[0], changed
+
+
+def shadow_run(records: list, diff_stream: bool = True) -> tuple[str, set]:
+    out = io.StringIO()
+    diffs = io.StringIO()
+    with BulkWriter(out) as writer, BulkWriter(diffs) as diff_writer:
+        shadow = Shadow(DEFAULT_RULES, CANDIDATE, diff_writer.write_row if diff_stream else None)
+        write_decisions_shadow(records, shadow, writer)
+    return out.getvalue(), {json.loads(line)["id"] for line in diffs.getvalue().splitlines()}
+
+
+def bench_columns(records: list) -> None:
+    try:
+        from batch import MISSING, decide_columns, decide_columns_shadow
+    except ImportError:
+        print("batch path skipped (needs numpy)")
+        return
+    age = [record.get("age", MISSING) for record in records]
+    verified = [record.get("verified") is True for record in records]
+    region = [record.get("region", "") for record in records]
+    start = time.perf_counter()
+    separate = [decide_columns(age, verified, region, rules)
+                for rules in (DEFAULT_RULES, CANDIDATE)]
+    two = time.perf_counter() - start
+    start = time.perf_counter()
+    shadowed = decide_columns_shadow(age, verified, region, DEFAULT_RULES, CANDIDATE)
+    one = time.perf_counter() - start
+    assert all((a.failures == b.failures).all() for a, b in zip(separate, shadowed))
+    print(f"batch path: two decide_columns {two:6.2f} s, decide_columns_shadow {one:6.2f} s "
+          f"({two / one:.2f}x), same bitmasks")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=1_000_000)
+    args = parser.parse_args()
+    records = list(generate_records(args.records, seed=0))
+    start = time.perf_counter()
+    expected, expected_changed = two_runs(records)
+    two = time.perf_counter() - start
+    start = time.perf_counter()
+    got, changed = shadow_run(records)
+    one = time.perf_counter() - start
+    assert got == expected and changed == expected_changed
+    start = time.perf_counter()
+    shadow_run(records, diff_stream=False)
+    summary_only = time.perf_counter() - start
+    n = len(records)
+    print(f"two runs + diff  {two:6.2f} s ({n / two:>10,.0f} records/s)")
+    print(f"shadow pass      {one:6.2f} s ({n / one:>10,.0f} records/s, {two / one:.2f}x); "
+          f"{len(changed):,} changed records, same decisions and diffs")
+    print(f"  summary only   {summary_only:6.2f} s ({n / summary_only:>10,.0f} records/s, "
+          f"{two / summary_only:.2f}x)")
+    bench_columns(records)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: cold start of src/engine.py, from process spawn to first decision.
+
+Runs `engine.py eval` on a one-record file in a fresh interpreter, repeatedly, and
+reports min / median / p90 wall time. The first run (no rule bundle in the cache
+directory yet) is reported separately. Also prints the slowest imports of one run
+(python -X importtime) so a regression can be traced to the import that caused it.
+With --max-ms, exits non-zero when the median exceeds it (a regression check).
+src/ is byte-compiled first, as an installed copy would be (PYTHONDONTWRITEBYTECODE
+would otherwise recompile every module on every launch).
+Run: python3 benchmarks/bench_startup.py [--runs 30] [--max-ms 50]
+"""
+
+import argparse
+import compileall
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+ENGINE = os.path.join(SRC, "engine.py")
+RECORD = '{"id": 1, "age": 30, "verified": true, "region": "US"}\n'
+EXPECTED = '{"id": 1, "allowed": true, "reasons": [], "result": "Allowed"}'
+
+
+def spawn(cache_dir: str, input_path: str, *python_flags: str) -> tuple[float, str, str]:
+    cmd = [sys.executable, *python_flags, ENGINE, "--rule-cache", cache_dir,
+           "eval", "--input", input_path]
+    start = time.perf_counter()
+    done = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    return time.perf_counter() - start, done.stdout, done.stderr
+
+
+def slowest_imports(stderr: str, count: int = 8) -> list[tuple[int, str]]:
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):  # top-level imports only (nested ones are indented)
+            rows.append((int(cumulative), name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=30)
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="fail if the median spawn -> first decision time is above this")
+    args = parser.parse_args()
+    compileall.compile_dir(SRC, quiet=1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "one.jsonl")
+        with open(input_path, "w", encoding="utf-8") as handle:
+            handle.write(RECORD)
+        cache_dir = os.path.join(tmp, "rule-cache")
+
+        first, out, _ = spawn(cache_dir, input_path)
+        assert out.strip() == EXPECTED, out
+        times = sorted(spawn(cache_dir, input_path)[0] for _ in range(args.runs))
+        _, _, trace = spawn(cache_dir, input_path, "-X", "importtime")
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    bare = time.perf_counter() - start
+
+    median = times[len(times) // 2] * 1e3
+    print(f"bare interpreter:          {bare * 1e3:6.1f} ms")
+    print(f"first run (builds bundle): {first * 1e3:6.1f} ms")
+    print(f"spawn -> first decision:   min {times[0] * 1e3:.1f} ms, median {median:.1f} ms, "
+          f"p90 {times[int(len(times) * 0.9)] * 1e3:.1f} ms over {args.runs} runs")
+    print("slowest top-level imports (cumulative us):")
+    for micros, name in slowest_imports(trace):
+        print(f"  {micros:>8} {name}")
+    if args.max_ms is not None and median > args.max_ms:
+        print(f"FAIL: median {median:.1f} ms > {args.max_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark: handle_eval latency against store size (1k → 1M users).
+
+Compares the UserStore id index with the old linear scan over a list of dicts.
+Run: python3 benchmarks/bench_store.py
+"""
+
+import os
+import random
+import sys
+import time
+from typing import Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from cli import handle_eval  # noqa: E402
+from policy import DEFAULT_RULES, run_policy  # noqa: E402
+from store import UserStore  # noqa: E402
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+LOOKUPS = 2_000
+LINEAR_LOOKUPS = 20
+
+
+def linear_eval(user_id: str, users: list[dict[str, Any]]) -> str:
+    """The pre-store lookup: walk the list comparing str(id)."""
+    for u in users:
+        if str(u["id"]) == user_id:
+            return run_policy(u, DEFAULT_RULES)
+    return "user not found: " + user_id
+
+
+def main() -> None:
+    rng = random.Random(0)
+    print(f"{'users':>10} {'store us/eval':>14} {'scan us/eval':>14}")
+    for size in SIZES:
+        records = [
+            {"id": "u" + str(i), "age": rng.randint(0, 90),
+             "verified": rng.random() < 0.8, "region": rng.choice(["US", "UK", "XX"])}
+            for i in range(size)
+        ]
+        store = UserStore(index_fields=("region", "verified"))
+        for rec in records:
+            store.add(rec)
+        ids = ["u" + str(rng.randrange(size)) for _ in range(LOOKUPS)]
+
+        start = time.perf_counter()
+        for user_id in ids:
+            handle_eval([user_id], store, run_policy, DEFAULT_RULES)
+        store_us = (time.perf_counter() - start) / LOOKUPS * 1e6
+
+        start = time.perf_counter()
+        for user_id in ids[:LINEAR_LOOKUPS]:
+            linear_eval(user_id, records)
+        scan_us = (time.perf_counter() - start) / LINEAR_LOOKUPS * 1e6
+
+        print(f"{size:>10} {store_us:>14.2f} {scan_us:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
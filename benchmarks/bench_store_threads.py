@@ -0,0 +1,111 @@
+"""
+Benchmark: store throughput versus number of threads.
+
+Each thread runs a mix of evals (get + run_policy), adds and short listings
+against one shared store, for a fixed time. Compared:
+  - UserStore behind one global lock (every operation, reads included, serialized),
+  - ConcurrentUserStore (lock-free reads, serialized writes, shared snapshots).
+On a GIL build the threads share one core, so expect flat totals and look at the
+overhead; on a free-threaded build (python3.13t+) reads should scale with cores.
+Run: python3 benchmarks/bench_store_threads.py [--users 100000] [--threads 1,2,4,8]
+                                                [--write-pct 5] [--list-pct 1] [--seconds 2]
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from itertools import islice
+from typing import Any, Iterator
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from concurrent_store import ConcurrentUserStore  # noqa: E402
+from datagen import generate_chunks  # noqa: E402
+from policy import DEFAULT_RULES, run_policy  # noqa: E402
+from store import UserStore  # noqa: E402
+
+LIST_ROWS = 100
+
+
+class LockedUserStore(UserStore):
+    """The simple alternative: one lock around every operation."""
+
+    def __init__(self, index_fields: tuple[str, ...] = ()) -> None:
+        super().__init__(index_fields)
+        self._lock = threading.Lock()
+
+    def add(self, record: dict[str, Any]) -> None:
+        with self._lock:
+            super().add(record)
+
+    def get(self, user_id: object) -> dict[str, Any] | None:
+        with self._lock:
+            return super().get(user_id)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        # Copy under the lock: iterating the live dict would race with adds.
+        with self._lock:
+            return iter(list(self._by_id.values()))
+
+
+def run(store_cls: type, threads: int, args: argparse.Namespace, ids: list[str],
+        chunks: list[list[dict[str, Any]]]) -> float:
+    users = store_cls(("region",))
+    for chunk in chunks:
+        users.add_many(chunk)
+    stop = threading.Event()
+    done = [0] * threads
+
+    def work(slot: int) -> None:
+        rng = random.Random(slot)
+        ops = n = 0
+        while not stop.is_set():
+            roll = rng.random() * 100
+            if roll < args.write_pct:
+                users.add({"id": f"t{slot}-{n}", "age": 30, "verified": True, "region": "US"})
+                n += 1
+            elif roll < args.write_pct + args.list_pct:
+                for _ in islice(users, LIST_ROWS):
+                    pass
+            else:
+                run_policy(users.get(ids[rng.randrange(len(ids))]), DEFAULT_RULES)
+            ops += 1
+        done[slot] = ops
+
+    workers = [threading.Thread(target=work, args=(slot,)) for slot in range(threads)]
+    for worker in workers:
+        worker.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for worker in workers:
+        worker.join()
+    return sum(done) / args.seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--threads", default="1,2,4,8")
+    parser.add_argument("--write-pct", type=float, default=5.0)
+    parser.add_argument("--list-pct", type=float, default=1.0)
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    chunks = list(generate_chunks(args.users, 10_000, seed=0, invalid_rate=0.0))
+    ids = [str(record["id"]) for chunk in chunks for record in chunk]
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"{args.users:,} users, {args.write_pct:g}% adds, {args.list_pct:g}% listings "
+          f"of {LIST_ROWS}, rest evals; GIL {'enabled' if gil else 'disabled'}, "
+          f"{os.cpu_count()} CPUs")
+    print(f"{'threads':>7} {'global lock':>14} {'concurrent':>14}")
+    for threads in (int(t) for t in args.threads.split(",")):
+        locked = run(LockedUserStore, threads, args, ids, chunks)
+        concurrent = run(ConcurrentUserStore, threads, args, ids, chunks)
+        print(f"{threads:>7} {locked:>12,.0f}/s {concurrent:>12,.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark: streaming `engine.py eval` throughput and peak memory vs input size.
+
+Writes synthetic JSONL files to a temp directory and runs run_eval on each. Peak
+traced memory should stay flat as the file grows.
+Run: python3 benchmarks/bench_stream.py
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from engine import run_eval  # noqa: E402
+
+SIZES = [10_000, 100_000, 1_000_000]
+
+
+def write_input(path: str, n: int, rng: random.Random) -> None:
+    with open(path, "w", encoding="utf-8") as handle:
+        for i in range(n):
+            rec = {"id": i, "age": rng.randint(0, 90), "verified": rng.random() < 0.8,
+                   "region": rng.choice(["US", "UK", "XX"])}
+            handle.write(json.dumps(rec) + "\n")
+
+
+def main() -> None:
+    rng = random.Random(0)
+    print(f"{'records':>10} {'rec/s':>12} {'peak KiB':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in SIZES:
+            in_path = os.path.join(tmp, "in.jsonl")
+            out_path = os.path.join(tmp, "out.jsonl")
+            write_input(in_path, n, rng)
+            tracemalloc.start()
+            start = time.perf_counter()
+            count = run_eval(in_path, out_path, None)
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            assert count == n
+            print(f"{n:>10} {n / elapsed:>12,.0f} {peak / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
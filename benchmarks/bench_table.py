@@ -0,0 +1,87 @@
+"""
+Benchmark: decision-table evaluator vs compile_rules.
+
+1. The built-in rules (which compile_rules already inlines).
+2. A larger policy of user rules over the same three fields (age bands,
+   regional lists, verification), declared with declare_domains: compile_rules
+   has to call every rule, the table does one lookup per field.
+Both evaluators run over the same valid records and must agree on every decision.
+Run: python3 benchmarks/bench_table.py [--records 1000000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datagen import generate_records  # noqa: E402
+from policy import DEFAULT_RULES, Rule, compile_rules, validate  # noqa: E402
+from table import Categories, DecisionTable, Flag, Threshold, declare_domains  # noqa: E402
+
+
+def age_band_rule(low: int, high: int) -> Rule:
+    def rule(record: dict) -> dict:
+        age = record.get("age", 0)
+        return {"passed": not (age >= low and not age >= high),
+                "reason": f"age in restricted band {low}-{high}"}
+    rule.__name__ = f"rule_age_{low}_{high}"
+    return declare_domains(rule, Threshold("age", (low, high)))
+
+
+def region_rule(regions: tuple[str, ...], reason: str) -> Rule:
+    def rule(record: dict) -> dict:
+        return {"passed": record.get("region", "") not in regions, "reason": reason}
+    rule.__name__ = "rule_" + reason.replace(" ", "_")
+    return declare_domains(rule, Categories("region", regions))
+
+
+def unverified_region_rule(regions: tuple[str, ...]) -> Rule:
+    def rule(record: dict) -> dict:
+        ok = record.get("verified") is True or record.get("region", "") not in regions
+        return {"passed": ok, "reason": "verification required in " + "/".join(regions)}
+    return declare_domains(rule, Flag("verified"), Categories("region", regions))
+
+
+LARGE_RULES = [
+    *DEFAULT_RULES,
+    age_band_rule(13, 16),
+    age_band_rule(65, 70),
+    age_band_rule(90, 121),
+    region_rule(("IN", "BR"), "export controlled"),
+    region_rule(("DE", "FR"), "gdpr review"),
+    region_rule(("CN",), "licensing"),
+    unverified_region_rule(("US", "CA")),
+    unverified_region_rule(("UK",)),
+]
+
+
+def bench(name: str, records: list, rule_list: list) -> None:
+    table = DecisionTable(rule_list)
+    compiled = compile_rules(rule_list)
+    assert all(table.evaluate(r) == compiled(r) for r in records)
+    rates = {}
+    for label, fn in (("compile_rules", compiled), ("decision table", table.evaluate)):
+        start = time.perf_counter()
+        for record in records:
+            fn(record)
+        rates[label] = len(records) / (time.perf_counter() - start)
+    print(f"{name}: {table.describe()}")
+    print(f"  compile_rules  {rates['compile_rules']:>12,.0f}/s")
+    print(f"  decision table {rates['decision table']:>12,.0f}/s "
+          f"({rates['decision table'] / rates['compile_rules']:.2f}x), same decisions")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=1_000_000)
+    args = parser.parse_args()
+    records = [r for r in generate_records(args.records, seed=0) if validate(r)["valid"]]
+    bench("built-in rules", records, DEFAULT_RULES)
+    bench(f"{len(LARGE_RULES)} rules", records, LARGE_RULES)
+
+
+if __name__ == "__main__":
+    main()
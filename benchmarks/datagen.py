@@ -0,0 +1,54 @@
+"""
+Seeded synthetic user records for benchmarks.
+
+Distributions are loosely shaped like a real marketplace population: ages around
+the late thirties with a minority of minors, most accounts verified, a handful of
+regions with a small restricted share. A configurable fraction of records is
+invalid (missing age, age not a number, age out of range), split evenly.
+"""
+
+import random
+from typing import Any, Iterator
+
+REGIONS = ["US", "UK", "CA", "DE", "IN", "BR", "XX", "YY"]
+REGION_WEIGHTS = [40, 15, 10, 10, 12, 5, 4, 4]
+
+
+def generate_records(
+    n: int,
+    seed: int = 0,
+    invalid_rate: float = 0.02,
+    verified_rate: float = 0.85,
+) -> Iterator[dict[str, Any]]:
+    """Yield n records; the same seed always yields the same records."""
+    rng = random.Random(seed)
+    for i in range(n):
+        record: dict[str, Any] = {
+            "id": "u" + str(i),
+            "verified": rng.random() < verified_rate,
+            "region": rng.choices(REGIONS, REGION_WEIGHTS)[0],
+        }
+        if rng.random() < invalid_rate:
+            kind = rng.randrange(3)
+            if kind == 1:
+                record["age"] = rng.choice(["n/a", "", None])
+            elif kind == 2:
+                record["age"] = rng.choice([-1, 121, 150])
+            # kind 0: age left missing
+        else:
+            age = min(100, max(0, int(rng.gauss(38, 15))))
+            # A few upstream sources send ages as floats.
+            record["age"] = age + 0.5 if rng.random() < 0.05 else age
+        yield record
+
+
+def generate_chunks(n: int, chunk_size: int, **kwargs: Any) -> Iterator[list[dict[str, Any]]]:
+    """generate_records in lists of up to chunk_size, for functions that take a list."""
+    chunk: list[dict[str, Any]] = []
+    for record in generate_records(n, **kwargs):
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,106 @@
+"""
+Load generator for `engine.py serve`: throughput and tail latency of eval requests.
+
+Opens several connections, preloads users with add requests, then keeps `depth`
+eval requests in flight on each connection and times every response.
+Run (server in another shell):
+    python3 src/engine.py serve --port 7070
+    python3 benchmarks/loadgen.py --port 7070 --connections 8 --depth 32 --requests 200000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any
+
+
+async def open_connection(
+    args: argparse.Namespace,
+) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix)
+    return await asyncio.open_connection(args.host, args.port)
+
+
+async def preload(args: argparse.Namespace) -> None:
+    reader, writer = await open_connection(args)
+    rng = random.Random(0)
+    for i in range(args.users):
+        record = {"id": "load" + str(i), "age": rng.randint(10, 80),
+                  "verified": rng.random() < 0.85, "region": rng.choice(["US", "UK", "XX"])}
+        writer.write(json.dumps({"id": i, "op": "add", "record": record}).encode() + b"\n")
+    await writer.drain()
+    for _ in range(args.users):
+        await reader.readline()
+    writer.close()
+
+
+async def run_connection(args: argparse.Namespace, count: int, seed: int,
+                         latencies: list[float], errors: dict[str, int]) -> None:
+    reader, writer = await open_connection(args)
+    rng = random.Random(seed)
+    slots = asyncio.Semaphore(args.depth)
+    sent_at: dict[int, float] = {}
+
+    async def receive() -> None:
+        for _ in range(count):
+            line = await reader.readline()
+            response: dict[str, Any] = json.loads(line)
+            latencies.append(time.perf_counter() - sent_at.pop(response["id"]))
+            if not response.get("ok"):
+                errors[response.get("error", "?")] = errors.get(response.get("error", "?"), 0) + 1
+            slots.release()
+
+    receiver = asyncio.create_task(receive())
+    for request_id in range(count):
+        await slots.acquire()
+        user_id = "load" + str(rng.randrange(args.users))
+        sent_at[request_id] = time.perf_counter()
+        request = {"id": request_id, "op": "eval", "user_id": user_id}
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+    await receiver
+    writer.close()
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def main_async(args: argparse.Namespace) -> None:
+    await preload(args)
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+    per_connection = args.requests // args.connections
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_connection(args, per_connection, seed, latencies, errors)
+        for seed in range(args.connections)
+    ))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    total = len(latencies)
+    print(f"requests: {total}  connections: {args.connections}  depth: {args.depth}")
+    print(f"throughput: {total / elapsed:,.0f} req/s")
+    for label, fraction in (("p50", 0.5), ("p99", 0.99), ("p99.9", 0.999)):
+        print(f"{label:>6}: {percentile(latencies, fraction) * 1000:.3f} ms")
+    if errors:
+        print("errors:", errors)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="load generator for engine.py serve")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7070)
+    parser.add_argument("--unix", default=None, help="Unix socket path (instead of TCP)")
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--depth", type=int, default=32, help="in-flight requests per connection")
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=10_000, help="users to add before the run")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
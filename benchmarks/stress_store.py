@@ -0,0 +1,135 @@
+"""
+Stress test: ConcurrentUserStore under mixed add / update / eval / list threads.
+
+Writers add users in batches (add_many) and one at a time, and replace existing
+users; evaluators run run_policy on random known ids; listers take snapshots.
+Checked while it runs:
+  - every id a writer has finished adding is found by every later get,
+  - a snapshot holds every batch whole or not at all,
+  - snapshot versions and sizes never go backwards for one reader,
+  - find() returns records that really have the value.
+Fails with an AssertionError (and a non-zero exit) on the first violation.
+Run: python3 benchmarks/stress_store.py [--writers 2] [--evaluators 4] [--listers 2] [--seconds 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from concurrent_store import ConcurrentUserStore  # noqa: E402
+from policy import DEFAULT_RULES, run_policy  # noqa: E402
+
+BATCH = 50
+REGIONS = ("US", "CA", "XX", "YY")
+
+
+def run_stress(writers: int = 2, evaluators: int = 4, listers: int = 2,
+               seconds: float = 5.0) -> dict[str, int]:
+    """Run the mixed workload for about seconds; return the operation counts."""
+    users = ConcurrentUserStore(("region",))
+    stop = threading.Event()
+    # Ids whose add has returned; appended by writers, read by evaluators.
+    added: list[str] = []
+    counts = {"adds": 0, "updates": 0, "evals": 0, "lists": 0}
+    failures: list[BaseException] = []
+
+    def record(user_id: str, rng: random.Random, batch: str) -> dict:
+        return {"id": user_id, "age": rng.randint(10, 80), "verified": rng.random() < 0.8,
+                "region": rng.choice(REGIONS), "batch": batch}
+
+    def writer(slot: int) -> None:
+        rng = random.Random(slot)
+        n = 0
+        while not stop.is_set():
+            if n % 3 == 0:
+                batch = f"w{slot}-{n}"
+                ids = [f"{batch}-{i}" for i in range(BATCH)]
+                users.add_many([record(user_id, rng, batch) for user_id in ids])
+                added.extend(ids)
+                counts["adds"] += BATCH
+            elif n % 3 == 1:
+                user_id = f"w{slot}-single-{n}"
+                users.add(record(user_id, rng, "single-" + user_id))
+                added.append(user_id)
+                counts["adds"] += 1
+            elif added:
+                old = users.get(rng.choice(added))
+                assert old is not None
+                users.replace({**old, "age": rng.randint(10, 80)})
+                counts["updates"] += 1
+            n += 1
+
+    def evaluator(slot: int) -> None:
+        rng = random.Random(100 + slot)
+        while not stop.is_set():
+            if not added:
+                continue
+            user_id = added[rng.randrange(len(added))]
+            user = users.get(user_id)
+            assert user is not None, "added id not found: " + user_id
+            assert user_id in users
+            run_policy(user, DEFAULT_RULES)
+            counts["evals"] += 1
+
+    def lister(slot: int) -> None:
+        rng = random.Random(200 + slot)
+        last_version = last_len = 0
+        while not stop.is_set():
+            snap = users.snapshot()
+            assert snap.version >= last_version and len(snap) >= last_len
+            last_version, last_len = snap.version, len(snap)
+            sizes: dict[str, int] = {}
+            for user in snap:
+                sizes[user["batch"]] = sizes.get(user["batch"], 0) + 1
+            for batch, size in sizes.items():
+                assert size == (1 if batch.startswith("single-") else BATCH), \
+                    f"snapshot holds {size} of batch {batch}"
+            region = rng.choice(REGIONS)
+            assert all(user["region"] == region for user in users.find("region", region))
+            counts["lists"] += 1
+
+    def guarded(target, slot: int) -> None:
+        try:
+            target(slot)
+        except BaseException as exc:  # report from the main thread
+            failures.append(exc)
+            stop.set()
+
+    threads = [threading.Thread(target=guarded, args=(role, slot))
+               for role, count in ((writer, writers), (evaluator, evaluators),
+                                   (lister, listers))
+               for slot in range(count)]
+    for thread in threads:
+        thread.start()
+    stop.wait(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    if failures:
+        raise failures[0]
+
+    assert len(users) == len(added) == len(set(added))
+    assert sorted(user["id"] for user in users) == sorted(added)
+    return {**counts, "copies": users.snapshot_copies}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--evaluators", type=int, default=4)
+    parser.add_argument("--listers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+    counts = run_stress(args.writers, args.evaluators, args.listers, args.seconds)
+    print(f"ok: {counts['adds']:,} adds, {counts['updates']:,} updates, "
+          f"{counts['evals']:,} evals, {counts['lists']:,} snapshot listings "
+          f"({counts['copies']:,} copies) in {args.seconds:.0f}s, "
+          f"GIL {'enabled' if getattr(sys, '_is_gil_enabled', lambda: True)() else 'disabled'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Benchmark suite: every phase's hot path at scale.
+
+Cases:
+  phase1  evaluate_age_rule           (list in, list out; clean data only)
+  phase2  validate_then_evaluate_all  (list in, list out)
+  phase3  evaluate_all_rules          (per record, valid records)
+  phase4  run_policy                  (per record)
+  phase5  handle_eval                 (per lookup against a store of n users)
+
+Records come from datagen.generate_records (seeded) and are fed in chunks so a 10M
+run does not hold every record at once (phase5 must, to fill its store).
+Each (case, size) runs in a fresh process so its peak RSS is its own.
+
+Reported per case: records/s over the whole run, p50/p99 per-record latency from
+individually timed calls on a sample, and peak RSS. Results are saved as JSON;
+--compare prints rec/s and p99 ratios against an earlier results file.
+
+Run: python3 benchmarks/suite.py --sizes 1000,100000,10000000 --output bench_results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cli import handle_eval  # noqa: E402
+from datagen import generate_chunks, generate_records  # noqa: E402
+from policy import (  # noqa: E402
+    DEFAULT_RULES, evaluate_age_rule, evaluate_all_rules, run_policy, validate,
+    validate_then_evaluate_all,
+)
+from store import UserStore  # noqa: E402
+
+CASES = ["phase1", "phase2", "phase3", "phase4", "phase5"]
+CHUNK_SIZE = 100_000
+LATENCY_SAMPLE = 100_000
+
+
+def _percentile(sorted_ns: list[int], fraction: float) -> float:
+    if not sorted_ns:
+        return 0.0
+    index = min(len(sorted_ns) - 1, int(fraction * len(sorted_ns)))
+    return sorted_ns[index] / 1000.0
+
+
+def _sample_latency(call: Callable[[Any], Any], items: list[Any]) -> list[int]:
+    timings: list[int] = []
+    clock = time.perf_counter_ns
+    for item in items:
+        start = clock()
+        call(item)
+        timings.append(clock() - start)
+    timings.sort()
+    return timings
+
+
+def _case_fns(case: str, invalid_rate: float) -> tuple[Callable, Callable, float]:
+    """Return (chunk runner, per-record call, invalid rate to generate) for one case."""
+    if case == "phase1":
+        return evaluate_age_rule, lambda rec: evaluate_age_rule([rec]), 0.0
+    if case == "phase2":
+        return (validate_then_evaluate_all, lambda rec: validate_then_evaluate_all([rec]),
+                invalid_rate)
+    if case == "phase3":
+        def run_phase3(chunk: list[dict[str, Any]]) -> None:
+            for rec in chunk:
+                if validate(rec)["valid"]:
+                    evaluate_all_rules(rec, DEFAULT_RULES)
+        return run_phase3, lambda rec: evaluate_all_rules(rec, DEFAULT_RULES), 0.0
+    if case == "phase4":
+        def run_phase4(chunk: list[dict[str, Any]]) -> None:
+            for rec in chunk:
+                run_policy(rec, DEFAULT_RULES)
+        return run_phase4, lambda rec: run_policy(rec, DEFAULT_RULES), invalid_rate
+    raise ValueError("unknown case: " + case)
+
+
+def run_case(case: str, n: int, seed: int, invalid_rate: float) -> dict[str, Any]:
+    """Run one case at one size; executed in a fresh worker process."""
+    if case == "phase5":
+        users = UserStore()
+        for chunk in generate_chunks(n, CHUNK_SIZE, seed=seed, invalid_rate=invalid_rate):
+            users.add_many(chunk)
+        ids = [[str(rec["id"])] for rec in generate_records(
+            min(n, LATENCY_SAMPLE), seed=seed + 1, invalid_rate=0.0)]
+        start = time.perf_counter()
+        for args in ids:
+            handle_eval(args, users, run_policy, DEFAULT_RULES)
+        elapsed = time.perf_counter() - start
+        timings = _sample_latency(
+            lambda args: handle_eval(args, users, run_policy, DEFAULT_RULES), ids)
+        measured = len(ids)
+    else:
+        run_chunk, call_one, rate = _case_fns(case, invalid_rate)
+        elapsed = 0.0
+        sample: list[dict[str, Any]] = []
+        for chunk in generate_chunks(n, CHUNK_SIZE, seed=seed, invalid_rate=rate):
+            if len(sample) < LATENCY_SAMPLE:
+                sample.extend(chunk[: LATENCY_SAMPLE - len(sample)])
+            start = time.perf_counter()
+            run_chunk(chunk)
+            elapsed += time.perf_counter() - start
+        if case == "phase3":
+            sample = [rec for rec in sample if validate(rec)["valid"]]
+        timings = _sample_latency(call_one, sample)
+        measured = n
+
+    peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "case": case,
+        "records": n,
+        "records_per_s": measured / elapsed if elapsed else 0.0,
+        "p50_us": _percentile(timings, 0.50),
+        "p99_us": _percentile(timings, 0.99),
+        "peak_rss_mib": peak_kib / 1024.0,
+        "seconds": elapsed,
+    }
+
+
+def compare(results: list[dict[str, Any]], baseline_path: str) -> None:
+    with open(baseline_path, encoding="utf-8") as handle:
+        baseline = json.load(handle)
+    old = {(r["case"], r["records"]): r for r in baseline["results"]}
+    print(f"\n{'case':<8} {'records':>10} {'rec/s ratio':>12} {'p99 ratio':>10}")
+    for r in results:
+        prev = old.get((r["case"], r["records"]))
+        if prev is None or not prev["records_per_s"] or not prev["p99_us"]:
+            continue
+        print(f"{r['case']:<8} {r['records']:>10} "
+              f"{r['records_per_s'] / prev['records_per_s']:>12.2f} "
+              f"{r['p99_us'] / prev['p99_us']:>10.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", default="1000,100000", help="comma-separated record counts")
+    parser.add_argument("--cases", default=",".join(CASES), help="comma-separated case names")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--invalid-rate", type=float, default=0.02)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", default=None, help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    cases = args.cases.split(",")
+    results: list[dict[str, Any]] = []
+    print(f"{'case':<8} {'records':>10} {'rec/s':>12} {'p50 us':>8} {'p99 us':>8} {'peak MiB':>9}")
+    for case in cases:
+        for n in sizes:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                r = pool.submit(run_case, case, n, args.seed, args.invalid_rate).result()
+            results.append(r)
+            print(f"{case:<8} {n:>10} {r['records_per_s']:>12,.0f} {r['p50_us']:>8.2f} "
+                  f"{r['p99_us']:>8.2f} {r['peak_rss_mib']:>9.1f}")
+
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "seed": args.seed,
+        "invalid_rate": args.invalid_rate,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+    print("saved", args.output)
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
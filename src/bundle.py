@@ -0,0 +1,131 @@
+"""
+Precompiled rule bundles: compile_rules output cached on disk between launches.
+
+A bundle file holds the marshalled code object of compiled_evaluate for one rule
+list, so a fresh process installs the evaluator with a single exec() instead of
+generating and compiling its source. Each bundle records a content hash of
+everything the code depends on (CRC-32 and length, from zlib: hashlib's OpenSSL
+import alone would cost a tenth of the startup budget):
+  - the bundle format version and the Python version (bytecode differs between them),
+  - the rules' qualified names,
+  - the source files of results.py, policy.py and every module that defines a rule.
+Editing a rule, MINIMUM_AGE or a reason code changes the hash, so the stale bundle
+is ignored and rewritten on the next launch.
+
+Only lists of module-level functions from modules with a readable source file
+can be bundled, because the rules are looked up by name again at load time and
+their source goes into the hash. For any other list, load_evaluator just calls
+compile_rules.
+
+Bundles go in the first of: the cache_dir argument (engine.py --rule-cache DIR),
+$POLICY_RULE_CACHE, $XDG_CACHE_HOME/policy-engine, ~/.cache/policy-engine. If
+that directory cannot be written, every launch compiles, as without a cache.
+"""
+
+import marshal
+import os
+import sys
+import zlib
+from typing import Any, Sequence
+
+import policy
+import results
+from policy import (
+    Evaluator, Rule, compile_rules, evaluator_namespace, evaluator_source, install_evaluator,
+)
+
+BUNDLE_VERSION = 1
+CACHE_DIR_ENV = "POLICY_RULE_CACHE"
+
+
+def default_cache_dir() -> str:
+    """$POLICY_RULE_CACHE, else the per-user cache directory."""
+    configured = os.environ.get(CACHE_DIR_ENV)
+    if configured:
+        return configured
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "policy-engine")
+
+
+def _rule_ref(rule_fn: Rule) -> str | None:
+    """"module:name" for a module-level function, else None."""
+    module = sys.modules.get(getattr(rule_fn, "__module__", None) or "")
+    name = getattr(rule_fn, "__qualname__", "")
+    if module is None or not name.isidentifier() or getattr(module, name, None) is not rule_fn:
+        return None
+    return module.__name__ + ":" + name
+
+
+def bundle_key(rule_list: Sequence[Rule]) -> tuple[str, str] | None:
+    """
+    (bundle name, content hash) for rule_list, or None if it cannot be bundled (a rule
+    is not a module-level function, or a module's source file cannot be read).
+    """
+    refs = []
+    for rule_fn in rule_list:
+        ref = _rule_ref(rule_fn)
+        if ref is None:
+            return None
+        refs.append(ref)
+    joined = "\n".join(refs).encode()
+    name = f"{zlib.crc32(joined):08x}{len(refs):02x}"
+
+    parts = [f"{BUNDLE_VERSION} {sys.implementation.cache_tag}\n".encode(), joined]
+    module_files: set[str | None] = {results.__file__, policy.__file__}
+    module_files.update(getattr(sys.modules[ref.partition(":")[0]], "__file__", None)
+                        for ref in refs)
+    if None in module_files:
+        return None  # a module with no file (__main__ of -c, a REPL, a zip import)
+    try:
+        for path in sorted(module_files):
+            with open(path, "rb") as handle:
+                parts.append(handle.read())
+    except OSError:
+        return None
+    content = b"\0".join(parts)
+    return name, f"{zlib.crc32(content):08x}-{len(content)}"
+
+
+def _read_bundle(path: str, content_hash: str) -> Any:
+    try:
+        with open(path, "rb") as handle:
+            data = marshal.load(handle)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if (not isinstance(data, dict) or data.get("version") != BUNDLE_VERSION
+            or data.get("hash") != content_hash):
+        return None
+    return data.get("code")
+
+
+def _write_bundle(path: str, content_hash: str, code: Any) -> None:
+    tmp_path = path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "wb") as handle:
+            marshal.dump({"version": BUNDLE_VERSION, "hash": content_hash, "code": code}, handle)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass  # read-only install: compile on every launch, as without a cache
+
+
+def load_evaluator(rule_list: Sequence[Rule], cache_dir: str | None = None) -> Evaluator:
+    """
+    compile_rules(rule_list), but from the bundle in cache_dir when its hash matches;
+    otherwise compile and (re)write the bundle. The evaluator is installed, so later
+    compile_rules / run_policy calls for this rule list use it.
+    """
+    key = bundle_key(rule_list)
+    if key is None:
+        return compile_rules(rule_list)
+    name, content_hash = key
+    path = os.path.join(cache_dir or default_cache_dir(), f"rules-{name}.bundle")
+    code = _read_bundle(path, content_hash)
+    if code is None:
+        code = compile(evaluator_source(rule_list), f"<rule bundle {name}>", "exec")
+        _write_bundle(path, content_hash, code)
+    namespace = evaluator_namespace(rule_list)
+    exec(code, namespace)  # pylint: disable=exec-used
+    evaluator = namespace["compiled_evaluate"]
+    install_evaluator(rule_list, evaluator)
+    return evaluator
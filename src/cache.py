@@ -0,0 +1,115 @@
+"""
+Opt-in LRU decision cache in front of run_policy.
+
+The key is a fingerprint of the fields validate and the rules read (from
+policy.RULE_FIELDS), so two records that agree on those fields share one cached
+result whatever their id. Because the key is built from field values, replacing
+a record with new values can never hit the old entry. A change of rule list
+bumps the rule-set version and drops every entry.
+
+DecisionCache has the same call signature as run_policy, so it can be passed
+anywhere a run_policy_fn is expected (e.g. handle_eval). On a miss it calls
+policy_fn (run_policy unless another implementation is given).
+"""
+
+from collections import OrderedDict
+from typing import Any, Hashable, Sequence
+
+from policy import Rule, RunPolicyFn, fields_read, run_policy
+
+DEFAULT_MAX_SIZE = 100_000
+
+_MISSING = object()
+
+
+def fingerprint(record: dict[str, Any], fields: tuple[str, ...] | None) -> Hashable:
+    """
+    Hashable key over the given fields (all fields when None).
+    Each value is paired with its type, since 1, 1.0 and True compare equal but
+    rules can treat them differently (rule_verified uses `is True`).
+    """
+    if fields is None:
+        fields = tuple(sorted(record))
+    parts = []
+    for field in fields:
+        value = record.get(field, _MISSING)
+        parts.append((field, type(value), value))
+    return tuple(parts)
+
+
+class DecisionCache:
+    """Bounded LRU cache of run_policy results with hit/miss/eviction counters."""
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_MAX_SIZE,
+        policy_fn: RunPolicyFn = run_policy,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.policy_fn = policy_fn
+        self._entries: OrderedDict[Hashable, str] = OrderedDict()
+        self._rule_set: tuple[Rule, ...] | None = None
+        self._fields: tuple[str, ...] | None = None
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.uncacheable = 0
+
+    def _use_rules(self, rule_list: Sequence[Rule]) -> None:
+        rule_set = tuple(rule_list)
+        if rule_set == self._rule_set:
+            return
+        if self._rule_set is not None:
+            self.invalidate()
+        self._rule_set = rule_set
+        self._fields = fields_read(rule_set)
+        self.version += 1
+
+    def invalidate(self) -> None:
+        """Drop every cached decision."""
+        self._entries.clear()
+        self.invalidations += 1
+
+    def __call__(self, record: dict[str, Any], rule_list: Sequence[Rule]) -> str:
+        self._use_rules(rule_list)
+        key = fingerprint(record, self._fields)
+        try:
+            cached = self._entries.get(key)
+        except TypeError:
+            # Unhashable field value (e.g. a list): evaluate without caching.
+            self.uncacheable += 1
+            return self.policy_fn(record, rule_list)
+        if cached is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return cached
+
+        self.misses += 1
+        result = self.policy_fn(record, rule_list)
+        self._entries[key] = result
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        return result
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict[str, Any]:
+        """Counters for sizing the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "rule_set_version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "uncacheable": self.uncacheable,
+        }
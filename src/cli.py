@@ -0,0 +1,349 @@
+"""
+Stateful CLI: command loop, dispatch and handlers (Phase 5).
+
+Handlers take data and return strings; input() and print() live only in main_cli.
+"""
+
+import gc
+import operator
+from itertools import repeat
+from typing import Any, Iterable, Sequence
+
+from metrics import PolicyMetrics
+from output import FORMATS, user_line, write_users
+from policy import DEFAULT_RULES, Rule, RunPolicyFn, run_policy
+from ruleset import RuleRegistry
+from store import Store
+from stream import BUFFER_SIZE, detect_format, parse_age, parse_verified, read_record_chunks
+
+COMMANDS_HELP = (
+    "Commands: add <id> <age> <verified> <region> | update <id> <age> <verified> <region>"
+    " | load <path> | list [path [text|jsonl|csv]] | eval <id>"
+    " | rules [use <rule>... | reload] | report [field] [json] | metrics [json] | quit"
+)
+
+
+def parse_user_args(args: list[str], command: str) -> dict[str, Any] | str:
+    """Build a record from [id, age, verified, region]; return an error message on bad input."""
+    if len(args) < 4:
+        return command + " requires: id age verified region"
+    user_id = args[0]
+    try:
+        age = int(args[1])
+    except ValueError:
+        return "age must be a number"
+    verified = parse_verified(args[2])
+    region = args[3]
+    return {"id": user_id, "age": age, "verified": verified, "region": region}
+
+
+def handle_add(args: list[str], users: Store) -> str:
+    """Parse args, build a record and add it to the store; return message."""
+    rec = parse_user_args(args, "add")
+    if isinstance(rec, str):
+        return rec
+    if rec["id"] in users:
+        return "user already exists: " + rec["id"]
+    users.add(rec)
+    return "added " + str(rec["id"])
+
+
+def handle_update(args: list[str], users: Store) -> str:
+    """Parse args and overwrite an existing user's record; return message."""
+    rec = parse_user_args(args, "update")
+    if isinstance(rec, str):
+        return rec
+    if rec["id"] not in users:
+        return "user not found: " + rec["id"]
+    users.replace(rec)
+    return "updated " + str(rec["id"])
+
+
+def handle_list(users: Store, args: Sequence[str] = ()) -> str:
+    """
+    Read-only: format each user; return string. No mutation.
+    With a path, stream the listing to that file instead (text, jsonl or csv).
+    """
+    if args:
+        fmt = args[1] if len(args) > 1 else "text"
+        if fmt not in FORMATS:
+            return "list format must be one of: " + ", ".join(FORMATS)
+        try:
+            with open(args[0], "w", encoding="utf-8", newline="") as handle:
+                count = write_users(users, handle, fmt)
+        except OSError as exc:
+            return "cannot write " + args[0] + ": " + str(exc.strerror)
+        return f"wrote {count} users to {args[0]}"
+    if len(users) == 0:
+        return "no users"
+    return "\n".join(user_line(u) for u in users)
+
+
+def handle_eval(
+    args: list[str],
+    users: Store,
+    run_policy_fn: RunPolicyFn,
+    rules_list: Sequence[Rule],
+    registry: RuleRegistry | None = None,
+) -> str:
+    """
+    Look up user by id; run full policy pipeline; return formatted string.
+    With a registry, the decision comes from its current rule set, and once the
+    rules have been swapped it is tagged with the version that produced it.
+    """
+    if not args:
+        return "eval requires: user_id"
+    user_id = args[0]
+    record = users.get(user_id)
+    if record is None:
+        return "user not found: " + user_id
+    if registry is None:
+        return run_policy_fn(record, rules_list)
+    rule_set = registry.current
+    result = run_policy_fn(record, rule_set)
+    if rule_set.version == 1:
+        return result
+    return f"{result} (rules v{rule_set.version})"
+
+
+def handle_rules(args: list[str], registry: RuleRegistry | None) -> str:
+    """Show the current rule set, swap in named rules (`rules use ...`) or `rules reload`."""
+    if registry is None:
+        return "rule swapping not enabled"
+    if not args:
+        return registry.describe()
+    action = args[0].lower()
+    try:
+        if action == "use":
+            registry.use(args[1:])
+        elif action == "reload":
+            registry.reload()
+        else:
+            return "rules usage: rules | rules use <rule>... | rules reload"
+    except ValueError as exc:
+        return str(exc)
+    return registry.describe()
+
+
+LOAD_FIELDS = ("id", "age", "verified", "region")
+LOAD_FIELDS_SET = frozenset(LOAD_FIELDS)
+LOAD_BATCH_SIZE = 10_000
+# Per-row errors listed in the load command's output; the rest are only counted.
+LOAD_ERRORS_SHOWN = 10
+
+
+def _clean_chunk(chunk: list[dict[str, Any]], required: frozenset[str]) -> bool:
+    # True when every record has the load fields, a str id, an int/float age and a
+    # bool verified, checked with map() over the chunk rather than a Python loop
+    # per record.
+    if not all(map(operator.ge, map(dict.keys, chunk), repeat(required))):
+        return False
+    if not {int, float}.issuperset(map(type, map(operator.itemgetter("age"), chunk))):
+        return False
+    if not {bool}.issuperset(map(type, map(operator.itemgetter("verified"), chunk))):
+        return False
+    return {str} == set(map(type, map(operator.itemgetter("id"), chunk))) or not chunk
+
+
+def clean_record(record: dict[str, Any]) -> str | None:
+    """
+    Coerce a parsed record in place the way add and the CSV reader do (text or
+    numeric age and verified, str id); return why add would reject it, or None.
+    """
+    if not LOAD_FIELDS_SET <= record.keys():
+        return "missing " + ", ".join(f for f in LOAD_FIELDS if f not in record)
+    age = record["age"]
+    if isinstance(age, str):
+        age = record["age"] = parse_age(age)
+    if not isinstance(age, (int, float)) or isinstance(age, bool):
+        return "age must be a number"
+    if type(record["verified"]) is not bool:
+        record["verified"] = parse_verified(str(record["verified"]))
+    record["id"] = str(record["id"])
+    return None
+
+
+def load_users(
+    chunks: Iterable[list[dict[str, Any]]],
+    users: Store,
+) -> tuple[int, list[str]]:
+    """
+    Add parsed records to the store one chunk at a time (users.add_many).
+    Ages and verified flags given as text or numbers (as JSONL may carry them) are
+    coerced the way add and the CSV reader coerce them. Rows that add would reject
+    (missing fields, non-numeric age, duplicate id) are skipped and reported as
+    "record N: ..."; the rest still load.
+    Returns (records added, error messages).
+    """
+    loaded = 0
+    errors: list[str] = []
+    position = 0
+    for chunk in chunks:
+        if _clean_chunk(chunk, LOAD_FIELDS_SET):
+            try:
+                users.add_many(chunk)
+            except ValueError:
+                pass  # a duplicate id somewhere: sort it out record by record below
+            else:
+                position += len(chunk)
+                loaded += len(chunk)
+                continue
+        batch: list[dict[str, Any]] = []
+        batch_ids: set[str] = set()
+        for record in chunk:
+            position += 1
+            if "_error" in record:
+                errors.append(f"record {position}: {record['_error']}")
+                continue
+            error = clean_record(record)
+            if error is not None:
+                errors.append(f"record {position}: {error}")
+                continue
+            user_id = record["id"]
+            if user_id in batch_ids or user_id in users:
+                errors.append(f"record {position}: user already exists: {user_id}")
+                continue
+            batch_ids.add(user_id)
+            batch.append(record)
+        users.add_many(batch)
+        loaded += len(batch)
+    return loaded, errors
+
+
+def handle_load(args: list[str], users: Store) -> str:
+    """Bulk-add users from a CSV or JSONL file; return a summary with the first errors."""
+    if not args:
+        return "load requires: path"
+    path = args[0]
+    # Loading only allocates records the store keeps, so pause the cyclic GC
+    # (as persist.read_snapshot does) instead of letting it rescan them.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(path, encoding="utf-8", newline="", buffering=BUFFER_SIZE) as handle:
+            chunks = read_record_chunks(handle, detect_format(path), LOAD_BATCH_SIZE)
+            loaded, errors = load_users(chunks, users)
+    except OSError as exc:
+        return "cannot read " + path + ": " + str(exc.strerror)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    lines = [f"loaded {loaded} users from {path}, {len(errors)} errors"]
+    lines.extend(errors[:LOAD_ERRORS_SHOWN])
+    if len(errors) > LOAD_ERRORS_SHOWN:
+        lines.append(f"... and {len(errors) - LOAD_ERRORS_SHOWN} more")
+    return "\n".join(lines)
+
+
+def handle_report(
+    args: list[str],
+    users: Store,
+    rules_list: Sequence[Rule],
+    registry: RuleRegistry | None = None,
+) -> str:
+    """Read-only: allow/deny totals and reason counts over every user, optionally by a field."""
+    as_json = bool(args) and args[-1].lower() == "json"
+    if as_json:
+        args = args[:-1]
+    try:
+        from report import population_report
+    except ImportError:
+        return "report needs numpy"
+    rule_set = registry.current if registry is not None else rules_list
+    report = population_report(users, rule_set, args[0] if args else None)
+    return report.to_json() if as_json else report.dump_text()
+
+
+def handle_metrics(args: list[str], metrics: PolicyMetrics | None) -> str:
+    """Read-only: dump collected pipeline metrics as text, or JSON with `metrics json`."""
+    if metrics is None:
+        return "metrics not enabled (start with --metrics)"
+    if args and args[0].lower() == "json":
+        return metrics.to_json()
+    return metrics.dump_text() or "no metrics yet"
+
+
+def dispatch(
+    line: str,
+    users: Store,
+    rules_list: Sequence[Rule],
+    run_policy_fn: RunPolicyFn,
+    metrics: PolicyMetrics | None = None,
+    registry: RuleRegistry | None = None,
+) -> str | None:
+    """
+    Run one command line. Return the output, "" for a blank line, None on quit.
+    eval uses registry's current rule set when one is given, else rules_list.
+    """
+    line = line.strip()
+    if not line:
+        return ""
+    parts = line.split()
+    cmd = parts[0].lower()
+    cmd_args = parts[1:] if len(parts) > 1 else []
+
+    if cmd == "quit":
+        return None
+    if cmd == "add":
+        return handle_add(cmd_args, users)
+    if cmd == "update":
+        return handle_update(cmd_args, users)
+    if cmd == "load":
+        return handle_load(cmd_args, users)
+    if cmd == "list":
+        return handle_list(users, cmd_args)
+    if cmd == "eval":
+        return handle_eval(cmd_args, users, run_policy_fn, rules_list, registry)
+    if cmd == "rules":
+        return handle_rules(cmd_args, registry)
+    if cmd == "report":
+        return handle_report(cmd_args, users, rules_list, registry)
+    if cmd == "metrics":
+        return handle_metrics(cmd_args, metrics)
+    return "unknown command: " + cmd
+
+
+def run_session(
+    lines: Iterable[str],
+    users: Store,
+    rules_list: Sequence[Rule] = DEFAULT_RULES,
+    run_policy_fn: RunPolicyFn = run_policy,
+    metrics: PolicyMetrics | None = None,
+    registry: RuleRegistry | None = None,
+) -> list[str]:
+    """Run commands from an iterable instead of input(); return every output line."""
+    if registry is None:
+        registry = RuleRegistry(rules_list)
+    outputs: list[str] = []
+    for line in lines:
+        out = dispatch(line, users, rules_list, run_policy_fn, metrics, registry)
+        if out is None:
+            outputs.append("bye")
+            break
+        if out:
+            outputs.append(out)
+    return outputs
+
+
+def main_cli(
+    users: Store,
+    rules_list: Sequence[Rule] = DEFAULT_RULES,
+    run_policy_fn: RunPolicyFn = run_policy,
+    metrics: PolicyMetrics | None = None,
+    registry: RuleRegistry | None = None,
+) -> None:
+    """Command loop: read line, dispatch, print result. I/O only here."""
+    if registry is None:
+        registry = RuleRegistry(rules_list)
+    print(COMMANDS_HELP)
+    while True:
+        try:
+            line = input("> ")
+        except EOFError:
+            break
+        out = dispatch(line, users, rules_list, run_policy_fn, metrics, registry)
+        if out is None:
+            print("bye")
+            break
+        if out:
+            print(out)
@@ -0,0 +1,299 @@
+"""
+Columnar user store: the UserStore interface over typed arrays instead of dicts.
+
+A dict per user costs a few hundred bytes (the dict, its id string, a float or
+int object per age) and a 50M-user population does not fit. ColumnarUserStore
+keeps one column per field of the standard record shape {"id", "age",
+"verified", "region"}:
+    id        UTF-8 bytes of every id back to back, plus an offset per row
+    age       array of doubles, with a bitset marking ages that were floats
+    verified  bitset
+    region    one small int per row into a table of distinct region strings
+and finds a row by id through an open-addressing hash table of row numbers, so
+a stored user costs roughly its id length plus 20-30 bytes.
+
+Records of any other shape (extra or missing fields, a non-str id or region,
+a non-bool verified, an age that is not an int or float or too large for a
+double) are kept whole in a side dict, as persist._split_columns does, so every
+record round-trips with equal values of the same types (columnar rows come
+back with their keys in COLUMN_FIELDS order, as from a persist snapshot).
+
+Rows are materialized as new dicts only when asked for (get, iteration, find):
+changing a returned dict does not change the store, use replace() for that.
+find() scans the columns instead of keeping secondary indexes (so a replaced
+record keeps its original place in the results, where UserStore moves it last).
+"""
+
+from array import array
+from typing import Any, Iterator, Sequence
+
+COLUMN_FIELDS = ("id", "age", "verified", "region")
+_COLUMN_SET = frozenset(COLUMN_FIELDS)
+_MAX_EXACT_INT = 1 << 53
+# Rows materialized per block while iterating.
+_ITER_ROWS = 4096
+# Region code arrays, widened as the number of distinct regions grows.
+_CODE_TYPES = (("B", 1 << 8), ("H", 1 << 16), ("I", 1 << 32))
+
+
+def _columnar(record: dict[str, Any]) -> bool:
+    # True when the record has exactly the column fields, with types the columns
+    # reproduce exactly.
+    if record.keys() != _COLUMN_SET:
+        return False
+    age = record["age"]
+    age_type = type(age)
+    return (type(record["id"]) is str and type(record["verified"]) is bool
+            and type(record["region"]) is str
+            and (age_type is float
+                 or (age_type is int and -_MAX_EXACT_INT <= age <= _MAX_EXACT_INT)))
+
+
+class ColumnarUserStore:
+    """Id-indexed, insertion-ordered user store with the same interface as store.UserStore."""
+
+    def __init__(self, index_fields: Sequence[str] = ()) -> None:
+        # find() works on any field by scanning; index_fields keeps UserStore's
+        # contract that only declared fields can be searched.
+        self.index_fields = tuple(index_fields)
+        self._count = 0
+        self._id_bytes = bytearray()
+        self._id_offsets = array("q", [0])
+        self._age = array("d")
+        self._age_float = bytearray()
+        self._verified = bytearray()
+        self._regions: list[str] = []
+        self._region_codes: dict[str, int] = {}
+        self._region = array("B")
+        self._others: dict[int, dict[str, Any]] = {}
+        # Open addressing, linear probing: row + 1 per slot, 0 = empty. Kept at
+        # most half full.
+        self._slots = array("i", bytes(4 * 8))
+        self._mask = 7
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, user_id: object) -> bool:
+        return self._find_row(str(user_id)) >= 0
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        # Materialize a block of rows at a time: one decode for the block's ids,
+        # array slices for the columns, then one dict per row.
+        for start in range(0, self._count, _ITER_ROWS):
+            yield from self._rows(start, min(start + _ITER_ROWS, self._count))
+
+    def _rows(self, start: int, end: int) -> list[dict[str, Any]]:
+        offsets = self._id_offsets[start:end + 1]
+        base = offsets[0]
+        text = self._id_bytes[base:offsets[-1]].decode()
+        if len(text) == offsets[-1] - base:  # all ASCII: byte offsets are str offsets
+            ids = [text[a - base:b - base] for a, b in zip(offsets, offsets[1:])]
+        else:
+            ids = [self._id_bytes[a:b].decode() for a, b in zip(offsets, offsets[1:])]
+        regions = self._regions
+        age_float = self._age_float
+        verified = self._verified
+        others = self._others
+        rows = []
+        for row, user_id, age, code in zip(range(start, end), ids, self._age[start:end],
+                                           self._region[start:end]):
+            if others and row in others:
+                rows.append(others[row])
+                continue
+            bit = 1 << (row & 7)
+            rows.append({
+                "id": user_id,
+                "age": age if age_float[row >> 3] & bit else int(age),
+                "verified": verified[row >> 3] & bit != 0,
+                "region": regions[code],
+            })
+        return rows
+
+    # -- id index ----------------------------------------------------------
+
+    def _id_at(self, row: int) -> bytearray:
+        return self._id_bytes[self._id_offsets[row]:self._id_offsets[row + 1]]
+
+    def _find_row(self, key: str) -> int:
+        """Row holding id key, or -1."""
+        encoded = key.encode()
+        slots = self._slots
+        mask = self._mask
+        id_bytes = self._id_bytes
+        offsets = self._id_offsets
+        slot = hash(key) & mask
+        while True:
+            row = slots[slot] - 1
+            if row < 0:
+                return -1
+            if id_bytes[offsets[row]:offsets[row + 1]] == encoded:
+                return row
+            slot = (slot + 1) & mask
+
+    def _index_row(self, key: str, row: int) -> None:
+        slots = self._slots
+        mask = self._mask
+        slot = hash(key) & mask
+        while slots[slot]:
+            slot = (slot + 1) & mask
+        slots[slot] = row + 1
+
+    def _reserve(self, rows: int) -> None:
+        # Grow the hash table (rehashing every id) so rows more fit at <= 1/2 load.
+        needed = 2 * (self._count + rows)
+        if needed <= self._mask + 1:
+            return
+        size = self._mask + 1
+        while size < needed:
+            size *= 2
+        self._slots = array("i", bytes(4 * size))
+        self._mask = size - 1
+        data = self._id_bytes.decode()
+        if len(data) == len(self._id_bytes):  # all ASCII: byte offsets are str offsets
+            offsets = self._id_offsets
+            for row in range(self._count):
+                self._index_row(data[offsets[row]:offsets[row + 1]], row)
+        else:
+            for row in range(self._count):
+                self._index_row(self._id_at(row).decode(), row)
+
+    # -- columns -----------------------------------------------------------
+
+    def _region_code(self, region: str) -> int:
+        code = self._region_codes.get(region)
+        if code is None:
+            code = self._region_codes[region] = len(self._regions)
+            self._regions.append(region)
+            for typecode, limit in _CODE_TYPES:
+                if code < limit:
+                    if typecode != self._region.typecode:
+                        self._region = array(typecode, self._region)
+                    break
+        return code
+
+    def _set_bit(self, bits: bytearray, row: int, value: bool) -> None:
+        if value:
+            bits[row >> 3] |= 1 << (row & 7)
+        else:
+            bits[row >> 3] &= ~(1 << (row & 7)) & 0xFF
+
+    def _store_columns(self, row: int, record: dict[str, Any]) -> None:
+        # Write a columnar record's age, verified and region into an existing row.
+        age = record["age"]
+        self._age[row] = age
+        self._set_bit(self._age_float, row, type(age) is float)
+        self._set_bit(self._verified, row, record["verified"])
+        self._region[row] = self._region_code(record["region"])
+
+    def _append(self, key: str, record: dict[str, Any]) -> None:
+        row = self._count
+        self._id_bytes += key.encode()
+        self._id_offsets.append(len(self._id_bytes))
+        if row & 7 == 0:
+            self._age_float.append(0)
+            self._verified.append(0)
+        if _columnar(record):
+            # New bits start clear: only set the ones that are true.
+            age = record["age"]
+            self._age.append(age)
+            if type(age) is float:
+                self._age_float[row >> 3] |= 1 << (row & 7)
+            if record["verified"]:
+                self._verified[row >> 3] |= 1 << (row & 7)
+            code = self._region_code(record["region"])  # may widen self._region
+            self._region.append(code)
+        else:
+            self._age.append(0.0)
+            self._region.append(0)
+            self._others[row] = record
+        self._index_row(key, row)
+        self._count = row + 1
+
+    def _row(self, row: int) -> dict[str, Any]:
+        other = self._others.get(row)
+        if other is not None:
+            return other
+        age = self._age[row]
+        bit = 1 << (row & 7)
+        return {
+            "id": self._id_at(row).decode(),
+            "age": age if self._age_float[row >> 3] & bit else int(age),
+            "verified": self._verified[row >> 3] & bit != 0,
+            "region": self._regions[self._region[row]],
+        }
+
+    # -- UserStore interface ------------------------------------------------
+
+    def add(self, record: dict[str, Any]) -> None:
+        """Insert a new record. Raises ValueError if its id is already stored."""
+        key = str(record["id"])
+        if self._find_row(key) >= 0:
+            raise ValueError("duplicate id: " + key)
+        self._reserve(1)
+        self._append(key, record)
+
+    def add_many(self, records: Sequence[dict[str, Any]]) -> None:
+        """
+        Insert a batch of new records. Raises ValueError (and adds nothing) on any
+        duplicate id.
+        """
+        keys = [str(record["id"]) for record in records]
+        if len(set(keys)) != len(keys) or any(self._find_row(key) >= 0 for key in keys):
+            raise ValueError("duplicate id in batch")
+        self._reserve(len(keys))
+        for key, record in zip(keys, records):
+            self._append(key, record)
+
+    def replace(self, record: dict[str, Any]) -> dict[str, Any] | None:
+        """Insert or overwrite the record with this id; return the old record, if any."""
+        key = str(record["id"])
+        row = self._find_row(key)
+        if row < 0:
+            self._reserve(1)
+            self._append(key, record)
+            return None
+        old = self._row(row)
+        if _columnar(record):
+            self._others.pop(row, None)
+            self._store_columns(row, record)
+        else:
+            self._others[row] = record
+        return old
+
+    def get(self, user_id: object) -> dict[str, Any] | None:
+        """Return the record with this id (a new dict for columnar rows), or None."""
+        row = self._find_row(str(user_id))
+        return None if row < 0 else self._row(row)
+
+    def find(self, field: str, value: Any) -> list[dict[str, Any]]:
+        """Return records whose field equals value, in insertion order."""
+        if field not in self.index_fields:
+            raise KeyError("no index on field: " + field)
+        others = self._others
+        if field == "region":
+            # Columnar regions are str: only a str can match one, and only
+            # through its code.
+            code = self._region_codes.get(value) if type(value) is str else None
+            rows = ([] if code is None else
+                    [row for row, row_code in enumerate(self._region) if row_code == code])
+        elif field == "verified":
+            # Columnar verified is a bool: value must equal (and hash as) True or False.
+            if value in (True, False) and type(value) in (bool, int, float):
+                want = bool(value)
+                verified = self._verified
+                rows = [row for row in range(self._count)
+                        if bool(verified[row >> 3] & 1 << (row & 7)) is want]
+            else:
+                rows = []
+        elif field in COLUMN_FIELDS:
+            rows = [row for row in range(self._count)
+                    if row not in others and self._row(row)[field] == value]
+        else:
+            # Columnar rows have no such field: record.get(field) is None.
+            rows = list(range(self._count)) if value is None else []
+        matches = [row for row in rows if row not in others]
+        if others:
+            matches.extend(row for row, record in others.items() if record.get(field) == value)
+            matches.sort()
+        return [self._row(row) for row in matches]
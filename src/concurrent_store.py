@@ -0,0 +1,98 @@
+"""
+Thread-safe user store: lock-free readers, serialized writers.
+
+ConcurrentUserStore is a UserStore that any number of threads can read while
+others add and update:
+    - Writers (add, add_many, replace) run one at a time under a lock and bump a
+      version number once their change is complete.
+    - Point reads (get, `in`, len) take no lock. Each is a single dict operation,
+      atomic under the GIL and internally synchronized on free-threaded builds,
+      and writers never modify a stored record in place (replace stores a new
+      dict), so a reader sees a whole record or none.
+    - Iteration goes through snapshot(): an immutable copy of the id -> record
+      dict taken under the writer lock, so a listing never sees half of an
+      add_many batch or an index update in progress. The copy is shared by all
+      readers until the next write, so read-mostly workloads copy rarely and
+      readers never wait on each other.
+    - find() reads the secondary indexes, which writers update in place, so it
+      runs under the writer lock.
+"""
+
+import threading
+from typing import Any, Iterator, Sequence
+
+from store import UserStore
+
+
+class StoreSnapshot:
+    """Read-only view of a store's records as of one version."""
+
+    __slots__ = ("version", "_by_id")
+
+    def __init__(self, by_id: dict[str, dict[str, Any]], version: int) -> None:
+        self._by_id = by_id
+        self.version = version
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return iter(self._by_id.values())
+
+    def __contains__(self, user_id: object) -> bool:
+        return str(user_id) in self._by_id
+
+    def get(self, user_id: object) -> dict[str, Any] | None:
+        return self._by_id.get(str(user_id))
+
+
+class ConcurrentUserStore(UserStore):
+    """UserStore safe for many reader threads and concurrent writers."""
+
+    def __init__(self, index_fields: Sequence[str] = ()) -> None:
+        super().__init__(index_fields)
+        self._write_lock = threading.Lock()
+        self._version = 0
+        self._snapshot = StoreSnapshot({}, 0)
+        self.snapshot_copies = 0
+
+    @property
+    def version(self) -> int:
+        """Number of completed writes."""
+        return self._version
+
+    def add(self, record: dict[str, Any]) -> None:
+        with self._write_lock:
+            super().add(record)
+            self._version += 1
+
+    def add_many(self, records: Sequence[dict[str, Any]]) -> None:
+        with self._write_lock:
+            super().add_many(records)
+            self._version += 1
+
+    def replace(self, record: dict[str, Any]) -> dict[str, Any] | None:
+        with self._write_lock:
+            old = super().replace(record)
+            self._version += 1
+        return old
+
+    def find(self, field: str, value: Any) -> list[dict[str, Any]]:
+        with self._write_lock:
+            return super().find(field, value)
+
+    def snapshot(self) -> StoreSnapshot:
+        """Every record as of the latest completed write; shared until the next one."""
+        snap = self._snapshot
+        if snap.version == self._version:
+            return snap
+        with self._write_lock:
+            snap = self._snapshot
+            if snap.version != self._version:
+                snap = StoreSnapshot(self._by_id.copy(), self._version)
+                self._snapshot = snap
+                self.snapshot_copies += 1
+        return snap
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return iter(self.snapshot())
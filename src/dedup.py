@@ -0,0 +1,148 @@
+"""
+Equivalence-class deduplication for batch evaluation.
+
+Records that agree on every field validate and the rules read (policy.fields_read)
+get the same validation result and decision whatever their id. decide_deduped
+therefore keys each record by that projection, runs validate + the compiled rules
+once per distinct key, and hands the memoized result back for every later record
+with the same key, in input order.
+
+The key pairs each value with its type, since 1, 1.0 and True compare equal but
+rules can treat them differently (as in cache.fingerprint). Records with an
+unhashable value in a key field are evaluated on their own. When a rule has no
+declared fields the projection is unknown, so every record is evaluated.
+
+Memory is bounded by max_classes: once that many distinct keys are memoized the
+memo is cleared and refilled, so it never grows without bound. If the memo fills
+up having saved fewer evaluations than it made, the input is too varied to be
+worth keying, and the rest of the run evaluates every record directly.
+DedupStats reports the ratio.
+"""
+
+from functools import lru_cache
+from typing import Any, Callable, Hashable, Iterable, Iterator, Mapping, Sequence
+
+from output import BulkWriter
+from policy import Rule, compile_rules, fields_read, validate
+
+DEFAULT_MAX_CLASSES = 100_000
+
+_MISSING = object()
+
+
+class DedupStats:
+    """Counts for one or more deduplicated runs."""
+
+    __slots__ = ("records", "evaluated", "resets", "bypassed")
+
+    def __init__(self) -> None:
+        self.records = 0
+        self.evaluated = 0
+        self.resets = 0
+        self.bypassed = 0  # runs that stopped deduplicating (see the module docstring)
+
+    @property
+    def ratio(self) -> float:
+        """Records per evaluation (1.0 = nothing deduplicated)."""
+        return self.records / self.evaluated if self.evaluated else 1.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "records": self.records,
+            "evaluated": self.evaluated,
+            "dedup_ratio": self.ratio,
+            "memo_resets": self.resets,
+            "bypassed": self.bypassed,
+        }
+
+
+@lru_cache(maxsize=64)
+def projection_key(fields: tuple[str, ...]) -> Callable[[dict[str, Any]], Hashable]:
+    """Function returning the (value, type) key of a record over fields."""
+    # Generated once per field tuple: one local per field, then one tuple display.
+    names = [f"v{i}" for i in range(len(fields))]
+    lines = ["def key(record):", "    get = record.get"]
+    lines.extend(f"    {name} = get({field!r}, MISSING)" for name, field in zip(names, fields))
+    lines.append("    return (" + "".join(f"{name}, type({name}), " for name in names) + ")")
+    namespace: dict[str, Any] = {"MISSING": _MISSING}
+    exec("\n".join(lines), namespace)  # pylint: disable=exec-used
+    return namespace["key"]
+
+
+def decide_deduped(
+    records: Iterable[dict[str, Any]],
+    rule_list: Sequence[Rule],
+    max_classes: int = DEFAULT_MAX_CLASSES,
+    stats: DedupStats | None = None,
+) -> Iterator[tuple[dict[str, Any], Mapping[str, Any]]]:
+    """
+    Yield (record, validation failure or Decision) for each record, in order,
+    evaluating each distinct rule-relevant projection once. Counts go to stats.
+    """
+    if max_classes < 1:
+        raise ValueError("max_classes must be at least 1")
+    if stats is None:
+        stats = DedupStats()
+    evaluate_fn = compile_rules(rule_list)
+    fields = fields_read(rule_list)
+    key_fn = projection_key(fields) if fields is not None else None
+    memo: dict[Hashable, Mapping[str, Any]] = {}
+    count = evaluated = hits = 0
+    try:
+        for record in records:
+            count += 1
+            if key_fn is not None:
+                key = key_fn(record)
+                try:
+                    decision = memo.get(key)
+                except TypeError:  # unhashable value: evaluate, don't memoize
+                    key = None
+                    decision = None
+                if decision is not None:
+                    hits += 1
+                    yield record, decision
+                    continue
+            else:
+                key = None
+            evaluated += 1
+            decision = validate(record)
+            if decision["valid"]:
+                decision = evaluate_fn(record)
+            if key is not None:
+                if len(memo) >= max_classes:
+                    memo.clear()
+                    stats.resets += 1
+                    if hits < max_classes:  # saved fewer evaluations than it made
+                        key_fn = None
+                        stats.bypassed += 1
+                    hits = 0
+                if key_fn is not None:
+                    memo[key] = decision
+            yield record, decision
+    finally:
+        stats.records += count
+        stats.evaluated += evaluated
+
+
+def write_decisions_deduped(
+    records: Iterable[dict[str, Any]],
+    rule_list: Sequence[Rule],
+    writer: BulkWriter,
+    stats: DedupStats | None = None,
+    max_classes: int = DEFAULT_MAX_CLASSES,
+) -> int:
+    """stream.write_decisions with decide_deduped doing the evaluation."""
+    start = writer.rows
+
+    def parsed(rows: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+        # Parse-error rows are written in place (this runs between two yields of
+        # decide_deduped, so order is kept) and never reach the evaluator.
+        for record in rows:
+            if "_error" in record:
+                writer.write_row({"id": None, "error": record["_error"]})
+                continue
+            yield record
+
+    for record, decision in decide_deduped(parsed(records), rule_list, max_classes, stats):
+        writer.write_decision(record.get("id"), decision)
+    return writer.rows - start
@@ -0,0 +1,195 @@
+"""
+Large deny-lists as membership rules, backed by a memory-mapped file.
+
+A deny-list (regions, user ids, device fingerprints, ...) is built once from a
+text file with one key per line into a compact binary file:
+
+    header     magic, version, entry count, Bloom size in words, directory bits
+    directory  start offset into `hashes` for each value of the hash's top bits
+    bloom      optional blocked Bloom filter (omitted when bloom_bits_per_key=0)
+    hashes     sorted unique 64-bit BLAKE2b hashes of the keys
+
+DenyList opens that file with mmap, so "loading" costs nothing up front. The OS
+loads pages as lookups touch them, and every process that opens the same file
+shares one copy in the page cache. A lookup checks the Bloom filter first, which
+settles most misses with a single 64-bit word read. It then uses the directory to
+find the few hashes sharing the key's top bits and binary-searches only those.
+When the file is warm in the page cache the directory search is already about as
+cheap as the Bloom probe. The filter (10 bits per key gives ~2% false positives)
+pays off when most lookups miss and the file is larger than memory, so that a
+rejected lookup never faults in a page of the hash array.
+
+Keys are stored as 64-bit hashes, not text, so two different keys could collide.
+At 10M entries the chance that a given non-member matches is about 5e-13.
+Files use native byte order and are meant to be shared between processes on one
+machine.
+
+membership_rule() turns a DenyList into a rule like rule_region: it fails when
+str(record[field]) is in the list and passes when the field is missing.
+"""
+
+import mmap
+import struct
+from array import array
+from bisect import bisect_left
+from hashlib import blake2b
+from typing import Any, Iterable, Iterator, Mapping
+
+from policy import Rule, declare_fields
+from results import PASSED, failed, reason_code
+
+MAGIC = b"GTDL"
+VERSION = 2  # 2: Bloom block index from hash bits 36-63, clear of the mask bits
+# magic, version, entry count, bloom words, directory bits (+ padding to 32 bytes)
+_HEADER = struct.Struct("=4sIQQI4x")
+# About this many entries per directory bucket, so each bisect is a few steps.
+_ENTRIES_PER_BUCKET = 8
+_MAX_DIRECTORY_BITS = 24
+
+
+def key_hash(key: str) -> int:
+    """Stable 64-bit hash of a key (the same in every process, unlike hash())."""
+    return int.from_bytes(blake2b(key.encode(), digest_size=8).digest(), "little")
+
+
+def _bloom_mask(h: int) -> int:
+    # Blocked Bloom filter: six bits from the low 36 bits of the hash, all in one
+    # 64-bit word (picked by _bloom_block), so a probe is a single word read.
+    return (1 << (h & 63) | 1 << (h >> 6 & 63) | 1 << (h >> 12 & 63)
+            | 1 << (h >> 18 & 63) | 1 << (h >> 24 & 63) | 1 << (h >> 30 & 63))
+
+
+def _bloom_block(h: int, words: int) -> int:
+    # From the bits above the mask's, so the word and the bits in it are independent.
+    return (h >> 36) % words
+
+
+def _directory_bits(count: int) -> int:
+    return min(_MAX_DIRECTORY_BITS, max(0, (count // _ENTRIES_PER_BUCKET).bit_length()))
+
+
+def read_keys(path: str) -> Iterator[str]:
+    """Keys from a text file: one per line, blank lines and #-comments skipped."""
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            key = line.strip()
+            if key and not key.startswith("#"):
+                yield key
+
+
+def build_denylist(
+    keys: Iterable[str],
+    path: str,
+    bloom_bits_per_key: int = 0,
+) -> int:
+    """Write the deny-list file for keys; return the number of distinct entries."""
+    hashes = array("Q", sorted({key_hash(key) for key in keys}))
+    count = len(hashes)
+
+    # directory[b] is the index of the first hash whose top bits are >= b.
+    bits = _directory_bits(count)
+    shift = 64 - bits
+    directory = array("Q", (bisect_left(hashes, b << shift) for b in range(1 << bits)))
+    directory.append(count)
+
+    bloom_words = -(-count * bloom_bits_per_key // 64) if bloom_bits_per_key else 0
+    bloom = array("Q", bytes(8 * bloom_words))
+    for h in hashes if bloom_words else ():
+        bloom[_bloom_block(h, bloom_words)] |= _bloom_mask(h)
+
+    with open(path, "wb") as handle:
+        handle.write(_HEADER.pack(MAGIC, VERSION, count, bloom_words, bits))
+        handle.write(directory.tobytes())
+        handle.write(bloom.tobytes())
+        handle.write(hashes.tobytes())
+    return count
+
+
+def build_denylist_file(
+    source_path: str,
+    path: str,
+    bloom_bits_per_key: int = 0,
+) -> int:
+    """build_denylist over the keys of a one-key-per-line text file."""
+    return build_denylist(read_keys(source_path), path, bloom_bits_per_key)
+
+
+class DenyList:
+    """Read-only, memory-mapped set of keys built by build_denylist."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, "rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, bloom_words, bits = _HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError("not a deny-list file: " + path)
+        words = memoryview(self._map)[_HEADER.size:].cast("Q")
+        directory_end = (1 << bits) + 1
+        self._directory = words[:directory_end]
+        self._bloom = words[directory_end:directory_end + bloom_words]
+        self._hashes = words[directory_end + bloom_words:directory_end + bloom_words + count]
+        words.release()
+        self._count = count
+        self._bloom_words = bloom_words
+        self._shift = 64 - bits
+        self.bloom_rejects = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: object) -> bool:
+        h = key_hash(str(key))
+        if self._bloom_words:
+            mask = _bloom_mask(h)
+            if self._bloom[_bloom_block(h, self._bloom_words)] & mask != mask:
+                self.bloom_rejects += 1
+                return False
+        bucket = h >> self._shift
+        directory = self._directory
+        hi = directory[bucket + 1]
+        i = bisect_left(self._hashes, h, directory[bucket], hi)
+        return i < hi and self._hashes[i] == h
+
+    def close(self) -> None:
+        self._directory.release()
+        self._bloom.release()
+        self._hashes.release()
+        self._map.close()
+
+    def __enter__(self) -> "DenyList":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def __reduce__(self) -> tuple[type, tuple[str]]:
+        # Worker processes reopen (and share) the same file instead of copying it.
+        return (DenyList, (self.path,))
+
+
+class MembershipRule:
+    """Rule: record[field] must not be in the deny-list."""
+
+    def __init__(self, field: str, denylist: DenyList, reason: str) -> None:
+        self.field = field
+        self.denylist = denylist
+        self.reason = reason
+        # A stable name for rule_name (metrics, report and rules labels).
+        self.__name__ = self.__qualname__ = "deny_" + field
+        self._failed = failed(reason_code(reason))
+
+    def __call__(self, record: dict[str, Any]) -> Mapping[str, Any]:
+        value = record.get(self.field)
+        if value is None or value not in self.denylist:
+            return PASSED
+        return self._failed
+
+    def __reduce__(self) -> tuple[type, tuple[str, DenyList, str]]:
+        return (MembershipRule, (self.field, self.denylist, self.reason))
+
+
+def membership_rule(field: str, denylist: DenyList, reason: str) -> Rule:
+    """Build a deny-list rule and declare the field it reads."""
+    return declare_fields(MembershipRule(field, denylist, reason), (field,))
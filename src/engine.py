@@ -1,4 +1,348 @@
-def main() -> None:
+"""
+Command-line entry point: `cli`, `eval` and `serve` subcommands.
+
+Launched once per job, so startup time counts. Modules are imported inside the
+command that needs them (asyncio only for serve, the process pool only for
+eval --workers N, ...), and the compiled rule evaluator comes from a cached rule
+bundle (see bundle.py) instead of being generated and compiled on every launch.
+"""
+
+import argparse
+import os
+import sys
+from typing import TYPE_CHECKING
+
+from policy import DEFAULT_RULES
+
+if TYPE_CHECKING:
+    from dedup import DedupStats
+    from policy import Rule
+    from shadow import Shadow
+    from metrics import PolicyMetrics
+
+# Mirrors persist.FSYNC_POLICIES and output.FORMATS, so building the parser does
+# not import those modules.
+FSYNC_CHOICES = ("always", "batch", "never")
+OUTPUT_FORMATS = ("text", "jsonl", "csv")
+
+
+class _HelpFormatter(argparse.HelpFormatter):
+    """
+    argparse.HelpFormatter minus its `import shutil` (and shutil's compression
+    modules): argparse builds a formatter for every add_argument call.
+    """
+
+    def __init__(self, prog: str, indent_increment: int = 2, max_help_position: int = 24,
+                 width: int | None = None) -> None:
+        if width is None:
+            try:
+                width = int(os.environ.get("COLUMNS", "")) - 2
+            except ValueError:
+                try:
+                    width = os.get_terminal_size(sys.__stdout__.fileno()).columns - 2
+                except (AttributeError, OSError, ValueError):
+                    width = 78
+        super().__init__(prog, indent_increment, max_help_position, width)
+
+
+def _int_at_least(text: str, minimum: int) -> int:
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {text!r}") from None
+    if value < minimum:
+        raise argparse.ArgumentTypeError(f"must be at least {minimum}, got {value}")
+    return value
+
+
+def positive_int(text: str) -> int:
+    """argparse type for counts that must be at least 1 (a usage error otherwise)."""
+    return _int_at_least(text, 1)
+
+
+def non_negative_int(text: str) -> int:
+    """argparse type for sizes where 0 means off (a usage error below 0)."""
+    return _int_at_least(text, 0)
+
+
+def run_eval(
+    input_path: str,
+    output_path: str,
+    fmt: str | None,
+    workers: int = 1,
+    chunk_size: int | None = None,
+    metrics: "PolicyMetrics | None" = None,
+    first_deny: bool = False,
+    output_format: str = "jsonl",
+    dedup: "DedupStats | None" = None,
+    shadow: "Shadow | None" = None,
+) -> int:
+    """
+    Stream records from input_path to decisions in output_path ("-" = stdin/stdout).
+    With workers > 1, chunks of records are evaluated in a process pool; order is kept
+    (chunk_size defaults to parallel.DEFAULT_CHUNK_SIZE).
+    With first_deny, rows carry only allow/deny, from an AdaptiveGate.
+    output_format is "jsonl", "text" or "csv" (see output.BulkWriter).
+    With dedup, records equal on every field the rules read are evaluated once
+    (see dedup.py); its counts are added to the given DedupStats.
+    With shadow, the output is shadow.primary's decisions and shadow.candidate is
+    compared in the same pass (see shadow.py).
+    """
+    from output import BulkWriter
+    from stream import BUFFER_SIZE, decide_stream, detect_format, read_records, write_decisions
+
+    if fmt is None:
+        fmt = detect_format(input_path)
+    if input_path == "-":
+        in_handle = sys.stdin
+    else:
+        in_handle = open(input_path, encoding="utf-8", newline="", buffering=BUFFER_SIZE)
+    if output_path == "-":
+        out_handle = sys.stdout
+    else:
+        out_handle = open(output_path, "w", encoding="utf-8", buffering=BUFFER_SIZE)
+    try:
+        records = read_records(in_handle, fmt)
+        with BulkWriter(out_handle, output_format) as writer:
+            if first_deny:
+                from adaptive import AdaptiveGate
+                from stream import gate_stream
+                rows = gate_stream(records, AdaptiveGate(DEFAULT_RULES))
+            elif shadow is not None:
+                from shadow import write_decisions_shadow
+                return write_decisions_shadow(records, shadow, writer)
+            elif dedup is not None:
+                from dedup import write_decisions_deduped
+                return write_decisions_deduped(records, DEFAULT_RULES, writer, dedup)
+            elif workers == 1 and metrics is None:
+                return write_decisions(records, DEFAULT_RULES, writer)
+            elif workers == 1:
+                rows = decide_stream(records, DEFAULT_RULES, metrics)
+            else:
+                from functools import partial
+
+                from parallel import DEFAULT_CHUNK_SIZE, map_chunks
+                from stream import decide_rows
+                chunk_fn = partial(decide_rows, rule_list=DEFAULT_RULES)
+                rows = map_chunks(records, chunk_fn, workers, chunk_size or DEFAULT_CHUNK_SIZE)
+            for row in rows:
+                writer.write_row(row)
+            return writer.rows
+    finally:
+        if in_handle is not sys.stdin:
+            in_handle.close()
+        if out_handle is not sys.stdout:
+            out_handle.close()
+
+
+def _candidate_rules(parser: argparse.ArgumentParser, spec: str) -> "list[Rule]":
+    # --shadow's comma-separated rule names (see ruleset.resolve_rule).
+    from ruleset import resolve_rule
+    try:
+        return [resolve_rule(name.strip()) for name in spec.split(",") if name.strip()]
+    except ValueError as exc:
+        parser.error(f"--shadow: {exc}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="engine.py", formatter_class=_HelpFormatter)
+    parser.add_argument("--rule-cache", default=None, metavar="DIR",
+                        help="directory for the compiled rule bundle (default: $POLICY_RULE_CACHE,"
+                             " else ~/.cache/policy-engine)")
+    sub = parser.add_subparsers(dest="command")
+    cli_parser = sub.add_parser("cli", formatter_class=_HelpFormatter,
+                                help="interactive add/list/eval session")
+    cli_parser.add_argument("--cache-size", type=non_negative_int, default=0,
+                            help="LRU decision cache entries (default: 0, no cache)")
+    cli_parser.add_argument("--data-dir", default=None,
+                            help="keep users on disk in this directory (default: memory only)")
+    cli_parser.add_argument("--columnar", action="store_true",
+                            help="keep users in typed columns (see columnar_store.py)")
+    cli_parser.add_argument("--fsync", choices=FSYNC_CHOICES, default="batch",
+                            help="when to fsync the on-disk log (default: batch)")
+    cli_parser.add_argument("--metrics", action="store_true",
+                            help="record per-stage/per-rule metrics (see the metrics command)")
+    cli_parser.add_argument("--shadow", default=None, metavar="RULES",
+                            help="also evaluate these comma-separated rules and summarize"
+                                 " the differences on exit")
+    eval_parser = sub.add_parser("eval", formatter_class=_HelpFormatter,
+                                 help="stream records from a file through the policy")
+    eval_parser.add_argument("--input", default="-", help="JSONL or CSV file (default: stdin)")
+    eval_parser.add_argument("--output", default="-", help="decisions file (default: stdout)")
+    eval_parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default="jsonl",
+                             help="decisions as jsonl (default), text or csv")
+    eval_parser.add_argument("--format", choices=("jsonl", "csv"), default=None,
+                             help="input format (default: from the file extension)")
+    eval_parser.add_argument("--workers", type=positive_int, default=1,
+                             help="worker processes (default: 1, no pool)")
+    eval_parser.add_argument("--chunk-size", type=positive_int, default=None,
+                             help="records per worker task (default: 10000)")
+    eval_parser.add_argument("--metrics", choices=("text", "json"), default=None,
+                             help="print per-stage/per-rule metrics to stderr when done")
+    eval_parser.add_argument("--first-deny", action="store_true",
+                             help="output allow/deny only, stopping at the first failing rule")
+    eval_parser.add_argument("--decision-table", action="store_true",
+                             help="evaluate through a precomputed decision table (see table.py)")
+    eval_parser.add_argument("--dedup", action="store_true",
+                             help="evaluate each distinct rule-relevant projection once")
+    eval_parser.add_argument("--shadow", default=None, metavar="RULES",
+                             help="also evaluate these comma-separated rules (candidate) in the"
+                                  " same pass; summary of differences to stderr")
+    eval_parser.add_argument("--shadow-diff", default=None, metavar="PATH",
+                             help="write one JSONL row per record the candidate decides"
+                                  " differently")
+    serve_parser = sub.add_parser("serve", formatter_class=_HelpFormatter,
+                                  help="line-delimited JSON server over TCP / Unix socket")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=None, help="TCP port to listen on")
+    serve_parser.add_argument("--unix", default=None, help="Unix socket path to listen on")
+    serve_parser.add_argument("--data-dir", default=None,
+                              help="keep users on disk in this directory (default: memory only)")
+    serve_parser.add_argument("--columnar", action="store_true",
+                              help="keep users in typed columns (see columnar_store.py)")
+    serve_parser.add_argument("--batch-window-ms", type=float, default=None,
+                              help="max wait to fill an eval batch (default: 2)")
+    serve_parser.add_argument("--max-batch", type=int, default=None, help="(default: 256)")
+    serve_parser.add_argument("--max-pending", type=int, default=None,
+                              help="queued evals before new ones are rejected as overloaded"
+                                   " (default: 10000)")
+    args = parser.parse_args(argv)
+
+    if getattr(args, "columnar", False) and args.data_dir is not None:
+        parser.error("--columnar is for in-memory stores; not with --data-dir")
+    if args.command is not None:
+        from bundle import load_evaluator
+        load_evaluator(DEFAULT_RULES, args.rule_cache)
+
+    if args.command == "cli":
+        from cli import main_cli
+        from persist import PersistentUserStore
+        from policy import RunPolicyFn, run_policy
+        from store import Store, UserStore
+
+        index_fields = ("region", "verified")
+        if args.data_dir is not None:
+            users: Store = PersistentUserStore(args.data_dir, index_fields, fsync=args.fsync)
+        elif args.columnar:
+            from columnar_store import ColumnarUserStore
+            users = ColumnarUserStore(index_fields)
+        else:
+            users = UserStore(index_fields)
+        metrics = None
+        if args.metrics:
+            from metrics import PolicyMetrics
+            metrics = PolicyMetrics()
+        policy_fn: RunPolicyFn = run_policy if metrics is None else metrics.run_policy
+        shadow = None
+        if args.shadow is not None:
+            if args.metrics or args.cache_size > 0:
+                parser.error("--shadow needs no --metrics and no --cache-size")
+            from shadow import Shadow
+            shadow = Shadow(DEFAULT_RULES, _candidate_rules(parser, args.shadow))
+            policy_fn = shadow.run_policy
+        try:
+            if args.cache_size > 0:
+                from cache import DecisionCache
+                cache = DecisionCache(args.cache_size, policy_fn)
+                main_cli(users, DEFAULT_RULES, cache, metrics)
+                print("decision cache:", cache.stats(), file=sys.stderr)
+            else:
+                main_cli(users, DEFAULT_RULES, policy_fn, metrics)
+        finally:
+            if isinstance(users, PersistentUserStore):
+                users.close()
+            if shadow is not None:
+                print(shadow.summary.dump_text(), file=sys.stderr)
+        return
+    if args.command == "serve":
+        if args.port is None and args.unix is None:
+            parser.error("serve needs --port and/or --unix")
+        import asyncio
+
+        from concurrent_store import ConcurrentUserStore
+        from persist import PersistentUserStore
+        from server import PolicyServer
+
+        if args.data_dir is not None:
+            users = PersistentUserStore(args.data_dir, ("region", "verified"))
+        elif args.columnar:
+            from columnar_store import ColumnarUserStore
+            users = ColumnarUserStore(("region", "verified"))
+        else:
+            users = ConcurrentUserStore(("region", "verified"))
+        options = {}
+        if args.batch_window_ms is not None:
+            options["batch_window"] = args.batch_window_ms / 1000
+        if args.max_batch is not None:
+            options["max_batch"] = args.max_batch
+        if args.max_pending is not None:
+            options["max_pending"] = args.max_pending
+        server = PolicyServer(users, **options)
+        try:
+            asyncio.run(server.serve_forever(args.host, args.port, args.unix))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if isinstance(users, PersistentUserStore):
+                users.close()
+            print("server:", server.stats(), file=sys.stderr)
+        return
+    if args.command == "eval":
+        if args.metrics and args.workers != 1:
+            parser.error("--metrics needs --workers 1")
+        if args.first_deny and (args.workers != 1 or args.metrics):
+            parser.error("--first-deny needs --workers 1 and no --metrics")
+        if args.dedup and (args.workers != 1 or args.metrics or args.first_deny):
+            parser.error("--dedup needs --workers 1, no --metrics and no --first-deny")
+        if args.shadow and (args.workers != 1 or args.metrics or args.first_deny or args.dedup):
+            parser.error("--shadow needs --workers 1 and no --metrics, --first-deny or --dedup")
+        if args.shadow_diff and not args.shadow:
+            parser.error("--shadow-diff needs --shadow")
+        if args.decision_table:
+            from policy import install_evaluator
+            from table import DecisionTable
+            table = DecisionTable(DEFAULT_RULES)
+            install_evaluator(DEFAULT_RULES, table.evaluate)
+            print(table.describe(), file=sys.stderr)
+        metrics = None
+        if args.metrics:
+            from metrics import PolicyMetrics
+            metrics = PolicyMetrics()
+        dedup = None
+        if args.dedup:
+            from dedup import DedupStats
+            dedup = DedupStats()
+        shadow = diff_handle = None
+        if args.shadow:
+            from output import BulkWriter
+            from shadow import Shadow
+            candidate = _candidate_rules(parser, args.shadow)
+            diff_writer = None
+            if args.shadow_diff:
+                diff_handle = open(args.shadow_diff, "w", encoding="utf-8")
+                diff_writer = BulkWriter(diff_handle)
+            shadow = Shadow(DEFAULT_RULES, candidate,
+                            diff_writer.write_row if diff_writer is not None else None)
+        try:
+            count = run_eval(
+                args.input, args.output, args.format, args.workers, args.chunk_size, metrics,
+                args.first_deny, args.output_format, dedup, shadow,
+            )
+        finally:
+            if diff_handle is not None:
+                diff_writer.flush()
+                diff_handle.close()
+        print(f"evaluated {count} records", file=sys.stderr)
+        if shadow is not None:
+            print(shadow.summary.dump_text(), file=sys.stderr)
+        if dedup is not None:
+            print(f"dedup: {dedup.evaluated} distinct evaluations, "
+                  f"ratio {dedup.ratio:.1f}x", file=sys.stderr)
+        if metrics is not None:
+            dump = metrics.to_json() if args.metrics == "json" else metrics.dump_text()
+            print(dump, file=sys.stderr)
+        return
+
     print("Ground Truth Policy Engine (dojo scaffold)")
     print("Run lessons by implementing translations in src/engine.py")
 
@@ -0,0 +1,231 @@
+"""
+Incremental re-evaluation driven by field-level rule dependencies.
+
+IncrementalEvaluator keeps, for every record, the outcome of validate and of each
+rule, plus the fields each outcome depended on. Dependencies come from
+policy.RULE_FIELDS when a rule is declared there; otherwise the rule is run on a
+TracingRecord that notes every field it reads.
+
+When a record changes, only the outcomes whose fields changed are recomputed.
+When the rule list changes, only added rules run; removed rules are dropped and
+the decision is rebuilt from the stored outcomes in the new order.
+"""
+
+from typing import Any, Iterable, Iterator, Mapping, Sequence
+
+from policy import RULE_FIELDS, VALIDATION_FIELDS, Rule, validate
+from results import decision_from_codes, reason_code
+
+ALL_FIELDS = "*"
+
+_MISSING = object()
+
+
+class TracingRecord(dict):
+    """
+    A record dict that remembers which fields were read through it.
+
+    Every dict method that reads a value or the key set is overridden
+    (copy, setdefault, pop and friends included), so a rule may use any of
+    them; what has no field to name records ALL_FIELDS.
+    """
+
+    def __init__(self, record: dict[str, Any]) -> None:
+        super().__init__(record)
+        self.fields_read: set[str] = set()
+
+    def __getitem__(self, key: str) -> Any:
+        self.fields_read.add(key)
+        return super().__getitem__(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        self.fields_read.add(key)
+        return super().get(key, default)
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        self.fields_read.add(key)
+        return super().setdefault(key, default)
+
+    def pop(self, key: str, *default: Any) -> Any:
+        self.fields_read.add(key)
+        return super().pop(key, *default)
+
+    def __contains__(self, key: object) -> bool:
+        self.fields_read.add(str(key))
+        return super().__contains__(key)
+
+    def __iter__(self) -> Iterator[str]:
+        self.fields_read.add(ALL_FIELDS)
+        return super().__iter__()
+
+    def keys(self) -> Any:
+        self.fields_read.add(ALL_FIELDS)
+        return super().keys()
+
+    def values(self) -> Any:
+        self.fields_read.add(ALL_FIELDS)
+        return super().values()
+
+    def items(self) -> Any:
+        self.fields_read.add(ALL_FIELDS)
+        return super().items()
+
+    def copy(self) -> dict[str, Any]:
+        self.fields_read.add(ALL_FIELDS)
+        return super().copy()
+
+    def popitem(self) -> tuple[str, Any]:
+        self.fields_read.add(ALL_FIELDS)
+        return super().popitem()
+
+    def __len__(self) -> int:
+        self.fields_read.add(ALL_FIELDS)
+        return super().__len__()
+
+    def __eq__(self, other: object) -> bool:
+        self.fields_read.add(ALL_FIELDS)
+        return super().__eq__(other)
+
+    def __ne__(self, other: object) -> bool:
+        self.fields_read.add(ALL_FIELDS)
+        return super().__ne__(other)
+
+    def __repr__(self) -> str:
+        self.fields_read.add(ALL_FIELDS)
+        return super().__repr__()
+
+
+def changed_fields(old: dict[str, Any], new: dict[str, Any]) -> set[str]:
+    """Fields added, removed, or given a value of a different type or value."""
+    changed: set[str] = set()
+    for field in set(old) | set(new):
+        a = old.get(field, _MISSING)
+        b = new.get(field, _MISSING)
+        if type(a) is not type(b) or a != b:
+            changed.add(field)
+    return changed
+
+
+def _depends_on(fields: frozenset[str], changed: set[str]) -> bool:
+    return ALL_FIELDS in fields or not fields.isdisjoint(changed)
+
+
+class _Entry:
+    """Stored outcomes for one record."""
+
+    __slots__ = ("record", "validation", "outcomes", "deps", "decision")
+
+    def __init__(self, record: dict[str, Any]) -> None:
+        self.record = record
+        self.validation: Mapping[str, Any] = validate(record)
+        # rule -> failure reason code (None = passed); only filled while the record is valid
+        self.outcomes: dict[Rule, int | None] = {}
+        self.deps: dict[Rule, frozenset[str]] = {}
+        self.decision: Mapping[str, Any] = self.validation
+
+
+class IncrementalEvaluator:
+    """Keeps decisions for a set of records current as records and rules change."""
+
+    def __init__(self, rule_list: Sequence[Rule]) -> None:
+        self.rule_list: list[Rule] = list(rule_list)
+        self._entries: dict[str, _Entry] = {}
+        self.rule_calls = 0
+        self.validate_calls = 0
+
+    def _run_rule(self, entry: _Entry, rule_fn: Rule) -> None:
+        self.rule_calls += 1
+        if rule_fn in RULE_FIELDS:
+            result = rule_fn(entry.record)
+            entry.deps[rule_fn] = frozenset(RULE_FIELDS[rule_fn])
+        else:
+            traced = TracingRecord(entry.record)
+            result = rule_fn(traced)
+            entry.deps[rule_fn] = frozenset(traced.fields_read)
+        entry.outcomes[rule_fn] = None if result["passed"] else reason_code(result["reason"])
+
+    def _rebuild_decision(self, entry: _Entry) -> None:
+        if not entry.validation["valid"]:
+            entry.decision = entry.validation
+            return
+        codes: list[int] = []
+        for rule_fn in self.rule_list:
+            code = entry.outcomes[rule_fn]
+            if code is not None:
+                codes.append(code)
+        entry.decision = decision_from_codes(codes)
+
+    def _fill_missing(self, entry: _Entry) -> None:
+        """Run every rule in the current list that has no stored outcome."""
+        if not entry.validation["valid"]:
+            return
+        for rule_fn in self.rule_list:
+            if rule_fn not in entry.outcomes:
+                self._run_rule(entry, rule_fn)
+
+    def set_record(self, record: dict[str, Any]) -> Mapping[str, Any]:
+        """Add or replace a record (by str(id)); recompute only what its changes affect."""
+        key = str(record["id"])
+        entry = self._entries.get(key)
+        if entry is None:
+            self.validate_calls += 1
+            entry = _Entry(dict(record))
+            self._entries[key] = entry
+            self._fill_missing(entry)
+            self._rebuild_decision(entry)
+            return entry.decision
+
+        changed = changed_fields(entry.record, record)
+        if not changed:
+            return entry.decision
+        entry.record = dict(record)
+        if not changed.isdisjoint(VALIDATION_FIELDS):
+            self.validate_calls += 1
+            entry.validation = validate(entry.record)
+        if not entry.validation["valid"]:
+            # Rules assume valid records; recompute them all once it is valid again.
+            entry.outcomes.clear()
+            entry.deps.clear()
+        else:
+            for rule_fn in list(entry.outcomes):
+                if _depends_on(entry.deps[rule_fn], changed):
+                    self._run_rule(entry, rule_fn)
+            self._fill_missing(entry)
+        self._rebuild_decision(entry)
+        return entry.decision
+
+    def set_field(self, user_id: object, field: str, value: Any) -> Mapping[str, Any]:
+        """Change one field on one stored record."""
+        record = dict(self._entries[str(user_id)].record)
+        record[field] = value
+        return self.set_record(record)
+
+    def set_rules(self, rule_list: Sequence[Rule]) -> None:
+        """Switch rule lists; only rules not in the old list are run."""
+        self.rule_list = list(rule_list)
+        keep = set(self.rule_list)
+        for entry in self._entries.values():
+            for rule_fn in list(entry.outcomes):
+                if rule_fn not in keep:
+                    del entry.outcomes[rule_fn]
+                    del entry.deps[rule_fn]
+            self._fill_missing(entry)
+            self._rebuild_decision(entry)
+
+    def add_rule(self, rule_fn: Rule) -> None:
+        """Append one rule and evaluate only it."""
+        self.set_rules(self.rule_list + [rule_fn])
+
+    def load(self, records: Iterable[dict[str, Any]]) -> None:
+        """set_record for each record."""
+        for record in records:
+            self.set_record(record)
+
+    def decision(self, user_id: object) -> Mapping[str, Any]:
+        """Current validation result or Decision for a record id."""
+        return self._entries[str(user_id)].decision
+
+    def decisions(self) -> dict[str, Mapping[str, Any]]:
+        """Every current decision, keyed by str(id), in insertion order."""
+        return {key: entry.decision for key, entry in self._entries.items()}
+
@@ -0,0 +1,153 @@
+"""
+Per-stage and per-rule instrumentation for the policy pipeline.
+
+PolicyMetrics has validate / evaluate / format_result / run_policy methods with the
+same signatures and results as the functions in policy.py, plus timing and
+counting around each stage and each rule. Pass one as `metrics=` to run_policy or
+evaluate (or use its methods directly); with metrics=None those functions take
+their normal path after a single `is not None` check.
+
+Recorded for every stage (run_policy, validate, evaluate, format) and every rule:
+call count, cumulative time, a latency histogram, and pass/fail counts.
+Export with to_dict() (JSON) or dump_text() (one metric per line).
+"""
+
+import json
+import time
+from bisect import bisect_left
+from typing import Any, Mapping, Sequence
+
+import policy
+from policy import Rule
+from results import Decision, decision_from_codes, reason_code
+from ruleset import rule_name
+
+# Histogram bucket upper bounds, in nanoseconds (1us .. 10ms, then +Inf).
+BUCKET_BOUNDS_NS = [1_000, 2_000, 5_000, 10_000, 20_000, 50_000, 100_000, 1_000_000, 10_000_000]
+BUCKET_LABELS = ["1us", "2us", "5us", "10us", "20us", "50us", "100us", "1ms", "10ms", "+Inf"]
+
+
+class Timing:
+    """Counters and latency histogram for one stage or rule."""
+
+    __slots__ = ("calls", "total_ns", "passed", "failed", "buckets")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total_ns = 0
+        self.passed = 0
+        self.failed = 0
+        self.buckets = [0] * len(BUCKET_LABELS)
+
+    def observe(self, elapsed_ns: int, passed: bool) -> None:
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        if passed:
+            self.passed += 1
+        else:
+            self.failed += 1
+        self.buckets[bisect_left(BUCKET_BOUNDS_NS, elapsed_ns)] += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "total_seconds": self.total_ns / 1e9,
+            "mean_us": self.total_ns / self.calls / 1000.0 if self.calls else 0.0,
+            "passed": self.passed,
+            "failed": self.failed,
+            "histogram": dict(zip(BUCKET_LABELS, self.buckets)),
+        }
+
+
+class PolicyMetrics:
+    """Instrumented drop-ins for the pipeline functions, with the collected numbers."""
+
+    def __init__(self) -> None:
+        self.stages: dict[str, Timing] = {}
+        self.rules: dict[str, Timing] = {}
+
+    def _stage(self, name: str) -> Timing:
+        timing = self.stages.get(name)
+        if timing is None:
+            timing = self.stages[name] = Timing()
+        return timing
+
+    def _rule(self, rule_fn: Rule) -> Timing:
+        name = rule_name(rule_fn)
+        timing = self.rules.get(name)
+        if timing is None:
+            timing = self.rules[name] = Timing()
+        return timing
+
+    def validate(self, record: dict[str, Any]) -> Mapping[str, Any]:
+        start = time.perf_counter_ns()
+        validation = policy.validate(record)
+        self._stage("validate").observe(time.perf_counter_ns() - start, validation["valid"])
+        return validation
+
+    def evaluate(self, record: dict[str, Any], rule_list: Sequence[Rule]) -> Decision:
+        """Same result as policy.evaluate, timing each rule call."""
+        clock = time.perf_counter_ns
+        stage_start = clock()
+        codes: list[int] = []
+        for rule_fn in rule_list:
+            start = clock()
+            result = rule_fn(record)
+            passed = result["passed"]
+            self._rule(rule_fn).observe(clock() - start, passed)
+            if not passed:
+                codes.append(reason_code(result["reason"]))
+        decision = decision_from_codes(codes)
+        self._stage("evaluate").observe(clock() - stage_start, decision.allowed)
+        return decision
+
+    def format_result(self, decision: Mapping[str, Any]) -> str:
+        start = time.perf_counter_ns()
+        text = policy.format_result(decision)
+        self._stage("format").observe(time.perf_counter_ns() - start, True)
+        return text
+
+    def run_policy(self, record: dict[str, Any], rule_list: Sequence[Rule]) -> str:
+        """Same result as policy.run_policy, timing every stage and rule."""
+        start = time.perf_counter_ns()
+        validation = self.validate(record)
+        if not validation["valid"]:
+            text = self.format_result(validation)
+            allowed = False
+        else:
+            decision = self.evaluate(record, rule_list)
+            text = self.format_result(decision)
+            allowed = decision.allowed
+        self._stage("run_policy").observe(time.perf_counter_ns() - start, allowed)
+        return text
+
+    def reset(self) -> None:
+        self.stages.clear()
+        self.rules.clear()
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "stages": {name: t.to_dict() for name, t in self.stages.items()},
+            "rules": {name: t.to_dict() for name, t in self.rules.items()},
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def dump_text(self) -> str:
+        """One `name{labels} value` line per metric."""
+        lines: list[str] = []
+        for kind, table in (("stage", self.stages), ("rule", self.rules)):
+            for name, t in table.items():
+                label = f'{kind}="{name}"'
+                lines.append(f"policy_{kind}_calls{{{label}}} {t.calls}")
+                lines.append(f"policy_{kind}_seconds_total{{{label}}} {t.total_ns / 1e9:.9f}")
+                lines.append(f"policy_{kind}_passed{{{label}}} {t.passed}")
+                lines.append(f"policy_{kind}_failed{{{label}}} {t.failed}")
+                cumulative = 0
+                for bucket_label, count in zip(BUCKET_LABELS, t.buckets):
+                    cumulative += count
+                    lines.append(
+                        f'policy_{kind}_latency_bucket{{{label},le="{bucket_label}"}} {cumulative}'
+                    )
+        return "\n".join(lines)
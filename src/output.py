@@ -0,0 +1,195 @@
+"""
+Buffered bulk output for decisions and user listings: text, JSONL or CSV.
+
+Rows are formatted into a list of strings and written to the handle (a file,
+sys.stdout, or socket.makefile("w")) as one joined write every `chunk_rows` rows,
+followed by a flush. Memory is therefore bounded by one chunk however long the
+output is.
+
+Formatting is memoized per distinct result: a Decision or ValidationResult is
+fully described by its reason codes, so the format_result text and the JSON body
+for each combination of codes are built once and reused. The text format writes
+exactly what format_result returns; listings use handle_list's line format.
+
+    text   <id>\t<format_result text>        / id=.. age=.. verified=.. region=..
+    jsonl  {"id": .., <decision>, "result": ..}  / the record as JSON
+    csv    id,allowed,result                  / id,age,verified,region
+"""
+
+import csv
+import json
+from itertools import islice
+from typing import Any, Hashable, IO, Iterable, Mapping
+
+from policy import format_result
+from results import Decision, ValidationResult
+
+FORMATS = ("text", "jsonl", "csv")
+DEFAULT_CHUNK_ROWS = 8_192
+USER_FIELDS = ("id", "age", "verified", "region")
+# Upper bound on memoized results (only reached by rules with unbounded reason texts).
+_MAX_CACHED = 4_096
+
+
+def _result_key(decision: Mapping[str, Any]) -> Hashable | None:
+    if type(decision) is Decision:
+        return decision.codes
+    if type(decision) is ValidationResult:
+        return (decision.valid, decision.code, "v")
+    return None
+
+
+class _Formatted:
+    __slots__ = ("text", "json_tail", "allowed")
+
+    def __init__(self, decision: Mapping[str, Any]) -> None:
+        self.text = format_result(decision)
+        body = dict(decision)
+        body["result"] = self.text
+        # Everything after the "id" member: ', "allowed": true, ..., "result": "Allowed"}'
+        self.json_tail = ", " + json.dumps(body)[1:]
+        self.allowed = bool(decision.get("allowed", False))
+
+
+_formatted: dict[Hashable, _Formatted] = {}
+
+
+def formatted(decision: Mapping[str, Any]) -> _Formatted:
+    """Text/JSON renderings of a validation or evaluation result, memoized by codes."""
+    key = _result_key(decision)
+    if key is None:
+        return _Formatted(decision)
+    entry = _formatted.get(key)
+    if entry is None:
+        entry = _Formatted(decision)
+        if len(_formatted) < _MAX_CACHED:
+            _formatted[key] = entry
+    return entry
+
+
+def format_cached(decision: Mapping[str, Any]) -> str:
+    """format_result(decision), without rebuilding the string for a seen result."""
+    return formatted(decision).text
+
+
+def user_line(user: Mapping[str, Any]) -> str:
+    """One user in handle_list's text format."""
+    return f"id={user['id']} age={user['age']} verified={user['verified']} region={user['region']}"
+
+
+class _Parts(list):
+    # Lets csv.writer append formatted lines to the pending chunk.
+    write = list.append
+
+
+class BulkWriter:
+    """Chunked, buffered writer of decisions and/or user records in one format."""
+
+    def __init__(self, handle: IO[str], fmt: str = "jsonl",
+                 chunk_rows: int = DEFAULT_CHUNK_ROWS) -> None:
+        if fmt not in FORMATS:
+            raise ValueError("unknown output format: " + fmt)
+        self.handle = handle
+        self.fmt = fmt
+        self.chunk_rows = chunk_rows
+        self.rows = 0
+        self._parts = _Parts()
+        self._csv = csv.writer(self._parts, lineterminator="\n") if fmt == "csv" else None
+        self._header_written = False
+
+    def _row_done(self) -> None:
+        self.rows += 1
+        if len(self._parts) >= self.chunk_rows:
+            self.flush()
+
+    def _csv_header(self, header: Iterable[str]) -> None:
+        if not self._header_written:
+            assert self._csv is not None
+            self._csv.writerow(header)
+            self._header_written = True
+
+    def write_decision(self, record_id: Any, decision: Mapping[str, Any]) -> None:
+        """One record's validation failure or decision."""
+        entry = formatted(decision)
+        if self.fmt == "jsonl":
+            self._parts.append('{"id": ' + json.dumps(record_id) + entry.json_tail + "\n")
+        elif self.fmt == "text":
+            self._parts.append(f"{record_id}\t{entry.text}\n")
+        else:
+            self._csv_header(("id", "allowed", "result"))
+            self._csv.writerow((record_id, entry.allowed, entry.text))
+        self._row_done()
+
+    def write_row(self, row: Mapping[str, Any]) -> None:
+        """An already-built output row (as from stream.decide_stream), including error rows."""
+        if self.fmt == "jsonl":
+            self._parts.append(json.dumps(row) + "\n")
+        else:
+            if "result" in row:
+                text = row["result"]
+            elif "error" in row:
+                text = "Error: " + str(row["error"])
+            else:  # first-deny rows carry only allow/deny
+                text = "Allowed" if row.get("allowed") else "Denied"
+            if self.fmt == "text":
+                self._parts.append(f"{row.get('id')}\t{text}\n")
+            else:
+                self._csv_header(("id", "allowed", "result"))
+                self._csv.writerow((row.get("id"), bool(row.get("allowed", False)), text))
+        self._row_done()
+
+    def write_user(self, user: Mapping[str, Any]) -> None:
+        """One stored user record."""
+        if self.fmt == "jsonl":
+            self._parts.append(json.dumps(user) + "\n")
+        elif self.fmt == "text":
+            self._parts.append(user_line(user) + "\n")
+        else:
+            self._csv_header(USER_FIELDS)
+            self._csv.writerow([user.get(field) for field in USER_FIELDS])
+        self._row_done()
+
+    def flush(self) -> None:
+        if self._parts:
+            self.handle.write("".join(self._parts))
+            self._parts.clear()
+        self.handle.flush()
+
+    def __enter__(self) -> "BulkWriter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.flush()
+
+
+def write_users(users: Iterable[Mapping[str, Any]], handle: IO[str], fmt: str = "text",
+                chunk_rows: int = DEFAULT_CHUNK_ROWS) -> int:
+    """Stream a listing of users to handle; return the number written."""
+    if fmt == "csv":
+        with BulkWriter(handle, fmt, chunk_rows) as writer:
+            for user in users:
+                writer.write_user(user)
+        return writer.rows
+    if fmt not in FORMATS:
+        raise ValueError("unknown output format: " + fmt)
+    line_fn = user_line if fmt == "text" else json.dumps
+    count = 0
+    users = iter(users)
+    while True:
+        chunk = list(islice(users, chunk_rows))
+        if not chunk:
+            break
+        handle.write("\n".join(map(line_fn, chunk)))
+        handle.write("\n")
+        handle.flush()
+        count += len(chunk)
+    return count
+
+
+def write_rows(rows: Iterable[Mapping[str, Any]], handle: IO[str], fmt: str = "jsonl",
+               chunk_rows: int = DEFAULT_CHUNK_ROWS) -> int:
+    """Stream output rows (see stream.decide_stream) to handle; return the number written."""
+    with BulkWriter(handle, fmt, chunk_rows) as writer:
+        for row in rows:
+            writer.write_row(row)
+    return writer.rows
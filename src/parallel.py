@@ -0,0 +1,123 @@
+"""
+Multi-core batch evaluation with a chunked process pool.
+
+Records are cut into chunks; each chunk runs through validate → evaluate in a
+worker process with the same rule list. Results come back in input order, so the
+output is identical to the serial path. At most a few chunks per worker are in
+flight at once, so an unbounded input stream does not pile up in memory.
+
+Rules must be picklable (module-level functions are).
+"""
+
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, Mapping, Sequence
+
+from policy import Rule, compile_rules, validate
+from results import decision_from_codes, invalid, reason_code
+
+DEFAULT_CHUNK_SIZE = 10_000
+IN_FLIGHT_PER_WORKER = 2
+
+# Worker output per record: (is_validation_failure, reason texts). Texts, not codes,
+# because reason codes for user rules are interned per process.
+WireResult = tuple[bool, tuple[Any, ...]]
+
+
+def evaluate_records(
+    records: Iterable[dict[str, Any]],
+    rule_list: Sequence[Rule],
+) -> list[Mapping[str, Any]]:
+    """Serial reference path: validation result for invalid records, decision otherwise."""
+    evaluate_fn = compile_rules(rule_list)
+    results: list[Mapping[str, Any]] = []
+    for record in records:
+        validation = validate(record)
+        if not validation["valid"]:
+            results.append(validation)
+        else:
+            results.append(evaluate_fn(record))
+    return results
+
+
+def _evaluate_chunk(chunk: list[dict[str, Any]], rule_list: Sequence[Rule]) -> list[WireResult]:
+    """Worker side: evaluate one chunk and encode the results for the trip back."""
+    wire: list[WireResult] = []
+    for result in evaluate_records(chunk, rule_list):
+        if "valid" in result:
+            wire.append((True, (result["reason"],)))
+        else:
+            wire.append((False, tuple(result["reasons"])))
+    return wire
+
+
+def _decode(wire: WireResult) -> Mapping[str, Any]:
+    is_validation, reasons = wire
+    if is_validation:
+        return invalid(reason_code(reasons[0]))
+    return decision_from_codes([reason_code(reason) for reason in reasons])
+
+
+def iter_chunks(items: Iterable[Any], chunk_size: int) -> Iterator[list[Any]]:
+    """Yield lists of up to chunk_size items, in order."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def map_chunks(
+    items: Iterable[Any],
+    chunk_fn: Callable[[list[Any]], list[Any]],
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Any]:
+    """
+    Apply chunk_fn to consecutive chunks in a process pool; yield outputs in input order.
+    workers=1 runs in this process without a pool.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1 or chunk_size < 1:
+        raise ValueError("workers and chunk_size must be at least 1")
+    chunks = iter_chunks(items, chunk_size)
+    if workers == 1:
+        for chunk in chunks:
+            yield from chunk_fn(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: deque[Future] = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(chunk_fn, chunk))
+            if len(pending) >= workers * IN_FLIGHT_PER_WORKER:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def iter_evaluate_parallel(
+    records: Iterable[dict[str, Any]],
+    rule_list: Sequence[Rule],
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Mapping[str, Any]]:
+    """Yield one validation result or decision per record, in input order."""
+    chunk_fn = partial(_evaluate_chunk, rule_list=list(rule_list))
+    for wire in map_chunks(records, chunk_fn, workers, chunk_size):
+        yield _decode(wire)
+
+
+def evaluate_parallel(
+    records: Iterable[dict[str, Any]],
+    rule_list: Sequence[Rule],
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> list[Mapping[str, Any]]:
+    """List form of iter_evaluate_parallel; same results as evaluate_records."""
+    return list(iter_evaluate_parallel(records, rule_list, workers, chunk_size))
@@ -0,0 +1,216 @@
+"""
+On-disk user store: append-only log of changes plus periodic compact snapshots.
+
+A data directory holds two files:
+- snapshot.pickle: every record at the time of the last compaction, stored as one
+  list per field (id, age, verified, region) so loading is a few large list reads
+  rather than millions of small objects; records with other fields are kept whole.
+- log.jsonl: one {"op": ..., "record": {...}} line per add/update since then.
+
+Startup loads the snapshot and replays the log. Replay applies every op as an
+upsert, so replaying a log that the snapshot already covers (a crash between
+writing the snapshot and truncating the log) gives the same state. A torn last
+line from a crash mid-write is ignored, and cut off the file before new ops are
+appended (otherwise the next op would be written onto the same line).
+
+Writes are buffered and flushed every `batch_size` ops. The fsync policy decides
+when data is forced to disk: "always" (every op), "batch" (every flush) or
+"never" (left to the OS).
+
+The snapshot is a pickle: only load data directories you wrote yourself.
+"""
+
+import gc
+import json
+import os
+import pickle
+from typing import Any, Iterator, Sequence
+
+from store import UserStore
+
+SNAPSHOT_FILE = "snapshot.pickle"
+LOG_FILE = "log.jsonl"
+SNAPSHOT_VERSION = 1
+COLUMN_FIELDS = ("id", "age", "verified", "region")
+FSYNC_POLICIES = ("always", "batch", "never")
+
+
+def _split_columns(records: Iterator[dict[str, Any]]) -> dict[str, Any]:
+    """Columns for records with exactly COLUMN_FIELDS; (position, record) for the rest."""
+    columns: dict[str, list[Any]] = {field: [] for field in COLUMN_FIELDS}
+    others: list[tuple[int, dict[str, Any]]] = []
+    field_set = set(COLUMN_FIELDS)
+    for position, record in enumerate(records):
+        if record.keys() == field_set:
+            for field in COLUMN_FIELDS:
+                columns[field].append(record[field])
+        else:
+            others.append((position, record))
+    return {"version": SNAPSHOT_VERSION, "columns": columns, "others": others}
+
+
+def _join_columns(snapshot: dict[str, Any]) -> list[dict[str, Any]]:
+    """Inverse of _split_columns: records in their original order."""
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        raise ValueError("unsupported snapshot version: " + str(snapshot.get("version")))
+    columns = snapshot["columns"]
+    records = [
+        {"id": user_id, "age": age, "verified": verified, "region": region}
+        for user_id, age, verified, region in zip(
+            columns["id"], columns["age"], columns["verified"], columns["region"]
+        )
+    ]
+    others = snapshot["others"]
+    if not others:
+        return records
+    merged: list[dict[str, Any]] = []
+    column_records = iter(records)
+    next_other = 0
+    for position in range(len(records) + len(others)):
+        if next_other < len(others) and others[next_other][0] == position:
+            merged.append(others[next_other][1])
+            next_other += 1
+        else:
+            merged.append(next(column_records))
+    return merged
+
+
+def write_snapshot(path: str, records: Iterator[dict[str, Any]]) -> None:
+    """Write a snapshot atomically: temp file, fsync, rename."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as handle:
+        pickle.dump(_split_columns(records), handle, protocol=pickle.HIGHEST_PROTOCOL)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str) -> list[dict[str, Any]]:
+    """Records from a snapshot file, or [] if there is none."""
+    if not os.path.exists(path):
+        return []
+    # Building millions of dicts would trigger many useless cyclic GC passes.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(path, "rb") as handle:
+            return _join_columns(pickle.load(handle))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def read_log(path: str) -> Iterator[dict[str, Any]]:
+    """Yield logged records in order, skipping a torn final line."""
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if not line.endswith("\n"):
+                return
+            yield json.loads(line)["record"]
+
+
+def truncate_torn_tail(path: str, block_size: int = 65_536) -> int:
+    """Cut a final line with no trailing newline off the log; return the bytes removed."""
+    if not os.path.exists(path):
+        return 0
+    with open(path, "rb+") as handle:
+        end = handle.seek(0, os.SEEK_END)
+        keep = 0
+        position = end
+        # Scan back block by block to the last newline.
+        while position > 0:
+            start = max(0, position - block_size)
+            handle.seek(start)
+            newline = handle.read(position - start).rfind(b"\n")
+            if newline >= 0:
+                keep = start + newline + 1
+                break
+            position = start
+        if keep != end:
+            handle.truncate(keep)
+            handle.flush()
+            os.fsync(handle.fileno())
+    return end - keep
+
+
+class PersistentUserStore(UserStore):
+    """UserStore whose adds and updates are logged to disk and snapshotted."""
+
+    def __init__(
+        self,
+        data_dir: str,
+        index_fields: Sequence[str] = (),
+        fsync: str = "batch",
+        batch_size: int = 1_000,
+        snapshot_every: int = 100_000,
+    ) -> None:
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError("fsync must be one of: " + ", ".join(FSYNC_POLICIES))
+        super().__init__(index_fields)
+        self.data_dir = data_dir
+        self.fsync = fsync
+        self.batch_size = 1 if fsync == "always" else batch_size
+        self.snapshot_every = snapshot_every
+        self._snapshot_path = os.path.join(data_dir, SNAPSHOT_FILE)
+        self._log_path = os.path.join(data_dir, LOG_FILE)
+        self._pending: list[str] = []
+        self._logged_since_snapshot = 0
+
+        os.makedirs(data_dir, exist_ok=True)
+        super().add_many(read_snapshot(self._snapshot_path))
+        for record in read_log(self._log_path):
+            super().replace(record)
+            self._logged_since_snapshot += 1
+        truncate_torn_tail(self._log_path)
+        self._log = open(self._log_path, "a", encoding="utf-8")
+
+    def _append(self, op: str, record: dict[str, Any]) -> None:
+        self._pending.append(json.dumps({"op": op, "record": record}) + "\n")
+        self._logged_since_snapshot += 1
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        if self.snapshot_every and self._logged_since_snapshot >= self.snapshot_every:
+            self.compact()
+
+    def add(self, record: dict[str, Any]) -> None:
+        super().add(record)
+        self._append("add", record)
+
+    def add_many(self, records: Sequence[dict[str, Any]]) -> None:
+        super().add_many(records)
+        # One log write (and fsync, unless "never") for the whole batch.
+        self._pending.extend(json.dumps({"op": "add", "record": record}) + "\n"
+                             for record in records)
+        self._logged_since_snapshot += len(records)
+        self.flush()
+        if self.snapshot_every and self._logged_since_snapshot >= self.snapshot_every:
+            self.compact()
+
+    def replace(self, record: dict[str, Any]) -> dict[str, Any] | None:
+        old = super().replace(record)
+        self._append("update", record)
+        return old
+
+    def flush(self) -> None:
+        """Write buffered log lines; fsync unless the policy is "never"."""
+        if self._pending:
+            self._log.write("".join(self._pending))
+            self._pending.clear()
+        self._log.flush()
+        if self.fsync != "never":
+            os.fsync(self._log.fileno())
+
+    def compact(self) -> None:
+        """Write a snapshot of the whole store, then start an empty log."""
+        self.flush()
+        write_snapshot(self._snapshot_path, iter(self))
+        self._log.close()
+        self._log = open(self._log_path, "w", encoding="utf-8")
+        self._logged_since_snapshot = 0
+
+    def close(self) -> None:
+        """Flush pending writes and close the log."""
+        self.flush()
+        self._log.close()
@@ -0,0 +1,277 @@
+"""
+Policy pipeline: validate → evaluate → format, plus the built-in rules.
+
+Same logic as reference_phase1_examples.py through reference_phase4_examples.py,
+collected in one importable module so the CLI and batch tools share it. Rules
+are pure: record in, result out. Results are the compact Mapping types from
+results.py; a rule may also return a plain {"passed", "reason"} dict.
+"""
+
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Mapping, Sequence
+
+from results import (
+    ACCOUNT_NOT_VERIFIED, AGE_BELOW_MINIMUM, AGE_NOT_A_NUMBER, AGE_OUT_OF_RANGE,
+    ALLOWED, MISSING_AGE, PASSED, REGION_RESTRICTED, VALID, Decision, decision_from_codes,
+    failed, invalid, reason_code,
+)
+
+if TYPE_CHECKING:
+    from metrics import PolicyMetrics
+
+Rule = Callable[[dict[str, Any]], Mapping[str, Any]]
+RunPolicyFn = Callable[[dict[str, Any], Sequence[Rule]], str]
+
+MINIMUM_AGE = 18
+RESTRICTED_REGIONS = ["XX", "YY"]
+
+_MISSING_AGE = invalid(MISSING_AGE)
+_AGE_NOT_A_NUMBER = invalid(AGE_NOT_A_NUMBER)
+_AGE_OUT_OF_RANGE = invalid(AGE_OUT_OF_RANGE)
+_AGE_BELOW_MINIMUM = failed(AGE_BELOW_MINIMUM)
+_ACCOUNT_NOT_VERIFIED = failed(ACCOUNT_NOT_VERIFIED)
+_REGION_RESTRICTED = failed(REGION_RESTRICTED)
+
+
+def validate(record: dict[str, Any]) -> Mapping[str, Any]:
+    """Return valid or a failure reason. No rule logic, no formatting."""
+    if "age" not in record:
+        return _MISSING_AGE
+    if not isinstance(record["age"], (int, float)):
+        return _AGE_NOT_A_NUMBER
+    if record["age"] < 0 or record["age"] > 120:
+        return _AGE_OUT_OF_RANGE
+    return VALID
+
+
+def rule_age(record: dict[str, Any]) -> Mapping[str, Any]:
+    """Rule: age >= 18."""
+    if record.get("age", 0) >= MINIMUM_AGE:
+        return PASSED
+    return _AGE_BELOW_MINIMUM
+
+
+def rule_verified(record: dict[str, Any]) -> Mapping[str, Any]:
+    """Rule: account must be verified."""
+    if record.get("verified", False) is True:
+        return PASSED
+    return _ACCOUNT_NOT_VERIFIED
+
+
+def rule_region(record: dict[str, Any]) -> Mapping[str, Any]:
+    """Rule: not in restricted region."""
+    if record.get("region", "") not in RESTRICTED_REGIONS:
+        return PASSED
+    return _REGION_RESTRICTED
+
+
+DEFAULT_RULES: list[Rule] = [rule_age, rule_verified, rule_region]
+
+# Record fields that validate and each rule read. Rules not listed here are
+# treated as reading the whole record.
+VALIDATION_FIELDS: tuple[str, ...] = ("age",)
+RULE_FIELDS: dict[Rule, tuple[str, ...]] = {
+    rule_age: ("age",),
+    rule_verified: ("verified",),
+    rule_region: ("region",),
+}
+
+
+def declare_fields(rule_fn: Rule, fields: Sequence[str]) -> Rule:
+    """Record which fields a user rule reads; returns the rule so it can wrap a def."""
+    RULE_FIELDS[rule_fn] = tuple(fields)
+    return rule_fn
+
+
+def fields_read(rule_list: Sequence[Rule]) -> tuple[str, ...] | None:
+    """Sorted fields read by validate plus the rules, or None if any rule is undeclared."""
+    fields = set(VALIDATION_FIELDS)
+    for rule_fn in rule_list:
+        if rule_fn not in RULE_FIELDS:
+            return None
+        fields.update(RULE_FIELDS[rule_fn])
+    return tuple(sorted(fields))
+
+
+def evaluate(
+    record: dict[str, Any],
+    rule_list: Sequence[Rule],
+    metrics: "PolicyMetrics | None" = None,
+) -> Decision:
+    """Assume record is valid. Run every rule, collect failure reasons, return allow/deny."""
+    if metrics is not None:
+        return metrics.evaluate(record, rule_list)
+    codes: list[int] = []
+    for rule_fn in rule_list:
+        result = rule_fn(record)
+        if not result["passed"]:
+            codes.append(reason_code(result["reason"]))
+    return decision_from_codes(codes)
+
+
+# Phase 3 name for the same composer.
+evaluate_all_rules = evaluate
+
+
+def evaluate_age_rule(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Phase 1: one rule over many records; one {"id", "passed"} result per record."""
+    results: list[dict[str, Any]] = []
+    for record in records:
+        results.append({"id": record["id"], "passed": record["age"] >= MINIMUM_AGE})
+    return results
+
+
+def validate_then_evaluate_all(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Phase 2: validate each record, then the age rule; result says which kind failed."""
+    results: list[dict[str, Any]] = []
+    for record in records:
+        validation = validate(record)
+        if not validation["valid"]:
+            results.append({
+                "id": record.get("id"),
+                "passed": False,
+                "reason": validation["reason"],
+                "kind": "validation",
+            })
+        elif record["age"] >= MINIMUM_AGE:
+            results.append({"id": record["id"], "passed": True, "reason": None, "kind": "rule"})
+        else:
+            results.append({
+                "id": record["id"],
+                "passed": False,
+                "reason": "age below minimum",
+                "kind": "rule",
+            })
+    return results
+
+
+# Failure condition (a Python expression over `get`, the record's .get) and reason
+# code for each built-in rule, so compile_rules can inline them without calling the rule.
+INLINE_RULES: dict[Rule, tuple[str, int]] = {
+    rule_age: ('not (get("age", 0) >= MINIMUM_AGE)', AGE_BELOW_MINIMUM),
+    rule_verified: ('get("verified", False) is not True', ACCOUNT_NOT_VERIFIED),
+    rule_region: ('get("region", "") in RESTRICTED_REGIONS', REGION_RESTRICTED),
+}
+
+Evaluator = Callable[[dict[str, Any]], Decision]
+
+# compile_rules keeps at most this many evaluators and drops the oldest beyond it,
+# so rule lists swapped in over a long run (RuleRegistry.publish / reload) do not
+# pile up. Evaluators from install_evaluator are never dropped.
+COMPILED_CACHE_SIZE = 256
+
+_compiled_cache: dict[tuple[Rule, ...], Evaluator] = {}
+_installed: set[tuple[Rule, ...]] = set()
+# Held while _compiled_cache changes size, so an eviction never iterates it while
+# another thread inserts. Lookups stay lock-free.
+_compiled_lock = threading.Lock()
+
+
+def evaluator_namespace(rule_list: Sequence[Rule]) -> dict[str, Any]:
+    """Globals for compiled_evaluate: constants, result helpers, rule_<i> for called rules."""
+    namespace: dict[str, Any] = {
+        # Hoisted once per compile; a tuple keeps the `in` semantics of the list.
+        "MINIMUM_AGE": MINIMUM_AGE,
+        "RESTRICTED_REGIONS": tuple(RESTRICTED_REGIONS),
+        "reason_code": reason_code,
+        "ALLOWED": ALLOWED,
+        "Decision": Decision,
+    }
+    for i, rule_fn in enumerate(rule_list):
+        if rule_fn not in INLINE_RULES:
+            namespace[f"rule_{i}"] = rule_fn
+    return namespace
+
+
+def evaluator_source(rule_list: Sequence[Rule]) -> str:
+    """Source of compiled_evaluate: every rule in order, built-in rules inlined."""
+    lines = [
+        "def compiled_evaluate(record):",
+        "    codes = []",
+        "    get = record.get",
+    ]
+    for i, rule_fn in enumerate(rule_list):
+        if rule_fn in INLINE_RULES:
+            condition, code = INLINE_RULES[rule_fn]
+            lines.append(f"    if {condition}:")
+            lines.append(f"        codes.append({code})")
+        else:
+            lines.append(f"    result = rule_{i}(record)")
+            lines.append('    if not result["passed"]:')
+            lines.append('        codes.append(reason_code(result["reason"]))')
+    lines.append("    if not codes:")
+    lines.append("        return ALLOWED")
+    lines.append("    return Decision(tuple(codes))")
+    return "\n".join(lines)
+
+
+def _generate_evaluator(rule_list: Sequence[Rule]) -> Evaluator:
+    """Build one function whose body runs every rule in order; same output as evaluate."""
+    namespace = evaluator_namespace(rule_list)
+    exec(evaluator_source(rule_list), namespace)  # pylint: disable=exec-used
+    return namespace["compiled_evaluate"]
+
+
+def compile_rules(rule_list: Sequence[Rule]) -> Evaluator:
+    """
+    Return one evaluator equivalent to evaluate(record, rule_list).
+    Built-in rules are inlined; other rules are still called. Cached per rule sequence
+    (the COMPILED_CACHE_SIZE most recent).
+    """
+    try:
+        key = tuple(rule_list)
+        compiled = _compiled_cache.get(key)
+    except TypeError:
+        # Unhashable rule callable: compile without caching.
+        return _generate_evaluator(rule_list)
+    if compiled is None:
+        compiled = _generate_evaluator(rule_list)
+        with _compiled_lock:
+            # Another thread may have compiled the same rules meanwhile: keep theirs.
+            cached = _compiled_cache.get(key)
+            if cached is not None:
+                return cached
+            if len(_compiled_cache) >= COMPILED_CACHE_SIZE:
+                _evict_oldest(_compiled_cache, _installed)
+            _compiled_cache[key] = compiled
+    return compiled
+
+
+def _evict_oldest(cache: dict[Any, Any], keep: set[Any]) -> None:
+    # Dicts keep insertion order: drop the first entry not in keep.
+    for key in cache:
+        if key not in keep:
+            del cache[key]
+            return
+
+
+def install_evaluator(rule_list: Sequence[Rule], evaluator: Evaluator) -> None:
+    """Make compile_rules(rule_list) return evaluator (e.g. one loaded from a rule bundle)."""
+    key = tuple(rule_list)
+    with _compiled_lock:
+        _compiled_cache[key] = evaluator
+        _installed.add(key)
+
+
+def format_result(decision: Mapping[str, Any]) -> str:
+    """Turn validation or evaluation result into a string for the caller."""
+    if "valid" in decision and not decision["valid"]:
+        return "Validation failed: " + str(decision["reason"])
+    if decision["allowed"]:
+        return "Allowed"
+    return "Denied: " + "; ".join(str(r) for r in decision["reasons"])
+
+
+def run_policy(
+    record: dict[str, Any],
+    rule_list: Sequence[Rule],
+    metrics: "PolicyMetrics | None" = None,
+) -> str:
+    """Single entry point: validate → evaluate (if valid) → format."""
+    if metrics is not None:
+        return metrics.run_policy(record, rule_list)
+    validation = validate(record)
+    if not validation["valid"]:
+        return format_result(validation)
+    decision = compile_rules(rule_list)(record)
+    return format_result(decision)
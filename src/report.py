@@ -0,0 +1,209 @@
+"""
+Population reason report: why users are allowed or denied, over a whole store.
+
+population_report makes one pass over the records in chunks. Each chunk becomes
+columns, goes through batch.decide_columns (column-wise validation, one mask per
+rule, a failure bitmask per row), and is reduced to counts of
+(group, failure bitmask) and (group, validation reason) with np.bincount /
+np.unique. Everything in the report (allow/deny totals, counts per reason,
+reason-pair co-occurrence, the breakdown by a field) is then derived from those
+few distinct combinations, so nothing per user is kept between chunks.
+
+A rule counts under its reason text when batch.py has a vector form for it, and
+under its function name otherwise (such rules are still evaluated, one row at a
+time, on the original records, so they can read any field). Needs numpy, like
+batch.py.
+"""
+
+import json
+import operator
+from collections import Counter
+from itertools import combinations, islice, repeat
+from typing import Any, Iterable, Mapping, Sequence
+
+import numpy as np
+
+from batch import MISSING, VECTOR_RULES, decide_columns
+from policy import Rule
+from results import reason_text
+from ruleset import rule_name
+
+DEFAULT_CHUNK_ROWS = 262_144
+# Largest (groups x bitmask values) table counted with np.bincount; above it, np.unique.
+_BINCOUNT_LIMIT = 1 << 22
+
+
+def rule_labels(rule_list: Sequence[Rule]) -> list[str]:
+    """Report label for each rule: its reason text, or its name if it has no vector form."""
+    return [reason_text(VECTOR_RULES[rule_fn][1]) if rule_fn in VECTOR_RULES
+            else rule_name(rule_fn) for rule_fn in rule_list]
+
+
+def _factorize(values: list[Any]) -> tuple[list[Any], np.ndarray]:
+    # Distinct values (first-seen order) and each row's index into them, by dict
+    # lookups driven by map(). Mixed-type columns are keyed by (type, value), so
+    # 1, 1.0 and True stay separate groups.
+    if len(set(map(type, values))) > 1:
+        keys: list[Any] = list(zip(map(type, values), values))
+    else:
+        keys = values
+    index = {key: i for i, key in enumerate(dict.fromkeys(keys))}
+    codes = np.fromiter(map(index.__getitem__, keys), dtype=np.int64, count=len(keys))
+    distinct = list(index)
+    return (distinct if keys is values else [value for _, value in distinct]), codes
+
+
+def _columns(chunk: list[dict[str, Any]]) -> tuple[np.ndarray, np.ndarray, np.ndarray,
+                                                    tuple[list[Any], np.ndarray]]:
+    # Raw columns with the same semantics as validate and the built-in rules:
+    # "verified" passes only when it `is True`; a missing or non-str region is
+    # never restricted. Also returns the region column factorized, for a
+    # breakdown by region.
+    n = len(chunk)
+    get = dict.get
+    ages = list(map(get, chunk, repeat("age"), repeat(MISSING)))
+    if {int, float, bool}.issuperset(map(type, ages)):
+        age = np.array(ages)  # all numbers: validate_ages' numeric fast path
+    else:
+        age = np.fromiter(ages, dtype=object, count=n)
+    verified = np.fromiter(map(operator.is_, map(get, chunk, repeat("verified")), repeat(True)),
+                           dtype=bool, count=n)
+    regions, region_codes = _factorize(list(map(get, chunk, repeat("region"), repeat(""))))
+    categories = np.array([value if type(value) is str else "" for value in regions], dtype=str)
+    return age, verified, categories[region_codes], (regions, region_codes)
+
+
+def _count_pairs(groups: np.ndarray, values: np.ndarray, shift: int) -> Iterable[tuple[int, int]]:
+    # ((group << shift) | value, count) for each combination present.
+    combined = (groups.astype(np.int64) << shift) | values.astype(np.int64)
+    if len(combined) and (int(combined.max()) + 1) <= _BINCOUNT_LIMIT:
+        counts = np.bincount(combined)
+        present = np.flatnonzero(counts)
+        return zip(present.tolist(), counts[present].tolist())
+    keys, counts = np.unique(combined, return_counts=True)
+    return zip(keys.tolist(), counts.tolist())
+
+
+class PopulationReport:
+    """Counts from one pass over a population; to_dict() / to_json() / dump_text() export."""
+
+    def __init__(self, labels: Sequence[str], field: str | None) -> None:
+        self.labels = list(labels)
+        self.field = field
+        # (group value, failure bitmask) -> rows that passed validation with those failures
+        self.decided: Counter[tuple[Any, int]] = Counter()
+        # (group value, validation reason code) -> rows that failed validation
+        self.invalid: Counter[tuple[Any, int]] = Counter()
+
+    def add_chunk(self, chunk: list[dict[str, Any]], rule_list: Sequence[Rule]) -> None:
+        """Validate, evaluate and count one list of records."""
+        age, verified, region, region_groups = _columns(chunk)
+        decision = decide_columns(age, verified, region, rule_list, chunk)
+        if self.field is None:
+            group_values: list[Any] = [None]
+            groups = np.zeros(len(chunk), dtype=np.int64)
+        elif self.field == "region":
+            group_values, groups = region_groups
+        else:
+            group_values, groups = _factorize(list(map(dict.get, chunk, repeat(self.field))))
+        shift = max(len(rule_list), 1)
+        valid = decision.valid
+        if shift <= 32:
+            for key, count in _count_pairs(groups[valid], decision.failures[valid], shift):
+                self.decided[group_values[key >> shift], key & ((1 << shift) - 1)] += count
+        else:  # > 32 rules: too wide to pack with the group into one int64
+            for group, bits in zip(groups[valid].tolist(), decision.failures[valid].tolist()):
+                self.decided[group_values[group], int(bits)] += 1
+        invalid = ~valid
+        if invalid.any():
+            for key, count in _count_pairs(groups[invalid], decision.codes[invalid], 8):
+                self.invalid[group_values[key >> 8], key & 0xFF] += count
+
+    def _summary(self, decided: Iterable[tuple[int, int]],
+                 invalid: Iterable[tuple[int, int]]) -> dict[str, Any]:
+        # Totals, per-reason and per-pair counts from (bitmask, count) and (code, count).
+        reasons: Counter[str] = Counter()
+        pairs: Counter[str] = Counter()
+        allowed = denied = invalid_total = 0
+        for bits, count in decided:
+            if bits == 0:
+                allowed += count
+                continue
+            denied += count
+            failed = [label for bit, label in enumerate(self.labels) if bits >> bit & 1]
+            for label in failed:
+                reasons[label] += count
+            for first, second in combinations(failed, 2):
+                pairs[first + " + " + second] += count
+        for code, count in invalid:
+            invalid_total += count
+            reasons[reason_text(code)] += count
+        return {
+            "users": allowed + denied + invalid_total,
+            "allowed": allowed,
+            "denied": denied,
+            "invalid": invalid_total,
+            "reasons": dict(reasons.most_common()),
+            "reason_pairs": dict(pairs.most_common()),
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        summary = self._summary(
+            ((bits, count) for (_, bits), count in self.decided.items()),
+            ((code, count) for (_, code), count in self.invalid.items()),
+        )
+        if self.field is not None:
+            # Keyed by (type, value), as in _factorize.
+            groups: dict[tuple[type, Any], tuple[list, list]] = {}
+            for (group, bits), count in self.decided.items():
+                groups.setdefault((type(group), group), ([], []))[0].append((bits, count))
+            for (group, code), count in self.invalid.items():
+                groups.setdefault((type(group), group), ([], []))[1].append((code, count))
+            summary["by"] = self.field
+            summary["groups"] = {
+                str(value): self._summary(decided, invalid)
+                for (_, value), (decided, invalid) in groups.items()
+            }
+        return summary
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def dump_text(self) -> str:
+        """Totals, reasons and reason pairs, then one block per group value."""
+        report = self.to_dict()
+        lines = _text_block(report, "")
+        for value, group in report.get("groups", {}).items():
+            lines.append(f"{report['by']}={value}:")
+            lines.extend(_text_block(group, "  "))
+        return "\n".join(lines)
+
+
+def _text_block(summary: Mapping[str, Any], indent: str) -> list[str]:
+    lines = [f"{indent}users {summary['users']}  allowed {summary['allowed']}"
+             f"  denied {summary['denied']}  invalid {summary['invalid']}"]
+    for title, key in (("reasons", "reasons"), ("reason pairs", "reason_pairs")):
+        if summary[key]:
+            lines.append(f"{indent}{title}:")
+            lines.extend(f"{indent}  {count:>10}  {label}" for label, count in summary[key].items())
+    return lines
+
+
+def population_report(
+    records: Iterable[dict[str, Any]],
+    rule_list: Sequence[Rule],
+    field: str | None = None,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> PopulationReport:
+    """
+    Validate and evaluate every record (e.g. a UserStore) in one chunked pass and
+    count outcomes, optionally broken down by the value of `field`.
+    """
+    report = PopulationReport(rule_labels(rule_list), field)
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_rows))
+        if not chunk:
+            break
+        report.add_chunk(chunk, rule_list)
+    return report
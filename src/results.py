@@ -0,0 +1,206 @@
+"""
+Compact result types for the policy pipeline.
+
+RuleResult, ValidationResult and Decision hold the same data as the
+{"passed", "reason"}, {"valid", "reason"} and {"allowed", "reasons"} dicts, but in
+__slots__ objects with reasons stored as small int codes. They are read-only
+Mappings, so callers that do result["passed"], "valid" in decision or
+decision == {...} keep working, and immutable (setting an attribute raises
+AttributeError), so the shared PASSED / VALID / ALLOWED instances stay correct.
+
+Reason strings are interned once in a process-wide table; code 0.. map back to text.
+The table only grows: every distinct reason a rule returns stays in it for the life
+of the process. Rules should return reasons from a fixed set (put per-record detail
+elsewhere), or the table grows with the number of distinct texts.
+"""
+
+import threading
+from collections.abc import Mapping
+from typing import Any, Iterator
+
+REASON_TEXTS: list[Any] = []
+REASON_CODES: dict[Any, int] = {}
+_intern_lock = threading.Lock()
+
+
+class _Frozen:
+    """Base for the result types: slots are set once, in __init__."""
+
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self) -> tuple[Any, tuple[Any, ...]]:
+        # Rebuild through __init__ (pickle and copy would otherwise setattr the slots).
+        return type(self), tuple(getattr(self, name) for name in self.__slots__)
+
+
+def reason_code(text: Any) -> int:
+    """
+    Return the code for a reason, adding it to the table the first time it is seen.
+    Entries are never removed (see the module docstring). Raises ValueError for a
+    reason that cannot be a table key (e.g. a list).
+    """
+    try:
+        code = REASON_CODES.get(text)
+    except TypeError:
+        raise ValueError(
+            f"rule reason must be hashable (e.g. a str), got {type(text).__name__}: {text!r}"
+        ) from None
+    if code is not None:
+        return code
+    with _intern_lock:
+        code = REASON_CODES.get(text)
+        if code is None:
+            code = len(REASON_TEXTS)
+            REASON_TEXTS.append(text)
+            REASON_CODES[text] = code
+    return code
+
+
+def reason_text(code: int) -> Any:
+    """Return the reason string for a code."""
+    return REASON_TEXTS[code]
+
+
+# Built-in reasons get stable codes 0-5, in pipeline order.
+MISSING_AGE = reason_code("missing age")
+AGE_NOT_A_NUMBER = reason_code("age not a number")
+AGE_OUT_OF_RANGE = reason_code("age out of range")
+AGE_BELOW_MINIMUM = reason_code("age below minimum")
+ACCOUNT_NOT_VERIFIED = reason_code("account not verified")
+REGION_RESTRICTED = reason_code("region restricted")
+
+
+class RuleResult(_Frozen, Mapping):
+    """One rule's outcome. Reads like {"passed": bool, "reason": str or None}."""
+
+    __slots__ = ("passed", "code")
+    _KEYS = ("passed", "reason")
+
+    def __init__(self, passed: bool, code: int | None = None) -> None:
+        object.__setattr__(self, "passed", passed)
+        object.__setattr__(self, "code", code)
+
+    @property
+    def reason(self) -> Any:
+        return None if self.code is None else REASON_TEXTS[self.code]
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "passed":
+            return self.passed
+        if key == "reason":
+            return self.reason
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._KEYS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return 2
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class ValidationResult(_Frozen, Mapping):
+    """Validation outcome. Reads like {"valid": True} or {"valid": False, "reason": str}."""
+
+    __slots__ = ("valid", "code")
+
+    def __init__(self, valid: bool, code: int | None = None) -> None:
+        object.__setattr__(self, "valid", valid)
+        object.__setattr__(self, "code", code)
+
+    @property
+    def reason(self) -> Any:
+        return None if self.code is None else REASON_TEXTS[self.code]
+
+    def _keys(self) -> tuple[str, ...]:
+        return ("valid",) if self.valid else ("valid", "reason")
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "valid":
+            return self.valid
+        if key == "reason" and not self.valid:
+            return self.reason
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class Decision(_Frozen, Mapping):
+    """Allow/deny outcome. Reads like {"allowed": bool, "reasons": [str, ...]}."""
+
+    __slots__ = ("codes",)
+    _KEYS = ("allowed", "reasons")
+
+    def __init__(self, codes: tuple[int, ...] = ()) -> None:
+        object.__setattr__(self, "codes", codes)
+
+    @property
+    def allowed(self) -> bool:
+        return len(self.codes) == 0
+
+    @property
+    def reasons(self) -> list[Any]:
+        return [REASON_TEXTS[code] for code in self.codes]
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "allowed":
+            return len(self.codes) == 0
+        if key == "reasons":
+            return self.reasons
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._KEYS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return 2
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+# Shared instances for the common outcomes; no allocation per call.
+PASSED = RuleResult(True)
+VALID = ValidationResult(True)
+ALLOWED = Decision()
+
+
+def failed(code: int) -> RuleResult:
+    """A failing RuleResult for a reason code."""
+    return RuleResult(False, code)
+
+
+def invalid(code: int) -> ValidationResult:
+    """A failing ValidationResult for a reason code."""
+    return ValidationResult(False, code)
+
+
+def decision_from_codes(codes: list[int]) -> Decision:
+    """Decision for a list of failure codes in rule order."""
+    if not codes:
+        return ALLOWED
+    return Decision(tuple(codes))
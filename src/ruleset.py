@@ -0,0 +1,137 @@
+"""
+Versioned, immutable rule-set snapshots that a running engine can swap.
+
+A RuleSet is a frozen sequence of rules plus a version number and its compiled
+evaluator. It can be passed anywhere a rule list is expected (run_policy,
+compile_rules, DecisionCache, ...). A RuleRegistry holds the current RuleSet:
+    - readers take registry.current once and use that snapshot for the whole
+      evaluation, so an evaluation already in flight finishes on the version it
+      started with;
+    - publish() builds and compiles the new snapshot first and then rebinds
+      registry.current in one assignment, so readers never wait for a swap and
+      never see a half-built rule set.
+Only publishers take a lock, to hand out versions in order.
+
+Rules are named "module:function" ("rule_age" alone means policy.rule_age), so a
+rule set can be given on the command line or over the wire. Only declared rules
+resolve: the built-ins and functions passed to policy.declare_fields (when their
+module is imported), never an arbitrary callable such as sys:exit. reload() can
+re-import the modules that define the current user rules and publish their new
+code. policy itself is never reloaded: its tables (RULE_FIELDS, INLINE_RULES,
+batch.VECTOR_RULES, ...) are keyed by the built-in rule functions, and
+re-executing it would give those functions new identities.
+"""
+
+import importlib
+import sys
+import threading
+from collections.abc import Sequence
+from typing import Any, Iterator, overload
+
+from policy import DEFAULT_RULES, RULE_FIELDS, Evaluator, Rule, compile_rules
+
+DEFAULT_RULE_MODULE = "policy"
+
+
+def rule_name(rule_fn: Rule) -> str:
+    """"module:name" for a rule function ("name" for policy's built-in rules)."""
+    module = getattr(rule_fn, "__module__", None)
+    name = getattr(rule_fn, "__qualname__", None) or repr(rule_fn)
+    if module is None or module == DEFAULT_RULE_MODULE:
+        return name
+    return module + ":" + name
+
+
+def resolve_rule(name: str) -> Rule:
+    """
+    Import the declared rule "module:function" (or policy's "function"); ValueError if
+    the module fails to import or the name is not a rule declared with declare_fields.
+    """
+    module_name, _, attr = name.rpartition(":")
+    module_name = module_name or DEFAULT_RULE_MODULE
+    try:
+        module = importlib.import_module(module_name)
+        rule_fn = getattr(module, attr, None)
+    except Exception as exc:  # a syntax error or a raising import in the rule module
+        raise ValueError(f"cannot import {module_name}: {exc!r}") from None
+    try:
+        declared = rule_fn in RULE_FIELDS
+    except TypeError:  # unhashable
+        declared = False
+    if not declared:
+        raise ValueError("no such rule: " + name)
+    return rule_fn
+
+
+class RuleSet(Sequence):
+    """One immutable version of the rule list, compiled once when it is created."""
+
+    __slots__ = ("rules", "version", "evaluate")
+
+    def __init__(self, rules: Sequence[Rule], version: int = 1) -> None:
+        self.rules: tuple[Rule, ...] = tuple(rules)
+        self.version = version
+        # Compiled (and entered in compile_rules' cache) before the set is
+        # published, so the first evaluation on it does not pay for compiling.
+        self.evaluate: Evaluator = compile_rules(self.rules)
+
+    @overload
+    def __getitem__(self, index: int) -> Rule: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> tuple[Rule, ...]: ...
+
+    def __getitem__(self, index: Any) -> Any:
+        return self.rules[index]
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def __iter__(self) -> Iterator[Rule]:
+        return iter(self.rules)
+
+    def names(self) -> list[str]:
+        return [rule_name(rule_fn) for rule_fn in self.rules]
+
+    def __repr__(self) -> str:
+        return f"RuleSet(v{self.version}: {', '.join(self.names())})"
+
+
+class RuleRegistry:
+    """Holds the current RuleSet; swaps it atomically on publish/reload."""
+
+    def __init__(self, rules: Sequence[Rule] = DEFAULT_RULES) -> None:
+        self.current = RuleSet(rules)
+        self._publish_lock = threading.Lock()
+
+    def publish(self, rules: Sequence[Rule]) -> RuleSet:
+        """Make rules the current set under the next version; return the new snapshot."""
+        with self._publish_lock:
+            rule_set = RuleSet(rules, self.current.version + 1)
+            self.current = rule_set
+        return rule_set
+
+    def use(self, names: Sequence[str]) -> RuleSet:
+        """Publish the rules named "module:function"; ValueError if one cannot be found."""
+        if not names:
+            raise ValueError("a rule set needs at least one rule")
+        return self.publish([resolve_rule(name) for name in names])
+
+    def reload(self) -> RuleSet:
+        """Re-import the modules defining the current user rules and publish their new code."""
+        names = self.current.names()
+        modules = {name.rpartition(":")[0] for name in names} - {"", DEFAULT_RULE_MODULE}
+        for module_name in sorted(modules):
+            module = sys.modules.get(module_name)
+            if module is None or module_name == "__main__":
+                raise ValueError("cannot reload rules defined in " + module_name)
+            try:
+                importlib.reload(module)
+            except Exception as exc:  # a syntax error in the edited module, say
+                raise ValueError(f"reloading {module_name} failed: {exc}") from None
+        return self.use(names)
+
+    def describe(self) -> str:
+        """The current version and its rules, for the rules command."""
+        rule_set = self.current
+        return f"rules v{rule_set.version}: {', '.join(rule_set.names())}"
@@ -0,0 +1,304 @@
+"""
+asyncio policy-decision server: line-delimited JSON over TCP and/or a Unix socket.
+
+Each request is one JSON object per line; each response is one JSON object per
+line carrying the request's "id" back, so a client can pipeline requests on one
+connection and match responses (which may come back out of order).
+
+    {"id": 1, "op": "add", "record": {"id": "a", "age": 25, "verified": true, "region": "US"}}
+    {"id": 2, "op": "eval", "user_id": "a"}
+    {"id": 3, "op": "list", "limit": 100}
+    {"id": 4, "op": "rules", "use": ["rule_age", "mymodule:rule_x"]}
+
+    {"id": 1, "ok": true, "result": "added a"}
+    {"id": 2, "ok": true, "result": "Allowed", "rules_version": 1}
+    {"id": 3, "ok": true, "users": [...]}
+    {"id": 4, "ok": true, "rules_version": 2, "rules": ["rule_age", "mymodule:rule_x"]}
+    {"id": 5, "ok": false, "error": "..."}
+
+The rule set lives in a RuleRegistry (see ruleset.py). `rules` with no "use" or
+"reload": true only reports it; a swap is compiled off the event loop, and each
+eval batch runs on the snapshot that was current when the batch started, so
+evals never wait for a swap and every eval response names the version that
+decided it.
+
+Eval requests are micro-batched: they wait in a queue until max_batch have
+arrived or batch_window seconds have passed since the first, then the whole batch
+runs through run_policy in one go. Backpressure works at two levels: each
+connection has at most max_in_flight requests outstanding (beyond that the server
+stops reading from it, so TCP flow control pushes back on the client), and when
+the eval queue already holds max_pending requests new evals are rejected at once
+with "overloaded" instead of queueing without bound. A rule that raises fails
+only the eval it was running for ("ok": false); the batch carries on.
+
+`add` checks and coerces its record like the CLI's add and load (a "true" or 1
+verified becomes a bool, a "25" age an int). A request line longer than the
+stream limit (64 KiB by default) gets an error response with "id": null, and the
+connection is closed once the requests before it have been answered.
+
+`engine serve` keeps in-memory users in a ConcurrentUserStore, so other threads
+of an embedding process (a loader, an admin job) can write to server.users while
+it serves: adds are checked and inserted under the store's lock, and `list`
+pages through one snapshot, so its total and its users agree and a concurrent
+add_many shows up whole or not at all.
+"""
+
+import asyncio
+import json
+import os
+from functools import partial
+from typing import Any, Sequence
+
+from cli import clean_record
+from policy import DEFAULT_RULES, Rule, RunPolicyFn, run_policy
+from concurrent_store import ConcurrentUserStore
+from ruleset import RuleRegistry
+from store import Store
+
+DEFAULT_BATCH_WINDOW = 0.002
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_PENDING = 10_000
+DEFAULT_MAX_IN_FLIGHT = 64
+DEFAULT_LIST_LIMIT = 1_000
+
+
+class PolicyServer:
+    """Serves add/eval/list/rules against one user Store and a swappable rule set."""
+
+    def __init__(
+        self,
+        users: Store,
+        rules_list: Sequence[Rule] = DEFAULT_RULES,
+        run_policy_fn: RunPolicyFn = run_policy,
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        registry: RuleRegistry | None = None,
+    ) -> None:
+        self.users = users
+        self.registry = registry if registry is not None else RuleRegistry(rules_list)
+        self.run_policy_fn = run_policy_fn
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.max_in_flight = max_in_flight
+        self._queue: asyncio.Queue[tuple[str, asyncio.Future]] | None = None
+        self._batcher: asyncio.Task | None = None
+        self.batches = 0
+        self.batched_evals = 0
+        self.rejected = 0
+        self.eval_errors = 0
+
+    # -- eval micro-batching ------------------------------------------------
+
+    async def _run_batches(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self.batches += 1
+            self.batched_evals += len(batch)
+            rule_set = self.registry.current
+            for user_id, future in batch:
+                if future.cancelled():
+                    continue
+                record = self.users.get(user_id)
+                if record is None:
+                    future.set_result({"ok": False, "error": "user not found: " + user_id})
+                    continue
+                try:
+                    result = self.run_policy_fn(record, rule_set)
+                except KeyboardInterrupt:
+                    raise
+                except BaseException as exc:  # a broken rule (even sys.exit) fails this eval only
+                    self.eval_errors += 1
+                    future.set_result({"ok": False, "error": f"eval failed: {exc!r}",
+                                       "rules_version": rule_set.version})
+                    continue
+                future.set_result({"ok": True, "result": result,
+                                   "rules_version": rule_set.version})
+
+    async def _eval(self, user_id: str) -> dict[str, Any]:
+        assert self._queue is not None
+        if self._queue.qsize() >= self.max_pending:
+            self.rejected += 1
+            return {"ok": False, "error": "overloaded"}
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((user_id, future))
+        return await future
+
+    # -- request handling ---------------------------------------------------
+
+    def _add(self, request: dict[str, Any]) -> dict[str, Any]:
+        record = request.get("record")
+        if not isinstance(record, dict) or "id" not in record:
+            return {"ok": False, "error": "add requires: record with an id"}
+        record = dict(record)
+        error = clean_record(record)  # same checks and coercion as the CLI's add/load
+        if error is not None:
+            return {"ok": False, "error": "invalid record: " + error}
+        try:
+            self.users.add(record)  # checks for the id and inserts in one step
+        except ValueError:
+            return {"ok": False, "error": "user already exists: " + str(record["id"])}
+        return {"ok": True, "result": "added " + str(record["id"])}
+
+    def _list(self, request: dict[str, Any]) -> dict[str, Any]:
+        limit = request.get("limit", DEFAULT_LIST_LIMIT)
+        offset = request.get("offset", 0)
+        if not isinstance(limit, int) or not isinstance(offset, int) or limit < 0 or offset < 0:
+            return {"ok": False, "error": "limit and offset must be non-negative integers"}
+        view = self.users.snapshot() if isinstance(self.users, ConcurrentUserStore) else self.users
+        users = []
+        for position, record in enumerate(view):
+            if position < offset:
+                continue
+            if len(users) >= limit:
+                break
+            users.append(record)
+        return {"ok": True, "total": len(view), "users": users}
+
+    async def _rules(self, request: dict[str, Any]) -> dict[str, Any]:
+        names = request.get("use")
+        if names is not None and (not isinstance(names, list)
+                                  or not all(isinstance(name, str) for name in names)):
+            return {"ok": False, "error": "use must be a list of rule names"}
+        swap = None
+        if names is not None:
+            swap = partial(self.registry.use, names)
+        elif request.get("reload"):
+            swap = self.registry.reload
+        if swap is not None:
+            # Importing and compiling happen in a worker thread; the batcher keeps
+            # evaluating on the old snapshot until the registry rebinds `current`.
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, swap)
+            except ValueError as exc:
+                return {"ok": False, "error": str(exc)}
+        rule_set = self.registry.current
+        return {"ok": True, "rules_version": rule_set.version, "rules": rule_set.names()}
+
+    async def handle_request(self, request: Any) -> dict[str, Any]:
+        """Run one decoded request; return the response without its "id"."""
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "request must be a JSON object"}
+        op = request.get("op")
+        if op == "eval":
+            user_id = request.get("user_id")
+            if user_id is None:
+                return {"ok": False, "error": "eval requires: user_id"}
+            return await self._eval(str(user_id))
+        if op == "add":
+            return self._add(request)
+        if op == "list":
+            return self._list(request)
+        if op == "rules":
+            return await self._rules(request)
+        return {"ok": False, "error": "unknown op: " + str(op)}
+
+    async def _respond(
+        self,
+        line: bytes,
+        writer: asyncio.StreamWriter,
+        slots: asyncio.Semaphore,
+    ) -> None:
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                request_id, response = None, {"ok": False, "error": "invalid json"}
+            else:
+                request_id = request.get("id") if isinstance(request, dict) else None
+                response = await self.handle_request(request)
+            response["id"] = request_id
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            slots.release()
+
+    async def handle_connection(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        slots = asyncio.Semaphore(self.max_in_flight)
+        tasks: set[asyncio.Task] = set()
+        overlong = False
+        try:
+            while True:
+                await slots.acquire()
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    # Longer than the stream limit: the rest of it can't be told apart
+                    # from the next request, so answer it and stop reading.
+                    slots.release()
+                    overlong = True
+                    break
+                if not line:
+                    slots.release()
+                    break
+                if not line.strip():
+                    slots.release()
+                    continue
+                task = asyncio.create_task(self._respond(line, writer, slots))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+            if overlong:
+                response = {"ok": False, "error": "request line too long", "id": None}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    # -- lifecycle ----------------------------------------------------------
+
+    async def start(self, host: str | None = None, port: int | None = None,
+                    unix_path: str | None = None) -> list[asyncio.AbstractServer]:
+        """Start listening on TCP and/or a Unix socket; return the asyncio servers."""
+        if port is None and unix_path is None:
+            raise ValueError("give a TCP port, a Unix socket path, or both")
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._run_batches())
+        servers = []
+        if port is not None:
+            servers.append(await asyncio.start_server(self.handle_connection, host, port))
+        if unix_path is not None:
+            if os.path.exists(unix_path):
+                os.unlink(unix_path)
+            servers.append(await asyncio.start_unix_server(self.handle_connection, unix_path))
+        return servers
+
+    async def serve_forever(self, host: str | None = None, port: int | None = None,
+                            unix_path: str | None = None) -> None:
+        servers = await self.start(host, port, unix_path)
+        try:
+            await asyncio.gather(*(server.serve_forever() for server in servers))
+        finally:
+            if self._batcher is not None:
+                self._batcher.cancel()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "batched_evals": self.batched_evals,
+            "mean_batch": self.batched_evals / self.batches if self.batches else 0.0,
+            "rejected": self.rejected,
+            "eval_errors": self.eval_errors,
+        }
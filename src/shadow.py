@@ -0,0 +1,278 @@
+"""
+Shadow evaluation: a candidate rule list run alongside the primary in one pass.
+
+Trying a policy change used to mean two full runs (old rules, new rules) and a
+diff of their outputs. Here each record is read and validated once, and
+compile_shadow generates one function (like compile_rules) that runs every rule
+appearing in either list exactly once, built-in rules inlined, and assembles both
+Decisions from the shared results:
+
+    primary   [rule_age, rule_verified, rule_region]
+    candidate [rule_age, rule_region, rule_kyc]        4 rule calls, not 6
+
+The primary decision is the one served. When the candidate's differs, a compact
+diff row goes to the Shadow's on_diff callback:
+
+    {"id": "u7", "allowed": true, "candidate_allowed": false,
+     "added": ["kyc incomplete"], "removed": []}
+
+and ShadowSummary counts records, flips each way and reasons added/removed.
+Validation is shared, so an invalid record never differs between the two.
+"""
+
+import json
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Mapping, Sequence
+
+from output import BulkWriter
+from policy import (
+    COMPILED_CACHE_SIZE, INLINE_RULES, Rule, evaluator_namespace, format_result, validate,
+)
+from results import Decision, reason_text
+from ruleset import RuleSet
+
+ShadowEvaluator = Callable[[dict[str, Any]], tuple[Decision, Decision]]
+DiffSink = Callable[[dict[str, Any]], Any]
+
+# Most frequent (primary reasons -> candidate reasons) changes listed in the summary.
+SUMMARY_CHANGES = 20
+
+_compiled_cache: dict[tuple[tuple[Rule, ...], tuple[Rule, ...]], ShadowEvaluator] = {}
+
+
+def _distinct_rules(primary: Sequence[Rule], candidate: Sequence[Rule]) -> list[Rule]:
+    # Every rule of either list once, by identity (rules need not be hashable).
+    rules: list[Rule] = []
+    for rule_fn in (*primary, *candidate):
+        if not any(rule_fn is seen for seen in rules):
+            rules.append(rule_fn)
+    return rules
+
+
+def shadow_source(primary: Sequence[Rule], candidate: Sequence[Rule]) -> tuple[str, dict[str, Any]]:
+    """Source and globals of shadow_evaluate(record) -> (primary Decision, candidate Decision)."""
+    rules = _distinct_rules(primary, candidate)
+    namespace = evaluator_namespace(rules)
+    lines = [
+        "def shadow_evaluate(record):",
+        "    get = record.get",
+    ]
+    # f<i>: rule i's failure code, or None if it passed.
+    for i, rule_fn in enumerate(rules):
+        if rule_fn in INLINE_RULES:
+            condition, code = INLINE_RULES[rule_fn]
+            lines.append(f"    f{i} = {code} if {condition} else None")
+        else:
+            lines.append(f"    result = rule_{i}(record)")
+            lines.append(f'    f{i} = None if result["passed"] else reason_code(result["reason"])')
+    for name, rule_list in (("p", primary), ("c", candidate)):
+        lines.append(f"    {name} = []")
+        for rule_fn in rule_list:
+            i = next(i for i, seen in enumerate(rules) if seen is rule_fn)
+            lines.append(f"    if f{i} is not None:")
+            lines.append(f"        {name}.append(f{i})")
+    lines.append("    return (Decision(tuple(p)) if p else ALLOWED,"
+                 " Decision(tuple(c)) if c else ALLOWED)")
+    return "\n".join(lines), namespace
+
+
+def compile_shadow(primary: Sequence[Rule], candidate: Sequence[Rule]) -> ShadowEvaluator:
+    """
+    Return one function giving (evaluate(record, primary), evaluate(record, candidate)),
+    running shared rules once. Assumes the record is valid. Cached per pair of sequences
+    (the COMPILED_CACHE_SIZE most recent, as compile_rules).
+    """
+    try:
+        key = (tuple(primary), tuple(candidate))
+        compiled = _compiled_cache.get(key)
+    except TypeError:
+        key = None
+        compiled = None
+    if compiled is None:
+        source, namespace = shadow_source(primary, candidate)
+        exec(source, namespace)  # pylint: disable=exec-used
+        compiled = namespace["shadow_evaluate"]
+        if key is not None:
+            if len(_compiled_cache) >= COMPILED_CACHE_SIZE:
+                del _compiled_cache[next(iter(_compiled_cache))]  # the oldest
+            _compiled_cache[key] = compiled
+    return compiled
+
+
+@lru_cache(maxsize=4096)
+def _reason_delta(primary: tuple[int, ...],
+                  candidate: tuple[int, ...]) -> tuple[tuple[Any, ...], tuple[Any, ...]]:
+    # (reasons only the candidate gives, reasons only the primary gives); few
+    # distinct pairs occur, so each is worked out once.
+    return (tuple(reason_text(code) for code in candidate if code not in primary),
+            tuple(reason_text(code) for code in primary if code not in candidate))
+
+
+def diff_row(user_id: Any, primary: Decision, candidate: Decision) -> dict[str, Any]:
+    """The compact diff row for a record whose two decisions differ."""
+    added, removed = _reason_delta(primary.codes, candidate.codes)
+    return {
+        "id": user_id,
+        "allowed": not primary.codes,
+        "candidate_allowed": not candidate.codes,
+        "added": list(added),
+        "removed": list(removed),
+    }
+
+
+class ShadowSummary:
+    """Counts from a shadow run; to_dict() / to_json() / dump_text() export."""
+
+    def __init__(self) -> None:
+        self.records = 0
+        self.invalid = 0
+        # (primary codes, candidate codes) -> records, for records whose decisions differ
+        self.changes: Counter[tuple[tuple[int, ...], tuple[int, ...]]] = Counter()
+
+    @property
+    def changed(self) -> int:
+        return sum(self.changes.values())
+
+    def to_dict(self) -> dict[str, Any]:
+        to_deny = to_allow = 0
+        added: Counter[str] = Counter()
+        removed: Counter[str] = Counter()
+        for (primary, candidate), count in self.changes.items():
+            if not primary:
+                to_deny += count
+            elif not candidate:
+                to_allow += count
+            for code in candidate:
+                if code not in primary:
+                    added[reason_text(code)] += count
+            for code in primary:
+                if code not in candidate:
+                    removed[reason_text(code)] += count
+        changed = self.changed
+        return {
+            "records": self.records,
+            "invalid": self.invalid,
+            "unchanged": self.records - changed,
+            "changed": changed,
+            "allow_to_deny": to_deny,
+            "deny_to_allow": to_allow,
+            "reasons_added": dict(added.most_common()),
+            "reasons_removed": dict(removed.most_common()),
+            "changes": [
+                {"primary": [reason_text(code) for code in primary],
+                 "candidate": [reason_text(code) for code in candidate],
+                 "count": count}
+                for (primary, candidate), count in self.changes.most_common(SUMMARY_CHANGES)
+            ],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def dump_text(self) -> str:
+        """Totals, flips, reason deltas, then the most frequent changes."""
+        summary = self.to_dict()
+        lines = [
+            f"shadow: {summary['records']} records, {summary['changed']} changed"
+            f" ({summary['allow_to_deny']} allow->deny, {summary['deny_to_allow']} deny->allow),"
+            f" {summary['unchanged']} unchanged ({summary['invalid']} invalid)",
+        ]
+        for title, key in (("reasons added", "reasons_added"),
+                           ("reasons removed", "reasons_removed")):
+            if summary[key]:
+                lines.append(f"{title}:")
+                lines.extend(f"  {count:>10}  {label}" for label, count in summary[key].items())
+        if summary["changes"]:
+            lines.append("changes:")
+            lines.extend(f"  {change['count']:>10}  {_outcome(change['primary'])}"
+                         f" -> {_outcome(change['candidate'])}" for change in summary["changes"])
+        return "\n".join(lines)
+
+
+def _outcome(reasons: Sequence[Any]) -> str:
+    return format_result({"allowed": not reasons, "reasons": reasons})
+
+
+class Shadow:
+    """A primary and a candidate rule list, evaluated together; serves the primary."""
+
+    def __init__(
+        self,
+        primary: Sequence[Rule],
+        candidate: Sequence[Rule],
+        on_diff: DiffSink | None = None,
+    ) -> None:
+        self.primary = primary
+        self.candidate = candidate
+        self.on_diff = on_diff
+        self.summary = ShadowSummary()
+        self.evaluate = compile_shadow(primary, candidate)
+        # run_policy's last immutable rule list (a RuleSet, say) and its evaluator.
+        self._served: Sequence[Rule] = primary
+        self._served_evaluate = self.evaluate
+
+    def _decide(self, record: dict[str, Any], evaluate_fn: ShadowEvaluator) -> Mapping[str, Any]:
+        summary = self.summary
+        summary.records += 1
+        validation = validate(record)
+        if not validation["valid"]:
+            summary.invalid += 1
+            return validation
+        primary, candidate = evaluate_fn(record)
+        if primary.codes != candidate.codes:
+            summary.changes[primary.codes, candidate.codes] += 1
+            if self.on_diff is not None:
+                self.on_diff(diff_row(record.get("id"), primary, candidate))
+        return primary
+
+    def decide(self, record: dict[str, Any]) -> Mapping[str, Any]:
+        """Validation failure or the primary Decision; the candidate's is only compared."""
+        return self._decide(record, self.evaluate)
+
+    def run_policy(self, record: dict[str, Any], rule_list: Sequence[Rule]) -> str:
+        """policy.run_policy in shadow: rule_list is the primary (a RunPolicyFn)."""
+        if rule_list is self._served:
+            evaluate_fn = self._served_evaluate
+        elif rule_list is self.primary:
+            evaluate_fn = self.evaluate
+        else:
+            evaluate_fn = compile_shadow(rule_list, self.candidate)
+            if isinstance(rule_list, (tuple, RuleSet)):
+                # Immutable: reuse the evaluator until a different rule set comes in.
+                self._served, self._served_evaluate = rule_list, evaluate_fn
+        return format_result(self._decide(record, evaluate_fn))
+
+
+def write_decisions_shadow(records: Iterable[dict[str, Any]], shadow: Shadow,
+                           writer: BulkWriter) -> int:
+    """stream.write_decisions for shadow.primary, comparing shadow.candidate on the way."""
+    # Shadow.decide inlined, with its lookups hoisted out of the loop.
+    evaluate_fn = shadow.evaluate
+    on_diff = shadow.on_diff
+    summary = shadow.summary
+    changes = summary.changes
+    write_decision = writer.write_decision
+    start = writer.rows
+    count = invalid = 0
+    try:
+        for record in records:
+            if "_error" in record:
+                writer.write_row({"id": None, "error": record["_error"]})
+                continue
+            count += 1
+            validation = validate(record)
+            if not validation["valid"]:
+                invalid += 1
+                write_decision(record.get("id"), validation)
+                continue
+            primary, candidate = evaluate_fn(record)
+            if primary.codes != candidate.codes:
+                changes[primary.codes, candidate.codes] += 1
+                if on_diff is not None:
+                    on_diff(diff_row(record.get("id"), primary, candidate))
+            write_decision(record.get("id"), primary)
+    finally:
+        summary.records += count
+        summary.invalid += invalid
+    return writer.rows - start
@@ -0,0 +1,116 @@
+"""
+User store for the stateful CLI.
+
+Records are kept in insertion order in a dict keyed by str(id), so lookup by id is
+one hash probe instead of a walk over every user. Optional secondary indexes map a
+field value (e.g. region "US" or verified True) to the ids that have it.
+
+Store is the interface the CLI, the server and engine.py program against;
+UserStore and its subclasses implement it, and so does
+columnar_store.ColumnarUserStore, which shares no code with them.
+"""
+
+from typing import Any, Iterator, Protocol, Sequence
+
+
+class Store(Protocol):
+    """What callers may rely on from a user store (see UserStore for the semantics)."""
+
+    def __len__(self) -> int: ...
+
+    def __iter__(self) -> Iterator[dict[str, Any]]: ...
+
+    def __contains__(self, user_id: object) -> bool: ...
+
+    def add(self, record: dict[str, Any]) -> None: ...
+
+    def add_many(self, records: Sequence[dict[str, Any]]) -> None: ...
+
+    def replace(self, record: dict[str, Any]) -> dict[str, Any] | None: ...
+
+    def get(self, user_id: object) -> dict[str, Any] | None: ...
+
+    def find(self, field: str, value: Any) -> list[dict[str, Any]]: ...
+
+
+class UserStore:
+    """Id-indexed, insertion-ordered store of user records."""
+
+    def __init__(self, index_fields: Sequence[str] = ()) -> None:
+        self._by_id: dict[str, dict[str, Any]] = {}
+        # field -> value -> ids (a dict used as an insertion-ordered set)
+        self._indexes: dict[str, dict[Any, dict[str, None]]] = {}
+        for field in index_fields:
+            self._indexes[field] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return iter(self._by_id.values())
+
+    def __contains__(self, user_id: object) -> bool:
+        return str(user_id) in self._by_id
+
+    def add(self, record: dict[str, Any]) -> None:
+        """Insert a new record. Raises ValueError if its id is already stored."""
+        key = str(record["id"])
+        if key in self._by_id:
+            raise ValueError("duplicate id: " + key)
+        self._by_id[key] = record
+        for field, index in self._indexes.items():
+            index.setdefault(record.get(field), {})[key] = None
+
+    def add_many(self, records: Sequence[dict[str, Any]]) -> None:
+        """
+        Insert a batch of new records. Raises ValueError (and adds nothing) on any
+        duplicate id.
+        """
+        keys = [str(record["id"]) for record in records]
+        batch = dict(zip(keys, records))
+        if len(batch) != len(keys) or not self._by_id.keys().isdisjoint(batch.keys()):
+            raise ValueError("duplicate id in batch")
+        if self._by_id:
+            self._by_id.update(batch)
+        else:
+            self._by_id = batch
+        for field, index in self._indexes.items():
+            # Group the batch's ids by value, then extend each bucket once.
+            groups: dict[Any, list[str]] = {}
+            for key, value in zip(keys, [record.get(field) for record in records]):
+                group = groups.get(value)
+                if group is None:
+                    group = groups[value] = []
+                group.append(key)
+            for value, group in groups.items():
+                bucket = index.get(value)
+                if bucket is None:
+                    index[value] = dict.fromkeys(group)
+                else:
+                    bucket.update(dict.fromkeys(group))
+
+    def replace(self, record: dict[str, Any]) -> dict[str, Any] | None:
+        """Insert or overwrite the record with this id; return the old record, if any."""
+        key = str(record["id"])
+        old = self._by_id.get(key)
+        if old is not None:
+            for field, index in self._indexes.items():
+                ids = index[old.get(field)]
+                del ids[key]
+                if not ids:
+                    del index[old.get(field)]
+        self._by_id[key] = record
+        for field, index in self._indexes.items():
+            index.setdefault(record.get(field), {})[key] = None
+        return old
+
+    def get(self, user_id: object) -> dict[str, Any] | None:
+        """Return the record with this id, or None."""
+        return self._by_id.get(str(user_id))
+
+    def find(self, field: str, value: Any) -> list[dict[str, Any]]:
+        """Return records whose field equals value, in insertion order."""
+        if field not in self._indexes:
+            raise KeyError("no index on field: " + field)
+        ids = self._indexes[field].get(value, {})
+        return [self._by_id[key] for key in ids]
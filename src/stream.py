@@ -0,0 +1,241 @@
+"""
+Streaming record evaluation: file in, decisions out, one record at a time.
+
+Every stage is a generator, so memory stays flat however large the input is, and
+output rows come out in input order. Files are opened with a large buffer.
+"""
+
+import csv
+import json
+from functools import lru_cache, partial
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Callable, IO, Iterable, Iterator, Sequence
+
+from output import BulkWriter, format_cached
+from policy import Rule, compile_rules, validate
+
+if TYPE_CHECKING:
+    from adaptive import AdaptiveGate
+    from metrics import PolicyMetrics
+
+BUFFER_SIZE = 1 << 20
+_TRUTHY = frozenset(("true", "1", "yes"))
+
+
+def detect_format(path: str) -> str:
+    """Return "csv" or "jsonl" from the file extension."""
+    if path.lower().endswith(".csv"):
+        return "csv"
+    return "jsonl"
+
+
+def parse_age(text: str) -> Any:
+    """Coerce a CSV age cell: int, then float, else the raw text (validate rejects it)."""
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def parse_verified(text: str) -> bool:
+    """Same truthy spellings as the CLI add command."""
+    return text.strip().lower() in _TRUTHY
+
+
+def coerce_csv_row(row: dict[str, str]) -> dict[str, Any]:
+    """Turn a CSV row of strings into a record. Empty cells count as missing."""
+    record: dict[str, Any] = {}
+    for key, value in row.items():
+        if key is None or value is None or value == "":
+            continue
+        if key == "age":
+            record[key] = parse_age(value)
+        elif key == "verified":
+            record[key] = parse_verified(value)
+        else:
+            record[key] = value
+    return record
+
+
+def read_jsonl(lines: Iterable[str], start: int = 1) -> Iterator[dict[str, Any]]:
+    """Yield one record per non-blank line. Lines that are not a JSON object yield an error row."""
+    for line_no, line in enumerate(lines, start=start):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield {"_error": f"line {line_no}: invalid json ({exc.msg})"}
+            continue
+        if not isinstance(record, dict):
+            yield {"_error": f"line {line_no}: not a JSON object"}
+            continue
+        yield record
+
+
+def read_csv(lines: Iterable[str]) -> Iterator[dict[str, Any]]:
+    """Yield one coerced record per CSV data row (header row names the fields)."""
+    for row in csv.DictReader(lines):
+        yield coerce_csv_row(row)
+
+
+def _coerce_csv_chunk(header: list[str], rows: list[list[str]]) -> list[dict[str, Any]]:
+    # Column-wise: when every row is complete (no short rows, no empty cells) each
+    # column is converted with one map() over it instead of per cell in Python.
+    if not rows:
+        return []
+    width = len(header)
+    if len(set(header)) != width or any(len(row) != width for row in rows):
+        return [coerce_csv_row(dict(zip(header, row))) for row in rows]
+    columns: list[Any] = list(zip(*rows))
+    if any("" in column for column in columns):
+        return [coerce_csv_row(dict(zip(header, row))) for row in rows]
+    for position, name in enumerate(header):
+        if name == "age":
+            try:
+                columns[position] = list(map(int, columns[position]))
+            except ValueError:
+                columns[position] = list(map(parse_age, columns[position]))
+        elif name == "verified":
+            lowered = map(str.lower, map(str.strip, columns[position]))
+            columns[position] = list(map(_TRUTHY.__contains__, lowered))
+    return _row_builder(tuple(header))(columns)
+
+
+@lru_cache(maxsize=64)
+def _row_builder(header: tuple[str, ...]) -> Callable[[list[Any]], list[dict[str, Any]]]:
+    # A dict display with constant keys builds each record about twice as fast as
+    # dict(zip(header, values)); generated once per distinct header.
+    names = [f"v{i}" for i in range(len(header))]
+    items = ", ".join(f"{key!r}: {name}" for key, name in zip(header, names))
+    source = (f"def build(columns):\n"
+              f"    return [{{{items}}} for {', '.join(names)}, in zip(*columns)]")
+    namespace: dict[str, Any] = {}
+    exec(source, namespace)  # pylint: disable=exec-used
+    return namespace["build"]
+
+
+def _parse_jsonl_chunk(lines: list[str], line_no: int) -> list[dict[str, Any]]:
+    # One json.loads over the chunk as a JSON array; if that fails or a line is
+    # blank or not an object, parse line by line to get per-line errors.
+    if not any(map(str.isspace, lines)):
+        try:
+            records = json.loads("[" + ",".join(lines) + "]")
+        except json.JSONDecodeError:
+            pass
+        else:
+            if len(records) == len(lines) and set(map(type, records)) == {dict}:
+                return records
+    return list(read_jsonl(lines, line_no))
+
+
+def read_record_chunks(handle: IO[str], fmt: str,
+                       chunk_size: int = 10_000) -> Iterator[list[dict[str, Any]]]:
+    """read_records in lists of up to chunk_size; CSV chunks are coerced column by column."""
+    if fmt == "jsonl":
+        line_no = 1
+        while True:
+            lines = list(islice(handle, chunk_size))
+            if not lines:
+                return
+            yield _parse_jsonl_chunk(lines, line_no)
+            line_no += len(lines)
+    if fmt != "csv":
+        raise ValueError("unknown format: " + fmt)
+    reader = csv.reader(handle)
+    header = next(reader, None)
+    if header is None:
+        return
+    while True:
+        rows = list(islice(reader, chunk_size))
+        if not rows:
+            return
+        if [] in rows:  # blank lines, which DictReader skips
+            rows = [row for row in rows if row]
+        yield _coerce_csv_chunk(header, rows)
+
+
+def read_records(handle: IO[str], fmt: str) -> Iterator[dict[str, Any]]:
+    """Yield records from an open text file in the given format."""
+    if fmt == "csv":
+        return read_csv(handle)
+    if fmt == "jsonl":
+        return read_jsonl(handle)
+    raise ValueError("unknown format: " + fmt)
+
+
+def decide_stream(
+    records: Iterable[dict[str, Any]],
+    rule_list: Sequence[Rule],
+    metrics: "PolicyMetrics | None" = None,
+) -> Iterator[dict[str, Any]]:
+    """validate → evaluate → format_result for each record; yield one output row each."""
+    if metrics is None:
+        validate_fn = validate
+        evaluate_fn = compile_rules(rule_list)
+        format_fn = format_cached
+    else:
+        validate_fn = metrics.validate
+        evaluate_fn = partial(metrics.evaluate, rule_list=rule_list)
+        format_fn = metrics.format_result
+    for record in records:
+        if "_error" in record:
+            yield {"id": None, "error": record["_error"]}
+            continue
+        validation = validate_fn(record)
+        if not validation["valid"]:
+            decision = validation
+        else:
+            decision = evaluate_fn(record)
+        row: dict[str, Any] = {"id": record.get("id")}
+        row.update(decision)
+        row["result"] = format_fn(decision)
+        yield row
+
+
+def gate_stream(
+    records: Iterable[dict[str, Any]],
+    gate: "AdaptiveGate",
+) -> Iterator[dict[str, Any]]:
+    """First-deny form of decide_stream: yield {"id", "allowed"} rows only."""
+    for record in records:
+        if "_error" in record:
+            yield {"id": None, "error": record["_error"]}
+            continue
+        yield {"id": record.get("id"), "allowed": gate(record)}
+
+
+def write_decisions(records: Iterable[dict[str, Any]], rule_list: Sequence[Rule],
+                    writer: BulkWriter) -> int:
+    """decide_stream straight into a BulkWriter, without building a row dict per record."""
+    evaluate_fn = compile_rules(rule_list)
+    start = writer.rows
+    for record in records:
+        if "_error" in record:
+            writer.write_row({"id": None, "error": record["_error"]})
+            continue
+        validation = validate(record)
+        if not validation["valid"]:
+            writer.write_decision(record.get("id"), validation)
+        else:
+            writer.write_decision(record.get("id"), evaluate_fn(record))
+    return writer.rows - start
+
+
+def decide_rows(records: list[dict[str, Any]], rule_list: Sequence[Rule]) -> list[dict[str, Any]]:
+    """List form of decide_stream, for handing whole chunks to a worker process."""
+    return list(decide_stream(records, rule_list))
+
+
+def write_jsonl(rows: Iterable[dict[str, Any]], handle: IO[str]) -> int:
+    """Write one JSON object per line; return the number of rows written."""
+    count = 0
+    for row in rows:
+        handle.write(json.dumps(row))
+        handle.write("\n")
+        count += 1
+    return count
@@ -0,0 +1,265 @@
+"""
+Decision tables: a rule list over bounded or categorical fields, precomputed.
+
+When every input a rule reads falls into a few classes that the rule cannot
+tell apart, its outcome is a function of those classes alone. The built-in
+rules are like this: rule_age only sees which side of MINIMUM_AGE the age is on,
+rule_verified only whether verified is True, rule_region only whether the region
+is one of RESTRICTED_REGIONS. compile_table runs the real rules once per
+combination of classes and stores the results, so evaluating a record is one
+class lookup per field plus one list index:
+
+    age bucket x verified x region class  ->  Decision (reasons in rule order)
+
+A field's classes are described by a domain:
+    Threshold(field, points)   classes by how many of `value >= point` hold
+    Flag(field)                value is True / anything else
+    Categories(field, values)  each listed value, plus "any other value"
+The built-in rules' domains are known; declare_domains() adds them for other
+rules (it is the caller's promise that the rule reads nothing else and treats
+every value in a class alike). Rules without a domain, or whose domains conflict
+with another rule's on the same field, are not tabulated: the generated
+evaluator calls them as compile_rules would and merges their reasons in order.
+A record whose value cannot be classified (an unhashable region, say) goes
+through compile_rules' evaluator instead.
+
+Like evaluate(), a table evaluator assumes the record is valid.
+"""
+
+from itertools import product
+from typing import Any, Sequence
+
+import policy
+from policy import Evaluator, Rule, compile_rules
+from results import ALLOWED, Decision, reason_code
+
+# Largest number of cells compile_table builds; bigger products fall back.
+MAX_TABLE_SIZE = 65_536
+
+
+class Threshold:
+    """Numeric field whose rules only compare it (with >=) against fixed points."""
+
+    def __init__(self, field: str, points: Sequence[float], default: Any = 0) -> None:
+        self.field = field
+        self.points = tuple(sorted(set(points)))
+        self.default = default
+
+    def merge(self, other: Any) -> "Threshold | None":
+        if type(other) is not Threshold or other.default != self.default:
+            return None
+        return Threshold(self.field, self.points + other.points, self.default)
+
+    def representatives(self) -> list[Any]:
+        # One value per bucket: just below the first point, then each point.
+        if not self.points:
+            return [self.default]
+        return [self.points[0] - 1, *self.points]
+
+    def key_source(self, value: str, names: dict[str, Any]) -> str:
+        return " + ".join(f"({value} >= {point!r})" for point in self.points) or "0"
+
+    def unclassified_source(self, value: str, key: str) -> str | None:
+        # NaN (or any unordered value) is neither >= nor < the first point: its
+        # bucket is unknown, so it is evaluated by the rules themselves.
+        if not self.points:
+            return None
+        return f"not {key} and not {value} < {self.points[0]!r}"
+
+
+class Flag:
+    """Field whose rules only check `value is True`."""
+
+    def __init__(self, field: str) -> None:
+        self.field = field
+        self.default = None
+
+    def merge(self, other: Any) -> "Flag | None":
+        return self if type(other) is Flag else None
+
+    def representatives(self) -> list[Any]:
+        return [False, True]
+
+    def key_source(self, value: str, names: dict[str, Any]) -> str:
+        return f"({value} is True)"
+
+    def unclassified_source(self, value: str, key: str) -> str | None:
+        return None
+
+
+class Categories:
+    """Field whose rules only test it for equality with a fixed set of values."""
+
+    def __init__(self, field: str, values: Sequence[Any], default: Any = "") -> None:
+        self.field = field
+        self.values = tuple(dict.fromkeys(values))
+        self.default = default
+
+    def merge(self, other: Any) -> "Categories | None":
+        if type(other) is not Categories or other.default != self.default:
+            return None
+        return Categories(self.field, self.values + other.values, self.default)
+
+    def representatives(self) -> list[Any]:
+        other = "<other " + self.field + ">"
+        while other in self.values:
+            other += "_"
+        return [*self.values, other]
+
+    def key_source(self, value: str, names: dict[str, Any]) -> str:
+        name = f"INDEX_{len(names)}"
+        names[name] = {category: i for i, category in enumerate(self.values)}
+        return f"{name}.get({value}, {len(self.values)})"
+
+    def unclassified_source(self, value: str, key: str) -> str | None:
+        return None  # unhashable values raise TypeError in the lookup itself
+
+
+Domain = Threshold | Flag | Categories
+
+_declared_domains: dict[Rule, tuple[Domain, ...]] = {}
+
+
+def declare_domains(rule_fn: Rule, *domains: Domain) -> Rule:
+    """Declare the classes of every field rule_fn reads; returns the rule."""
+    _declared_domains[rule_fn] = domains
+    return rule_fn
+
+
+def rule_domains(rule_fn: Rule) -> tuple[Domain, ...] | None:
+    """Declared domains, the built-in rules' (from policy's current constants), or None."""
+    if rule_fn in _declared_domains:
+        return _declared_domains[rule_fn]
+    if rule_fn is policy.rule_age:
+        return (Threshold("age", (policy.MINIMUM_AGE,)),)
+    if rule_fn is policy.rule_verified:
+        return (Flag("verified"),)
+    if rule_fn is policy.rule_region:
+        return (Categories("region", policy.RESTRICTED_REGIONS),)
+    return None
+
+
+def _plan(rule_list: Sequence[Rule], max_size: int) -> tuple[list[int], dict[str, Domain]]:
+    # Positions of the rules to tabulate and the merged domain of each field.
+    tabulated: list[int] = []
+    fields: dict[str, Domain] = {}
+    for position, rule_fn in enumerate(rule_list):
+        try:
+            domains = rule_domains(rule_fn)
+        except TypeError:  # unhashable rule
+            domains = None
+        if not domains:
+            continue
+        merged = dict(fields)
+        for domain in domains:
+            current = merged.get(domain.field)
+            merged[domain.field] = domain if current is None else current.merge(domain)
+        if any(domain is None for domain in merged.values()):
+            continue
+        size = 1
+        for domain in merged.values():
+            size *= len(domain.representatives())
+        if size > max_size:
+            continue
+        fields = merged
+        tabulated.append(position)
+    return tabulated, fields
+
+
+def _tabulate(rule_list: Sequence[Rule], tabulated: list[int],
+              fields: dict[str, Domain]) -> list[tuple[int | None, ...]] | None:
+    # For each cell (row-major over fields), each tabulated rule's failure code or None.
+    cells: list[tuple[int | None, ...]] = []
+    names = list(fields)
+    for values in product(*(domain.representatives() for domain in fields.values())):
+        record = dict(zip(names, values))
+        row: list[int | None] = []
+        for position in tabulated:
+            try:
+                result = rule_list[position](record)
+            except Exception:  # the rule reads something its domains do not cover
+                return None
+            row.append(None if result["passed"] else reason_code(result["reason"]))
+        cells.append(tuple(row))
+    return cells
+
+
+class DecisionTable:
+    """The table for one rule list and the evaluator that uses it."""
+
+    def __init__(self, rule_list: Sequence[Rule], max_size: int = MAX_TABLE_SIZE) -> None:
+        self.rules = tuple(rule_list)
+        tabulated, fields = _plan(self.rules, max_size)
+        cells = _tabulate(self.rules, tabulated, fields) if tabulated else None
+        if cells is None:
+            tabulated, fields, cells = [], {}, []
+        self.tabulated = tabulated
+        self.fields = fields
+        self.size = len(cells)
+        self.evaluate: Evaluator = (self._generate(cells) if tabulated
+                                    else compile_rules(self.rules))
+
+    def _generate(self, cells: list[tuple[int | None, ...]]) -> Evaluator:
+        full = len(self.tabulated) == len(self.rules)
+        names: dict[str, Any] = {
+            "ALLOWED": ALLOWED,
+            "Decision": Decision,
+            "reason_code": reason_code,
+            "fallback": compile_rules(self.rules),
+        }
+        lines = [
+            "def table_evaluate(record):",
+            "    get = record.get",
+            "    try:",
+        ]
+        for axis, domain in enumerate(self.fields.values()):
+            lines.append(f"        v = get({domain.field!r}, {domain.default!r})")
+            lines.append(f"        k = {domain.key_source('v', names)}")
+            unclassified = domain.unclassified_source("v", "k")
+            if unclassified is not None:
+                lines.append(f"        if {unclassified}:")
+                lines.append("            raise TypeError")
+            if axis == 0:
+                lines.append("        i = k")
+            else:
+                lines.append(f"        i = i * {len(domain.representatives())} + k")
+        lines.append("    except TypeError:  # a value that cannot be classified")
+        lines.append("        return fallback(record)")
+        if full:
+            # Every rule is in the table: cells hold the finished Decisions.
+            names["TABLE"] = [Decision(tuple(code for code in row if code is not None))
+                              if any(code is not None for code in row) else ALLOWED
+                              for row in cells]
+            lines.append("    return TABLE[i]")
+        else:
+            names["TABLE"] = cells
+            lines.append("    row = TABLE[i]")
+            lines.append("    codes = []")
+            for position, rule_fn in enumerate(self.rules):
+                if position in self.tabulated:
+                    column = self.tabulated.index(position)
+                    lines.append(f"    if row[{column}] is not None:")
+                    lines.append(f"        codes.append(row[{column}])")
+                else:
+                    names[f"rule_{position}"] = rule_fn
+                    lines.append(f"    result = rule_{position}(record)")
+                    lines.append('    if not result["passed"]:')
+                    lines.append('        codes.append(reason_code(result["reason"]))')
+            lines.append("    if not codes:")
+            lines.append("        return ALLOWED")
+            lines.append("    return Decision(tuple(codes))")
+        exec("\n".join(lines), names)  # pylint: disable=exec-used
+        return names["table_evaluate"]
+
+    def describe(self) -> str:
+        if not self.tabulated:
+            return "no decision table (no rule has a known domain); using compile_rules"
+        axes = " x ".join(f"{field}[{len(domain.representatives())}]"
+                          for field, domain in self.fields.items())
+        return (f"decision table: {axes} = {self.size} cells, "
+                f"{len(self.tabulated)} of {len(self.rules)} rules tabulated")
+
+
+def compile_table(rule_list: Sequence[Rule], max_size: int = MAX_TABLE_SIZE) -> Evaluator:
+    """Evaluator equivalent to compile_rules(rule_list), via a decision table where possible."""
+    return DecisionTable(rule_list, max_size).evaluate
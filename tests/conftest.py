@@ -0,0 +1,8 @@
+"""Put src/ (and benchmarks/, for datagen) on sys.path, as the benchmark scripts do."""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+sys.path.insert(0, os.path.join(ROOT, "src"))
@@ -0,0 +1,47 @@
+import random
+import time
+
+from adaptive import AdaptiveGate
+from policy import DEFAULT_RULES, declare_fields, evaluate, rule_age, rule_region, run_policy
+
+
+def rule_slow_tier(record: dict) -> dict:
+    time.sleep(0)  # costlier than the built-ins
+    return {"passed": record.get("tier") != "blocked", "reason": "tier blocked"}
+
+
+declare_fields(rule_slow_tier, ("tier",))
+
+
+def random_record(rng: random.Random, i: int) -> dict:
+    return {"id": i, "age": rng.choice([12, 17, 30, 60, "x"]),
+            "verified": rng.random() < 0.7, "region": rng.choice(["US", "XX", "YY", "UK"]),
+            "tier": rng.choice(["basic", "gold", "blocked"])}
+
+
+def test_reordered_gate_matches_static_pipeline() -> None:
+    rules = [rule_slow_tier, *DEFAULT_RULES]
+    gate = AdaptiveGate(rules, reorder_every=50, sample_every=2)
+    rng = random.Random(0)
+    records = [random_record(rng, i) for i in range(3_000)]
+    expected = [run_policy(record, rules) for record in records]
+    assert [gate(record) for record in records] == [result == "Allowed" for result in expected]
+    assert gate.reorders > 0 and gate.order() != rules
+    # The gate never touches full evaluation: reasons keep the declared order.
+    assert [run_policy(record, rules) for record in records] == expected
+    assert evaluate(records[0], rules)["reasons"] == \
+        [rule_fn(records[0])["reason"] for rule_fn in rules if not rule_fn(records[0])["passed"]]
+
+
+def test_untimed_rule_does_not_jump_ahead_of_measured_rules() -> None:
+    def rule_never_reached(record: dict) -> dict:
+        return {"passed": True, "reason": None}
+
+    gate = AdaptiveGate([rule_region, rule_age, rule_never_reached],
+                        reorder_every=10_000, sample_every=1)
+    # Every record fails rule_age, so rule_never_reached is never called or timed.
+    for i in range(200):
+        gate({"id": i, "age": 10, "verified": True, "region": "US"})
+    gate.reorder()
+    assert gate.order()[0] is rule_age
+    assert gate.order().index(rule_never_reached) > 0
@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from batch import MISSING, VECTOR_RULES, decide_columns  # noqa: E402
+from policy import DEFAULT_RULES, format_result, rule_age, rule_region, run_policy  # noqa: E402
+from results import reason_text  # noqa: E402
+
+
+def rule_tier(record: dict) -> dict:
+    # Not vectorized: reads a field the columns do not carry.
+    return {"passed": record.get("tier") != "blocked", "reason": "tier blocked"}
+
+
+def random_record(rng: random.Random, i: int) -> dict:
+    record = {"id": i, "tier": rng.choice(["basic", "blocked"])}
+    for field, values in (("age", [17, 18, 30, 40.5, -1, 121, "25", None]),
+                          ("verified", [True, False, 1, "true"]),
+                          ("region", ["US", "XX", "YY", 7])):
+        if rng.random() < 0.95:
+            record[field] = rng.choice(values)
+    return record
+
+
+def batch_results(records: list, rule_list: list) -> list:
+    result = decide_columns([r.get("age", MISSING) for r in records],
+                            [r.get("verified") is True for r in records],
+                            [r.get("region", "") for r in records],
+                            rule_list, records)
+    out = []
+    for i, record in enumerate(records):
+        if not result.valid[i]:
+            out.append(format_result({"valid": False, "reason": reason_text(int(result.codes[i]))}))
+            continue
+        bits = int(result.failures[i])
+        reasons = [reason_text(VECTOR_RULES[rule_fn][1]) if rule_fn in VECTOR_RULES
+                   else rule_fn(record)["reason"]
+                   for bit, rule_fn in enumerate(rule_list) if bits >> bit & 1]
+        assert bool(result.allowed[i]) == (not reasons)
+        out.append(format_result({"allowed": not reasons, "reasons": reasons}))
+    return out
+
+
+@pytest.mark.parametrize("rule_list", [
+    DEFAULT_RULES, [rule_region, rule_age], [], [*DEFAULT_RULES, rule_tier], [rule_tier, rule_age],
+])
+def test_decide_columns_matches_run_policy(rule_list: list) -> None:
+    rng = random.Random(0)
+    records = [random_record(rng, i) for i in range(500)]
+    assert batch_results(records, rule_list) == [run_policy(r, rule_list) for r in records]
@@ -0,0 +1,44 @@
+import os
+import sys
+import types
+
+from bundle import CACHE_DIR_ENV, bundle_key, default_cache_dir, load_evaluator
+from policy import DEFAULT_RULES, rule_age
+
+RECORD = {"id": "a", "age": 30, "verified": True, "region": "US"}
+
+
+def _module_rule(monkeypatch, file: str | None):
+    module = types.ModuleType("bundle_test_rules")
+    if file is not None:
+        module.__file__ = file
+
+    def rule_ok(record: dict) -> dict:
+        return {"passed": True, "reason": None}
+
+    rule_ok.__module__ = module.__name__
+    module.rule_ok = rule_ok
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+    return rule_ok
+
+
+def test_rules_without_a_readable_file_are_not_bundled(monkeypatch, tmp_path) -> None:
+    for file in (None, str(tmp_path / "missing.py")):
+        rule_list = [rule_age, _module_rule(monkeypatch, file)]
+        assert bundle_key(rule_list) is None
+        assert load_evaluator(rule_list, str(tmp_path))(RECORD)["allowed"] is True
+    assert os.listdir(tmp_path) == []
+
+
+def test_cache_dir_from_environment(monkeypatch, tmp_path) -> None:
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path / "env"))
+    assert default_cache_dir() == str(tmp_path / "env")
+    load_evaluator(DEFAULT_RULES)
+    assert [name.endswith(".bundle") for name in os.listdir(tmp_path / "env")] == [True]
+
+    monkeypatch.delenv(CACHE_DIR_ENV)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    assert default_cache_dir() == str(tmp_path / "xdg" / "policy-engine")
+    monkeypatch.delenv("XDG_CACHE_HOME")
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    assert default_cache_dir() == str(tmp_path / "home" / ".cache" / "policy-engine")
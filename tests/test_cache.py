@@ -0,0 +1,43 @@
+from cache import DecisionCache
+from policy import DEFAULT_RULES, rule_age, rule_region, run_policy
+from ruleset import RuleRegistry
+
+
+def user(user_id: str, age=30, verified=True, region="US", **extra) -> dict:
+    return {"id": user_id, "age": age, "verified": verified, "region": region, **extra}
+
+
+def test_hits_share_results_across_ids() -> None:
+    cache = DecisionCache(10)
+    records = [user("a"), user("b"), user("c", tier="gold"), user("d", verified=1),
+               user("e", age=12), user("f", age=12)]
+    assert [cache(r, DEFAULT_RULES) for r in records] == \
+        [run_policy(r, DEFAULT_RULES) for r in records]
+    # b and c match a on every field the rules read; d differs by type (1 vs True).
+    assert (cache.hits, cache.misses, len(cache)) == (3, 3, 3)
+    assert cache({"id": "g", "age": [1]}, DEFAULT_RULES) == "Validation failed: age not a number"
+    assert cache.uncacheable == 1
+
+
+def test_lru_eviction() -> None:
+    cache = DecisionCache(2)
+    cache(user("a", age=20), DEFAULT_RULES)
+    cache(user("b", age=21), DEFAULT_RULES)
+    cache(user("a2", age=20), DEFAULT_RULES)  # hit: age 20 becomes most recent
+    cache(user("c", age=22), DEFAULT_RULES)  # evicts age 21
+    assert (cache.hits, cache.misses, cache.evictions, len(cache)) == (1, 3, 1, 2)
+    cache(user("a3", age=20), DEFAULT_RULES)
+    cache(user("b2", age=21), DEFAULT_RULES)
+    assert (cache.hits, cache.misses, cache.evictions) == (2, 4, 2)
+
+
+def test_rule_set_version_bump_invalidates() -> None:
+    registry = RuleRegistry(DEFAULT_RULES)
+    cache = DecisionCache(10)
+    unverified = user("a", verified=False)
+    assert cache(unverified, registry.current) == "Denied: account not verified"
+    assert cache(unverified, registry.current) == "Denied: account not verified"
+    registry.publish([rule_age, rule_region])
+    assert cache(unverified, registry.current) == "Allowed"
+    assert cache.stats()["rule_set_version"] == 2
+    assert (cache.invalidations, cache.hits, cache.misses, len(cache)) == (1, 1, 2, 1)
@@ -0,0 +1,36 @@
+import io
+
+from cli import handle_add, handle_eval, load_users
+from policy import DEFAULT_RULES, run_policy
+from store import UserStore
+from stream import read_record_chunks
+
+JSONL = "\n".join([
+    '{"id": "a", "age": 30, "verified": "true", "region": "US"}',
+    '{"id": "b", "age": 30, "verified": 1, "region": "US"}',
+    '{"id": "c", "age": "31", "verified": "no", "region": "US"}',
+    '{"id": "d", "age": 30, "verified": true, "region": "US"}',
+    '{"id": "e", "age": "x", "verified": true, "region": "US"}',
+]) + "\n"
+
+
+def test_jsonl_load_coerces_like_add() -> None:
+    loaded = UserStore()
+    count, errors = load_users(read_record_chunks(io.StringIO(JSONL), "jsonl"), loaded)
+    assert count == 4 and errors == ["record 5: age must be a number"]
+
+    added = UserStore()
+    for args in (["a", "30", "true", "US"], ["b", "30", "1", "US"],
+                 ["c", "31", "no", "US"], ["d", "30", "true", "US"]):
+        handle_add(args, added)
+    assert list(loaded) == list(added)
+    assert [type(user["verified"]) for user in loaded] == [bool] * 4
+    assert handle_eval(["b"], loaded, run_policy, DEFAULT_RULES) == "Allowed"
+    assert handle_eval(["c"], loaded, run_policy, DEFAULT_RULES) == "Denied: account not verified"
+
+
+def test_clean_jsonl_chunk_keeps_values() -> None:
+    users = UserStore()
+    line = '{"id": "z", "age": 40.5, "verified": false, "region": "XX"}\n'
+    assert load_users(read_record_chunks(io.StringIO(line), "jsonl"), users) == (1, [])
+    assert users.get("z") == {"id": "z", "age": 40.5, "verified": False, "region": "XX"}
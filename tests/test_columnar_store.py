@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from columnar_store import ColumnarUserStore
+from store import UserStore
+
+
+def user(user_id: str, age=30, verified=True, region="US") -> dict:
+    return {"id": user_id, "age": age, "verified": verified, "region": region}
+
+
+def test_add_get_round_trip_keeps_types() -> None:
+    users = ColumnarUserStore()
+    records = [user("a"), user("b", 17.5, False, "XX"), user("c", 2 ** 60),
+               {"id": 4, "age": 30}, user("e", "30"), {**user("f"), "tier": "gold"}]
+    for record in records:
+        users.add(record)
+    for record in records:
+        got = users.get(record["id"])
+        assert got == record and {k: type(v) for k, v in got.items()} == \
+            {k: type(v) for k, v in record.items()}
+    assert list(users) == records and len(users) == len(records)
+    assert users.get("missing") is None and "missing" not in users and "a" in users
+    with pytest.raises(ValueError):
+        users.add(user("a"))
+    with pytest.raises(ValueError):
+        users.add_many([user("x"), user("x")])
+    assert "x" not in users
+
+
+def test_replace_existing_id() -> None:
+    users = ColumnarUserStore(("region",))
+    users.add_many([user("a"), user("b")])
+    assert users.replace(user("a", 19.5, False, "UK")) == user("a")
+    assert users.get("a") == user("a", 19.5, False, "UK")
+    assert users.replace({"id": "a", "age": "x"}) == user("a", 19.5, False, "UK")
+    assert users.get("a") == {"id": "a", "age": "x"}
+    assert users.replace(user("a")) == {"id": "a", "age": "x"}
+    assert users.get("a") == user("a")
+    assert users.replace(user("c")) is None
+    assert [record["id"] for record in users] == ["a", "b", "c"]
+    assert users.find("region", "US") == [user("a"), user("b"), user("c")]
+
+
+def test_lookups_after_table_growth() -> None:
+    users = ColumnarUserStore()
+    for i in range(5_000):
+        users.add(user(f"u{i}", i % 120))
+    users.add_many([user(f"v{i}") for i in range(5_000)])
+    assert all(users.get(f"u{i}") == user(f"u{i}", i % 120) for i in range(5_000))
+    assert all(f"v{i}" in users for i in range(5_000))
+    assert "u5000" not in users and len(users) == 10_000
+
+
+def test_region_codes_widen_past_one_byte() -> None:
+    users = ColumnarUserStore(("region",))
+    regions = [f"R{i}" for i in range(300)]
+    for i, region in enumerate(regions):
+        users.add(user(str(i), region=region))
+    assert [record["region"] for record in users] == regions
+    assert users.find("region", "R299") == [user("299", region="R299")]
+    assert users.find("region", "R3") == [user("3", region="R3")]
+
+
+def test_non_ascii_ids() -> None:
+    users = ColumnarUserStore()
+    ids = ["é", "日本", "a", "🙂x", "ascii"] + [f"ü{i}" for i in range(100)]
+    users.add_many([user(user_id) for user_id in ids])
+    assert [record["id"] for record in users] == ids
+    assert all(users.get(user_id)["id"] == user_id for user_id in ids)
+    assert "日" not in users
+
+
+def test_matches_user_store_for_the_same_operations() -> None:
+    rng = random.Random(0)
+    plain, columnar = UserStore(("region", "verified")), ColumnarUserStore(("region", "verified"))
+    ids = [f"u{i}" for i in range(300)] + ["é1", "日2"]
+    for _ in range(2_000):
+        record = user(rng.choice(ids), rng.choice([17, 30, 40.5, "x"]),
+                      rng.choice([True, False, 1]), rng.choice(["US", "XX", "é"]))
+        if rng.random() < 0.1:
+            record["tier"] = "gold"
+        for store in (plain, columnar):
+            if record["id"] in store:
+                store.replace(record)
+            else:
+                store.add(record)
+    assert len(plain) == len(columnar)
+    by_id = {record["id"]: record for record in plain}
+    assert {record["id"]: record for record in columnar} == by_id
+    for user_id in ids:
+        assert plain.get(user_id) == columnar.get(user_id)
+    for field, value in (("region", "US"), ("region", "é"), ("verified", True),
+                         ("verified", 1), ("verified", False)):
+        assert sorted(r["id"] for r in plain.find(field, value)) == \
+            sorted(r["id"] for r in columnar.find(field, value))
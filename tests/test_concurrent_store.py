@@ -0,0 +1,48 @@
+import asyncio
+import threading
+
+from concurrent_store import ConcurrentUserStore
+from server import PolicyServer
+from stress_store import run_stress
+
+BATCH = 20
+BATCHES = 2_000
+
+
+def test_stress_store_bounded() -> None:
+    counts = run_stress(writers=2, evaluators=2, listers=2, seconds=0.5)
+    assert counts["adds"] and counts["evals"] and counts["lists"]
+
+
+async def _list_while_writing() -> None:
+    users = ConcurrentUserStore(("region",))
+    server = PolicyServer(users)
+    stop = threading.Event()
+
+    def writer() -> None:
+        for n in range(BATCHES):
+            if stop.is_set():
+                break
+            users.add_many([{"id": f"{n}-{i}", "age": 30, "verified": True, "region": "US",
+                             "batch": n} for i in range(BATCH)])
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        for _ in range(100):
+            response = await server.handle_request({"op": "list", "limit": BATCH * BATCHES})
+            assert response["total"] == len(response["users"])
+            sizes: dict[int, int] = {}
+            for user in response["users"]:
+                sizes[user["batch"]] = sizes.get(user["batch"], 0) + 1
+            assert set(sizes.values()) <= {BATCH}
+    finally:
+        stop.set()
+        thread.join()
+    response = await server.handle_request({"op": "add", "record": {
+        "id": "0-0", "age": 30, "verified": True, "region": "US"}})
+    assert response == {"ok": False, "error": "user already exists: 0-0"}
+
+
+def test_server_lists_one_snapshot_while_another_thread_writes() -> None:
+    asyncio.run(_list_while_writing())
@@ -0,0 +1,70 @@
+import io
+import random
+
+import pytest
+
+from dedup import DedupStats, decide_deduped, write_decisions_deduped
+from output import BulkWriter
+from policy import DEFAULT_RULES, declare_fields, evaluate, rule_age, validate
+from stream import write_decisions
+
+
+def rule_tier(record: dict) -> dict:
+    return {"passed": record.get("tier") != "blocked", "reason": "tier blocked"}
+
+
+def rule_undeclared(record: dict) -> dict:
+    return {"passed": record.get("id") != 7, "reason": "id 7"}
+
+
+declare_fields(rule_tier, ("tier",))
+
+
+def random_records(rng: random.Random, n: int, spread: int) -> list:
+    records = []
+    for i in range(n):
+        record = {"id": i, "age": rng.choice([12, 17, 18, 30, 30.0, "x", [1]][:spread]),
+                  "verified": rng.choice([True, False, 1]), "region": rng.choice(["US", "XX"]),
+                  "tier": rng.choice(["basic", "blocked"])}
+        if rng.random() < 0.05:
+            del record["age"]
+        records.append(record)
+    return records
+
+
+def plain(record: dict, rule_list: list):
+    validation = validate(record)
+    return validation if not validation["valid"] else evaluate(record, rule_list)
+
+
+@pytest.mark.parametrize("rule_list", [
+    DEFAULT_RULES, [*DEFAULT_RULES, rule_tier], [rule_age, rule_undeclared], [],
+])
+@pytest.mark.parametrize("max_classes", [1, 3, 100_000])
+def test_dedup_matches_plain_evaluation(rule_list: list, max_classes: int) -> None:
+    records = random_records(random.Random(max_classes), 2_000, 7)
+    stats = DedupStats()
+    got = list(decide_deduped(records, rule_list, max_classes, stats))
+    assert [record for record, _ in got] == records
+    assert [dict(decision) for _, decision in got] == \
+        [dict(plain(record, rule_list)) for record in records]
+    assert stats.records == len(records)
+    if rule_undeclared in rule_list:
+        assert stats.evaluated == len(records)
+    elif max_classes == 100_000:
+        # Unhashable ages ([1]) are evaluated every time, everything else once per key.
+        unhashable = sum(type(record.get("age")) is list for record in records)
+        assert unhashable <= stats.evaluated < len(records) // 4
+
+
+def test_write_decisions_deduped_matches_write_decisions() -> None:
+    records = random_records(random.Random(1), 1_000, 5)
+    records.insert(10, {"_error": "line 11: invalid json"})
+    for rule_list in (DEFAULT_RULES, [*DEFAULT_RULES, rule_tier]):
+        expected, got = io.StringIO(), io.StringIO()
+        with BulkWriter(expected) as writer:
+            write_decisions(records, rule_list, writer)
+        with BulkWriter(got) as writer:
+            assert write_decisions_deduped(records, rule_list, writer, max_classes=4) == \
+                len(records)
+        assert got.getvalue() == expected.getvalue()
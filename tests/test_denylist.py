@@ -0,0 +1,76 @@
+import pickle
+import random
+import struct
+
+import pytest
+
+from denylist import (
+    _HEADER, MAGIC, VERSION, DenyList, build_denylist, build_denylist_file, key_hash,
+    membership_rule,
+)
+from ruleset import rule_name
+
+KEYS = [f"user-{i}" for i in range(0, 20_000, 3)] + ["é", "日本", ""]
+PROBES = KEYS + [f"user-{i}" for i in range(1, 20_000, 3)] + ["e", "日", "nobody"]
+
+
+@pytest.mark.parametrize("bloom_bits_per_key", [0, 10])
+def test_file_format(tmp_path, bloom_bits_per_key: int) -> None:
+    path = tmp_path / "deny.bin"
+    count = build_denylist(KEYS + KEYS[:10], str(path), bloom_bits_per_key)
+    assert count == len(set(KEYS))
+    data = path.read_bytes()
+    magic, version, stored, bloom_words, bits = _HEADER.unpack_from(data)
+    assert (magic, version, stored) == (MAGIC, VERSION, count)
+    assert bloom_words == (-(-count * bloom_bits_per_key // 64) if bloom_bits_per_key else 0)
+    words = struct.unpack_from(f"={(len(data) - _HEADER.size) // 8}Q", data, _HEADER.size)
+    directory = words[:(1 << bits) + 1]
+    hashes = words[(1 << bits) + 1 + bloom_words:]
+    assert len(hashes) == count and list(hashes) == sorted({key_hash(key) for key in KEYS})
+    assert directory[-1] == count and list(directory) == sorted(directory)
+    for bucket in range(1 << bits):
+        assert all(h >> (64 - bits) == bucket
+                   for h in hashes[directory[bucket]:directory[bucket + 1]])
+
+
+@pytest.mark.parametrize("bloom_bits_per_key", [0, 4, 10])
+def test_lookups_match_a_set(tmp_path, bloom_bits_per_key: int) -> None:
+    path = tmp_path / "deny.bin"
+    build_denylist(KEYS, str(path), bloom_bits_per_key)
+    members = set(KEYS)
+    with DenyList(str(path)) as denylist:
+        assert len(denylist) == len(members)
+        # No false negatives from the Bloom filter: every member is found.
+        assert all(key in denylist for key in KEYS)
+        assert [key in denylist for key in PROBES] == [key in members for key in PROBES]
+        if bloom_bits_per_key:
+            assert denylist.bloom_rejects > 0
+
+
+def test_text_file_rule_and_pickle(tmp_path) -> None:
+    source = tmp_path / "regions.txt"
+    source.write_text("# blocked\nXX\n\n  YY \n")
+    path = tmp_path / "regions.bin"
+    assert build_denylist_file(str(source), str(path), 10) == 2
+    rule = membership_rule("region", DenyList(str(path)), "region denied")
+    assert rule({"region": "XX"}) == {"passed": False, "reason": "region denied"}
+    assert rule({"region": "US"})["passed"] is True and rule({})["passed"] is True
+    clone = pickle.loads(pickle.dumps(rule))
+    assert clone({"region": "YY"})["passed"] is False
+    assert rule_name(rule) == rule_name(clone) == "denylist:deny_region"
+
+
+def test_rejects_other_files(tmp_path) -> None:
+    path = tmp_path / "old.bin"
+    path.write_bytes(_HEADER.pack(MAGIC, VERSION - 1, 0, 0, 0) + bytes(16))
+    with pytest.raises(ValueError):
+        DenyList(str(path))
+
+
+def test_random_keys_no_false_negatives(tmp_path) -> None:
+    rng = random.Random(0)
+    keys = {str(rng.getrandbits(64)) for _ in range(5_000)}
+    path = tmp_path / "deny.bin"
+    build_denylist(keys, str(path), 8)
+    with DenyList(str(path)) as denylist:
+        assert all(key in denylist for key in keys)
@@ -0,0 +1,14 @@
+import pytest
+
+from engine import main
+
+
+@pytest.mark.parametrize("command, flag, value", [
+    ("eval", "--workers", "0"), ("eval", "--workers", "-2"), ("eval", "--workers", "x"),
+    ("eval", "--chunk-size", "0"), ("cli", "--cache-size", "-1"), ("cli", "--cache-size", "1.5"),
+])
+def test_rejects_out_of_range_counts(command: str, flag: str, value: str, capsys) -> None:
+    with pytest.raises(SystemExit) as exit_info:
+        main([command, flag, value])
+    assert exit_info.value.code == 2
+    assert f"argument {flag}:" in capsys.readouterr().err
@@ -0,0 +1,41 @@
+from typing import Any
+
+from bench_incremental import USER_RULES, check_equivalence
+from incremental import ALL_FIELDS, TracingRecord
+
+
+def rule_tier_copy(record: dict[str, Any]) -> dict[str, Any]:
+    # Reads through copy(): depends on every field.
+    copy = record.copy()
+    return {"passed": copy.get("tier") != "gold" or copy.get("age") != 17,
+            "reason": "gold needs 18"}
+
+
+def rule_tier_blocked(record: dict[str, Any]) -> dict[str, Any]:
+    # Reads "tier" through a membership test before indexing.
+    return {"passed": "tier" not in record or record["tier"] != "blocked",
+            "reason": "tier blocked"}
+
+
+def test_incremental_matches_full_reevaluation() -> None:
+    check_equivalence(steps=600, users=40,
+                      user_rules=[*USER_RULES, rule_tier_copy, rule_tier_blocked])
+
+
+def test_tracing_record_notes_every_read() -> None:
+    record = {"id": 1, "age": 30, "region": "US"}
+    reads = {
+        "age": lambda r: r["age"],
+        "tier": lambda r: r.get("tier", "basic"),
+        "region": lambda r: r.pop("region", None),
+        "verified": lambda r: r.setdefault("verified", False),
+    }
+    for field, read in reads.items():
+        traced = TracingRecord(record)
+        read(traced)
+        assert traced.fields_read == {field}
+    for read in (len, dict, repr, lambda r: r.copy(), lambda r: r == record, lambda r: r.popitem()):
+        traced = TracingRecord(record)
+        read(traced)
+        assert ALL_FIELDS in traced.fields_read
+    assert record == {"id": 1, "age": 30, "region": "US"}
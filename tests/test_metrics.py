@@ -0,0 +1,71 @@
+import json
+import random
+
+from metrics import BUCKET_LABELS, PolicyMetrics
+from policy import DEFAULT_RULES, evaluate, run_policy, validate
+from ruleset import rule_name
+from stream import decide_stream
+
+
+def rule_even_id(record: dict) -> dict:
+    return {"passed": record.get("id", 0) % 2 == 0, "reason": "odd id"}
+
+
+RULES = [*DEFAULT_RULES, rule_even_id]
+
+
+def random_records(n: int) -> list:
+    rng = random.Random(0)
+    return [{"id": i, "age": rng.choice([12, 18, 30, "x"]),
+             "verified": rng.choice([True, False]), "region": rng.choice(["US", "XX"])}
+            for i in range(n)]
+
+
+RECORDS = random_records(500)
+
+
+def test_run_policy_with_metrics_matches_plain() -> None:
+    metrics = PolicyMetrics()
+    for record in RECORDS:
+        assert run_policy(record, RULES, metrics) == run_policy(record, RULES)
+        assert metrics.validate(record) == validate(record)
+        if validate(record)["valid"]:
+            assert evaluate(record, RULES, metrics) == evaluate(record, RULES)
+    metrics.reset()
+    assert metrics.to_dict() == {"stages": {}, "rules": {}}
+    assert list(decide_stream(RECORDS, RULES, metrics)) == list(decide_stream(RECORDS, RULES))
+
+
+def test_counters_are_consistent() -> None:
+    metrics = PolicyMetrics()
+    texts = [run_policy(record, RULES, metrics) for record in RECORDS]
+    valid = [record for record in RECORDS if validate(record)["valid"]]
+    stages = metrics.to_dict()["stages"]
+    assert stages["run_policy"]["calls"] == stages["validate"]["calls"] == \
+        stages["format"]["calls"] == len(RECORDS)
+    assert stages["run_policy"]["passed"] == texts.count("Allowed")
+    assert stages["validate"]["passed"] == stages["evaluate"]["calls"] == len(valid)
+    assert stages["evaluate"]["passed"] == texts.count("Allowed")
+    rules = metrics.to_dict()["rules"]
+    assert set(rules) == {rule_name(rule_fn) for rule_fn in RULES}
+    for rule_fn in RULES:
+        counts = rules[rule_name(rule_fn)]
+        assert counts["calls"] == len(valid)
+        assert counts["passed"] == sum(rule_fn(record)["passed"] for record in valid)
+        assert counts["passed"] + counts["failed"] == counts["calls"]
+        assert sum(counts["histogram"].values()) == counts["calls"]
+        assert list(counts["histogram"]) == BUCKET_LABELS
+    assert json.loads(metrics.to_json()) == metrics.to_dict()
+
+
+def test_dump_text_buckets_are_cumulative() -> None:
+    metrics = PolicyMetrics()
+    for record in RECORDS[:50]:
+        run_policy(record, RULES, metrics)
+    lines = dict(line.rsplit(" ", 1) for line in metrics.dump_text().splitlines())
+    label = 'stage="run_policy"'
+    assert lines[f"policy_stage_calls{{{label}}}"] == "50"
+    assert lines[f'policy_stage_latency_bucket{{{label},le="+Inf"}}'] == "50"
+    buckets = [int(lines[f'policy_stage_latency_bucket{{{label},le="{bucket}"}}'])
+               for bucket in BUCKET_LABELS]
+    assert buckets == sorted(buckets)
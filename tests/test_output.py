@@ -0,0 +1,114 @@
+import csv
+import io
+import json
+import random
+
+import pytest
+
+from output import BulkWriter, user_line, write_rows, write_users
+from policy import DEFAULT_RULES, evaluate, format_result, validate
+from stream import decide_stream, write_decisions, write_jsonl
+
+
+def rule_reason_varies(record: dict) -> dict:
+    # A fresh reason text per record: exercises the unmemoized path.
+    return {"passed": len(str(record.get("id"))) % 3 != 0, "reason": f"id {record.get('id')}"}
+
+
+def random_records(n: int) -> list:
+    rng = random.Random(0)
+    records = [{"id": i, "age": rng.choice([12, 18, 30, "x"]),
+                "verified": rng.choice([True, False]), "region": rng.choice(["US", "XX", "EU"])}
+               for i in range(n)]
+    records[5] = {"_error": "line 6: invalid json"}
+    records[7] = {"id": "a,\"b\"", "age": 30, "verified": True, "region": "US"}
+    return records
+
+
+def reference_text(records: list, rule_list: list, fmt: str) -> str:
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    if fmt == "csv":
+        writer.writerow(("id", "allowed", "result"))
+    for record in records:
+        if "_error" in record:
+            record_id, allowed, text = None, False, "Error: " + record["_error"]
+        else:
+            validation = validate(record)
+            decision = validation if not validation["valid"] else evaluate(record, rule_list)
+            record_id, allowed, text = record["id"], decision.get("allowed", False), \
+                format_result(decision)
+        if fmt == "text":
+            print(f"{record_id}\t{text}", file=out)
+        else:
+            writer.writerow((record_id, bool(allowed), text))
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("rule_list", [DEFAULT_RULES, [*DEFAULT_RULES, rule_reason_varies]])
+@pytest.mark.parametrize("chunk_rows", [1, 7, 100_000])
+def test_write_decisions_matches_per_row_output(rule_list: list, chunk_rows: int) -> None:
+    records = random_records(200)
+    expected = io.StringIO()
+    write_jsonl(decide_stream(records, rule_list), expected)
+    got = io.StringIO()
+    with BulkWriter(got, "jsonl", chunk_rows) as writer:
+        assert write_decisions(records, rule_list, writer) == len(records)
+    assert got.getvalue() == expected.getvalue()
+    for fmt in ("text", "csv"):
+        got = io.StringIO()
+        with BulkWriter(got, fmt, chunk_rows) as writer:
+            write_decisions(records, rule_list, writer)
+        assert got.getvalue() == reference_text(records, rule_list, fmt)
+
+
+@pytest.mark.parametrize("fmt", ["text", "jsonl", "csv"])
+def test_write_rows_matches_decide_stream(fmt: str) -> None:
+    records = random_records(50)
+    rows = list(decide_stream(records, DEFAULT_RULES))
+    got = io.StringIO()
+    assert write_rows(rows, got, fmt, chunk_rows=4) == len(rows)
+    if fmt == "jsonl":
+        expected = io.StringIO()
+        write_jsonl(rows, expected)
+        assert got.getvalue() == expected.getvalue()
+    else:
+        assert got.getvalue() == reference_text(records, DEFAULT_RULES, fmt)
+
+
+def test_write_row_first_deny_rows() -> None:
+    got = io.StringIO()
+    write_rows([{"id": 1, "allowed": True}, {"id": 2, "allowed": False}], got, "text")
+    assert got.getvalue() == "1\tAllowed\n2\tDenied\n"
+
+
+USERS = [{"id": i, "age": 20 + i, "verified": i % 2 == 0, "region": "US"} for i in range(25)]
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 10, 25, 100])
+def test_write_users_matches_listing(chunk_rows: int) -> None:
+    got = io.StringIO()
+    assert write_users(USERS, got, "text", chunk_rows) == len(USERS)
+    expected = io.StringIO()
+    for user in USERS:
+        print(user_line(user), file=expected)
+    assert got.getvalue() == expected.getvalue()
+
+    got = io.StringIO()
+    write_users(USERS, got, "jsonl", chunk_rows)
+    assert got.getvalue().splitlines() == [json.dumps(user) for user in USERS]
+
+    got = io.StringIO()
+    write_users(USERS, got, "csv", chunk_rows)
+    assert list(csv.DictReader(io.StringIO(got.getvalue()))) == \
+        [{key: str(value) for key, value in user.items()} for user in USERS]
+
+
+def test_write_users_empty_and_unknown_format() -> None:
+    got = io.StringIO()
+    assert write_users([], got, "text") == 0
+    assert got.getvalue() == ""
+    with pytest.raises(ValueError):
+        write_users(USERS, io.StringIO(), "xml")
+    with pytest.raises(ValueError):
+        BulkWriter(io.StringIO(), "xml")
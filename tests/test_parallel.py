@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from parallel import evaluate_parallel, evaluate_records, iter_chunks, map_chunks
+from policy import DEFAULT_RULES, evaluate, validate
+
+
+def rule_id_not_banned(record: dict) -> dict:
+    return {"passed": record.get("id", 0) % 97 != 0, "reason": "id banned"}
+
+
+RULES = [*DEFAULT_RULES, rule_id_not_banned]
+
+
+def random_records(n: int) -> list:
+    rng = random.Random(n)
+    return [{"id": i, "age": rng.choice([12, 18, 30, "x", None]),
+             "verified": rng.choice([True, False, "yes"]), "region": rng.choice(["US", "XX"])}
+            for i in range(n)]
+
+
+def plain(record: dict) -> dict:
+    validation = validate(record)
+    return dict(validation if not validation["valid"] else evaluate(record, RULES))
+
+
+RECORDS = random_records(301)
+
+
+def test_evaluate_records_matches_plain_evaluation() -> None:
+    assert [dict(result) for result in evaluate_records(RECORDS, RULES)] == \
+        [plain(record) for record in RECORDS]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("chunk_size", [1, len(RECORDS) - 1, len(RECORDS), len(RECORDS) + 1])
+def test_evaluate_parallel_matches_serial(workers: int, chunk_size: int) -> None:
+    records = RECORDS if chunk_size > 1 else RECORDS[:40]
+    expected = evaluate_records(records, RULES)
+    got = evaluate_parallel(iter(records), RULES, workers, chunk_size)
+    assert got == expected
+    assert [dict(result) for result in got] == [dict(result) for result in expected]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_evaluate_parallel_empty_input(workers: int) -> None:
+    assert evaluate_parallel([], RULES, workers, 10) == []
+
+
+def test_invalid_workers_or_chunk_size() -> None:
+    for workers, chunk_size in [(0, 10), (1, 0), (-1, -1)]:
+        with pytest.raises(ValueError):
+            evaluate_parallel(RECORDS, RULES, workers, chunk_size)
+
+
+@pytest.mark.parametrize("n", [0, 1, 9, 10, 11, 30])
+def test_iter_chunks(n: int) -> None:
+    chunks = list(iter_chunks(iter(range(n)), 10))
+    assert [item for chunk in chunks for item in chunk] == list(range(n))
+    assert all(len(chunk) == 10 for chunk in chunks[:-1])
+    assert all(1 <= len(chunk) <= 10 for chunk in chunks)
+
+
+def test_map_chunks_keeps_order_with_many_chunks_in_flight() -> None:
+    assert list(map_chunks(range(1_000), sorted, workers=2, chunk_size=3)) == list(range(1_000))
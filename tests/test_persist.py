@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from persist import LOG_FILE, PersistentUserStore, truncate_torn_tail
+
+USERS = [
+    {"id": "a", "age": 30, "verified": True, "region": "US"},
+    {"id": "b", "age": 17.5, "verified": False, "region": "XX"},
+    {"id": "c", "age": 40, "verified": True, "region": "UK", "tier": "gold"},
+]
+
+
+def _reopen(data_dir, **options) -> PersistentUserStore:
+    return PersistentUserStore(str(data_dir), ("region",), **options)
+
+
+@pytest.mark.parametrize("snapshot_every", [0, 2])
+def test_round_trip(tmp_path, snapshot_every: int) -> None:
+    users = _reopen(tmp_path, snapshot_every=snapshot_every)
+    users.add(USERS[0])
+    users.add_many(USERS[1:])
+    users.replace({**USERS[0], "age": 31})
+    users.close()
+    reloaded = _reopen(tmp_path)
+    assert {user["id"]: user for user in reloaded} == {
+        "a": {**USERS[0], "age": 31}, "b": USERS[1], "c": USERS[2]}
+    assert [user["id"] for user in reloaded.find("region", "UK")] == ["c"]
+    reloaded.close()
+
+
+def _tear_log(data_dir) -> int:
+    # Simulate a crash mid-write: half of one more line, no trailing newline.
+    with open(os.path.join(data_dir, LOG_FILE), "a", encoding="utf-8") as handle:
+        handle.write('{"op": "add", "record": {"id": "torn", "ag')
+    return os.path.getsize(os.path.join(data_dir, LOG_FILE))
+
+
+def test_torn_tail_is_ignored_and_cut(tmp_path) -> None:
+    users = _reopen(tmp_path, snapshot_every=0)
+    users.add_many(USERS)
+    users.close()
+    size = _tear_log(tmp_path)
+    reloaded = _reopen(tmp_path, snapshot_every=0)
+    assert len(reloaded) == 3 and "torn" not in reloaded
+    assert os.path.getsize(tmp_path / LOG_FILE) < size
+    reloaded.close()
+
+
+def test_append_after_recovery_then_reload(tmp_path) -> None:
+    users = _reopen(tmp_path, snapshot_every=0)
+    users.add_many(USERS[:2])
+    users.close()
+    _tear_log(tmp_path)
+    recovered = _reopen(tmp_path, snapshot_every=0)
+    recovered.add(USERS[2])
+    recovered.close()
+    reloaded = _reopen(tmp_path, snapshot_every=0)
+    assert [user["id"] for user in reloaded] == ["a", "b", "c"]
+    reloaded.close()
+
+
+def test_truncate_torn_tail_scans_back_across_blocks(tmp_path) -> None:
+    path = tmp_path / "log"
+    path.write_bytes(b"x\n" + b"y" * 50)
+    assert truncate_torn_tail(str(path), block_size=7) == 50
+    assert path.read_bytes() == b"x\n"
+    path.write_bytes(b"z" * 20)
+    assert truncate_torn_tail(str(path), block_size=7) == 20 and path.read_bytes() == b""
+    assert truncate_torn_tail(str(path)) == 0
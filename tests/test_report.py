@@ -0,0 +1,72 @@
+from collections import Counter
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from policy import DEFAULT_RULES, evaluate, validate  # noqa: E402
+from report import population_report  # noqa: E402
+from ruleset import rule_name  # noqa: E402
+
+
+def rule_country(record: dict) -> dict:
+    # Reads a field the batch columns do not carry.
+    if record.get("country") == "ZZ":
+        return {"passed": False, "reason": "country blocked"}
+    return {"passed": True, "reason": None}
+
+
+def rule_raw_verified(record: dict) -> dict:
+    # Reads the raw verified value, not the `is True` column.
+    return {"passed": record.get("verified") != "pending", "reason": "verification pending"}
+
+
+USERS = [
+    {"id": "a", "age": 30, "verified": True, "region": "US", "country": "ZZ"},
+    {"id": "b", "age": 30, "verified": True, "region": "US", "country": "US"},
+    {"id": "c", "age": 12, "verified": "pending", "region": "XX"},
+    {"id": "d", "age": "x", "verified": True, "region": "US", "country": "ZZ"},
+    {"id": 5, "age": 40.5, "verified": False, "region": 7},
+]
+
+
+def expected_counts(records: list, rule_list: list) -> dict:
+    allowed = denied = invalid = 0
+    reasons: Counter = Counter()
+    for record in records:
+        validation = validate(record)
+        if not validation["valid"]:
+            invalid += 1
+            reasons[validation["reason"]] += 1
+            continue
+        decision = evaluate(record, rule_list)
+        if decision["allowed"]:
+            allowed += 1
+        else:
+            denied += 1
+            reasons.update(decision["reasons"])
+    return {"users": len(records), "allowed": allowed, "denied": denied, "invalid": invalid,
+            "reasons": dict(reasons)}
+
+
+@pytest.mark.parametrize("rule_list", [
+    DEFAULT_RULES,
+    [rule_country],
+    [*DEFAULT_RULES, rule_country, rule_raw_verified],
+])
+def test_report_matches_evaluate_for_rules_outside_the_columns(rule_list: list) -> None:
+    for chunk_rows in (1, 2, 1000):
+        got = population_report(USERS, rule_list, chunk_rows=chunk_rows).to_dict()
+        expected = expected_counts(USERS, rule_list)
+        # Non-vector rules are labelled by name; map them back to their reason text.
+        reasons = {{rule_name(rule_country): "country blocked",
+                    rule_name(rule_raw_verified): "verification pending"}.get(label, label): count
+                   for label, count in got["reasons"].items()}
+        assert {key: got[key] for key in ("users", "allowed", "denied", "invalid")} == \
+            {key: expected[key] for key in ("users", "allowed", "denied", "invalid")}
+        assert reasons == expected["reasons"]
+
+
+def test_report_denies_blocked_country() -> None:
+    report = population_report(USERS[:2], [rule_country]).to_dict()
+    assert report["allowed"] == 1 and report["denied"] == 1
@@ -0,0 +1,55 @@
+import copy
+import pickle
+from functools import partial
+
+import pytest
+
+from policy import compile_rules, evaluate
+from results import ALLOWED, PASSED, VALID, Decision, failed, invalid, reason_code
+
+
+@pytest.mark.parametrize("result, attr, value", [
+    (PASSED, "passed", False), (PASSED, "code", 3),
+    (VALID, "valid", False), (ALLOWED, "codes", (3,)),
+    (failed(3), "passed", True), (invalid(0), "valid", True), (Decision((4,)), "codes", ()),
+    (ALLOWED, "extra", 1),
+])
+def test_results_are_immutable(result, attr: str, value: object) -> None:
+    before = dict(result)
+    with pytest.raises(AttributeError):
+        setattr(result, attr, value)
+    if hasattr(result, attr):
+        with pytest.raises(AttributeError):
+            delattr(result, attr)
+    assert dict(result) == before
+
+
+def test_shared_results_read_as_dicts() -> None:
+    assert PASSED == {"passed": True, "reason": None}
+    assert VALID == {"valid": True}
+    assert ALLOWED == {"allowed": True, "reasons": []}
+    assert failed(reason_code("region restricted")) == {"passed": False,
+                                                        "reason": "region restricted"}
+
+
+@pytest.mark.parametrize("result", [
+    PASSED, VALID, ALLOWED, failed(3), invalid(0), Decision((4, 5)),
+])
+def test_results_pickle_and_copy(result) -> None:
+    for clone in (pickle.loads(pickle.dumps(result)), copy.copy(result), copy.deepcopy(result)):
+        assert type(clone) is type(result) and clone == result
+
+
+def rule_list_reason(record: dict) -> dict:
+    return {"passed": False, "reason": ["age", "region"]}
+
+
+def test_unhashable_reason_is_a_value_error() -> None:
+    with pytest.raises(ValueError, match="hashable.*list"):
+        reason_code(["age", "region"])
+    record = {"id": "a", "age": 30, "verified": True, "region": "US"}
+    for evaluate_fn in (partial(evaluate, rule_list=[rule_list_reason]),
+                        compile_rules([rule_list_reason])):
+        with pytest.raises(ValueError, match="rule reason must be hashable"):
+            evaluate_fn(record)
+    assert reason_code(("age", "region")) == reason_code(("age", "region"))
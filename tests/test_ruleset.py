@@ -0,0 +1,134 @@
+import importlib
+import sys
+import threading
+
+import pytest
+
+import batch
+import metrics
+import policy
+import report
+from policy import COMPILED_CACHE_SIZE, compile_rules, install_evaluator, rule_age, run_policy
+from cli import handle_rules
+from ruleset import RuleRegistry, resolve_rule, rule_name
+
+RULE_SOURCE = '''
+from policy import declare_fields
+
+
+def rule_min_age(record):
+    return {{"passed": record.get("age", 0) >= {limit}, "reason": "under {limit}"}}
+
+
+def rule_undeclared(record):
+    return {{"passed": True, "reason": None}}
+
+
+declare_fields(rule_min_age, ("age",))
+'''
+
+
+def test_reload_keeps_policy_and_its_tables(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path / "reload_rules.py").write_text(RULE_SOURCE.format(limit=21))
+    importlib.invalidate_caches()
+    registry = RuleRegistry()
+    registry.use(["rule_age", "reload_rules:rule_min_age"])
+    record = {"id": "a", "age": 25, "verified": True, "region": "US"}
+    assert run_policy(record, registry.current) == "Allowed"
+
+    fields, inline, vector = policy.RULE_FIELDS, policy.INLINE_RULES, batch.VECTOR_RULES
+    (tmp_path / "reload_rules.py").write_text(RULE_SOURCE.format(limit=30))
+    rule_set = registry.reload()
+    try:
+        assert rule_set.version == 3
+        assert run_policy(record, rule_set) == "Denied: under 30"
+        assert rule_set[0] is rule_age is policy.rule_age
+        assert policy.RULE_FIELDS is fields and policy.INLINE_RULES is inline
+        assert rule_age in batch.VECTOR_RULES and batch.VECTOR_RULES is vector
+    finally:
+        sys.modules.pop("reload_rules", None)
+
+
+def test_compiled_cache_is_bounded_and_keeps_installed() -> None:
+    def installed(record: dict) -> dict:
+        return {"passed": True, "reason": None}
+
+    install_evaluator([installed], policy._generate_evaluator([installed]))
+    pinned = compile_rules([installed])
+    for limit in range(COMPILED_CACHE_SIZE + 10):
+        def rule(record: dict, limit: int = limit) -> dict:
+            return {"passed": record["age"] >= limit, "reason": "too young"}
+        compile_rules([rule_age, rule])
+    assert len(policy._compiled_cache) <= COMPILED_CACHE_SIZE
+    assert compile_rules([installed]) is pinned
+
+
+def test_compile_rules_from_many_threads(monkeypatch) -> None:
+    # Eviction iterates the cache: it must hold the lock that inserts take.
+    evict = policy._evict_oldest
+    evictions_unlocked: list[int] = []
+
+    def checked_evict(cache: dict, keep: set) -> None:
+        if not policy._compiled_lock.locked():
+            evictions_unlocked.append(len(cache))
+        evict(cache, keep)
+
+    monkeypatch.setattr(policy, "_compiled_cache", {})
+    monkeypatch.setattr(policy, "_installed", set())
+    monkeypatch.setattr(policy, "_evict_oldest", checked_evict)
+    errors: list[BaseException] = []
+
+    def compile_many(start: int) -> None:
+        try:
+            for limit in range(start, start + COMPILED_CACHE_SIZE):
+                def rule(record: dict, limit: int = limit) -> dict:
+                    return {"passed": record["age"] >= limit, "reason": "too young"}
+                compile_rules([rule_age, rule])
+        except Exception as exc:  # noqa: BLE001 - reported below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=compile_many, args=(n * 1_000,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == [] and evictions_unlocked == []
+    assert len(policy._compiled_cache) == COMPILED_CACHE_SIZE
+
+
+def test_one_rule_name() -> None:
+    assert metrics.rule_name is report.rule_name is rule_name
+    assert rule_name(rule_age) == "rule_age"
+    assert rule_name(test_one_rule_name) == "test_ruleset:test_one_rule_name"
+
+
+@pytest.mark.parametrize("name", ["sys:exit", "os:_exit", "builtins:print", "validate",
+                                  "run_policy", "policy:nope", "reload_rules:rule_undeclared"])
+def test_only_declared_rules_resolve(name: str, tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path / "reload_rules.py").write_text(RULE_SOURCE.format(limit=21))
+    importlib.invalidate_caches()
+    try:
+        with pytest.raises(ValueError, match="no such rule"):
+            resolve_rule(name)
+        assert resolve_rule("reload_rules:rule_min_age")({"age": 30})["passed"] is True
+    finally:
+        sys.modules.pop("reload_rules", None)
+
+
+def test_broken_rule_module_is_a_value_error(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path / "broken_rules.py").write_text("def rule_x(record:\n")
+    (tmp_path / "raising_rules.py").write_text("raise RuntimeError('boom')\n")
+    importlib.invalidate_caches()
+    registry = RuleRegistry()
+    for module in ("broken_rules", "raising_rules"):
+        with pytest.raises(ValueError, match="cannot import " + module):
+            resolve_rule(module + ":rule_x")
+        assert handle_rules(["use", module + ":rule_x"], registry).startswith(
+            "cannot import " + module)
+    assert registry.current.version == 1
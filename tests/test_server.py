@@ -0,0 +1,146 @@
+import asyncio
+import json
+
+from policy import DEFAULT_RULES
+from server import PolicyServer
+from store import UserStore
+
+
+def rule_raises(record: dict) -> dict:
+    raise RuntimeError("broken rule")
+
+
+async def _evals_after_broken_rule() -> list:
+    users = UserStore()
+    for user_id in ("a", "b"):
+        users.add({"id": user_id, "age": 30, "verified": True, "region": "US"})
+    server = PolicyServer(users, batch_window=0.001)
+    servers = await server.start(port=0, host="127.0.0.1")
+    try:
+        responses = [await server.handle_request({"op": "eval", "user_id": "a"})]
+        server.registry.publish([*DEFAULT_RULES, rule_raises])
+        responses += await asyncio.wait_for(asyncio.gather(
+            server.handle_request({"op": "eval", "user_id": "a"}),
+            server.handle_request({"op": "eval", "user_id": "b"}),
+        ), timeout=5)
+        assert server._batcher is not None and not server._batcher.done()
+        server.registry.publish(DEFAULT_RULES)
+        responses.append(await asyncio.wait_for(
+            server.handle_request({"op": "eval", "user_id": "b"}), timeout=5))
+        assert server.stats()["eval_errors"] == 2
+        return responses
+    finally:
+        for listener in servers:
+            listener.close()
+        assert server._batcher is not None
+        server._batcher.cancel()
+
+
+def test_raising_rule_fails_only_its_evals() -> None:
+    first, broken_a, broken_b, last = asyncio.run(_evals_after_broken_rule())
+    assert first == {"ok": True, "result": "Allowed", "rules_version": 1}
+    for response in (broken_a, broken_b):
+        assert response["ok"] is False and "broken rule" in response["error"]
+        assert response["rules_version"] == 2
+    assert last == {"ok": True, "result": "Allowed", "rules_version": 3}
+
+
+def rule_exits(record: dict) -> dict:
+    raise SystemExit(3)
+
+
+async def _serve_after_bad_requests() -> list:
+    users = UserStore()
+    users.add({"id": "a", "age": 30, "verified": True, "region": "US"})
+    server = PolicyServer(users, batch_window=0.001)
+    servers = await server.start(port=0, host="127.0.0.1")
+    try:
+        responses = [await server.handle_request({"op": "rules", "use": ["sys:exit"]})]
+        server.registry.publish([rule_exits])
+        responses.append(await asyncio.wait_for(
+            server.handle_request({"op": "eval", "user_id": "a"}), timeout=5))
+        server.registry.publish(DEFAULT_RULES)
+        responses.append(await asyncio.wait_for(
+            server.handle_request({"op": "eval", "user_id": "a"}), timeout=5))
+        return responses
+    finally:
+        for listener in servers:
+            listener.close()
+        assert server._batcher is not None
+        server._batcher.cancel()
+
+
+def test_undeclared_rules_and_exiting_rules_do_not_stop_the_server() -> None:
+    rejected, exited, last = asyncio.run(_serve_after_bad_requests())
+    assert rejected == {"ok": False, "error": "no such rule: sys:exit"}
+    assert exited["ok"] is False and "SystemExit" in exited["error"]
+    assert last == {"ok": True, "result": "Allowed", "rules_version": 3}
+
+
+async def _add_requests() -> list:
+    users = UserStore()
+    server = PolicyServer(users)
+    responses = [await server.handle_request({"op": "add", "record": record}) for record in (
+        {"id": "a", "age": "25", "verified": "true", "region": "US"},
+        {"id": 7, "age": 40.5, "verified": 1, "region": "US"},
+        {"id": "b", "age": 30, "verified": "no", "region": "US"},
+        {"id": "c", "age": "old", "verified": True, "region": "US"},
+        {"id": "d", "age": True, "verified": True, "region": "US"},
+        {"id": "e", "age": 30},
+        {"id": "a", "age": 30, "verified": True, "region": "US"},
+    )]
+    return [responses, list(users)]
+
+
+def test_add_validates_and_coerces_like_the_cli() -> None:
+    responses, stored = asyncio.run(_add_requests())
+    assert responses == [
+        {"ok": True, "result": "added a"},
+        {"ok": True, "result": "added 7"},
+        {"ok": True, "result": "added b"},
+        {"ok": False, "error": "invalid record: age must be a number"},
+        {"ok": False, "error": "invalid record: age must be a number"},
+        {"ok": False, "error": "invalid record: missing verified, region"},
+        {"ok": False, "error": "user already exists: a"},
+    ]
+    assert stored == [
+        {"id": "a", "age": 25, "verified": True, "region": "US"},
+        {"id": "7", "age": 40.5, "verified": True, "region": "US"},
+        {"id": "b", "age": 30, "verified": False, "region": "US"},
+    ]
+
+
+async def _overlong_line() -> tuple:
+    users = UserStore()
+    users.add({"id": "a", "age": 30, "verified": True, "region": "US"})
+    server = PolicyServer(users, batch_window=0.001)
+    servers = await server.start(port=0, host="127.0.0.1")
+    try:
+        port = servers[0].sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b'{"id": 1, "op": "eval", "user_id": "a"}\n')
+        writer.write(b'{"id": 2, "op": "eval", "user_id": "' + b"x" * 100_000 + b'"}\n')
+        writer.write(b'{"id": 3, "op": "eval", "user_id": "a"}\n')
+        await writer.drain()
+        lines = await asyncio.wait_for(reader.read(), timeout=5)
+        writer.close()
+        # The server still answers new connections.
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b'{"id": 4, "op": "eval", "user_id": "a"}\n')
+        after = await asyncio.wait_for(reader.readline(), timeout=5)
+        writer.close()
+        return lines, after
+    finally:
+        for listener in servers:
+            listener.close()
+        assert server._batcher is not None
+        server._batcher.cancel()
+
+
+def test_overlong_request_line_gets_an_error_response() -> None:
+    lines, after = asyncio.run(_overlong_line())
+    assert [json.loads(line) for line in lines.splitlines()] == [
+        {"ok": True, "result": "Allowed", "rules_version": 1, "id": 1},
+        {"ok": False, "error": "request line too long", "id": None},
+    ]
+    assert json.loads(after) == {"ok": True, "result": "Allowed", "rules_version": 1, "id": 4}
@@ -0,0 +1,92 @@
+import io
+import json
+
+import shadow as shadow_module
+from cli import run_session
+from output import BulkWriter
+from policy import (
+    DEFAULT_RULES, declare_fields, format_result, rule_age, rule_region, run_policy,
+)
+from shadow import Shadow, write_decisions_shadow
+from store import UserStore
+from stream import write_decisions
+
+
+def rule_kyc(record: dict) -> dict:
+    return {"passed": record.get("region") != "CA" or record.get("age", 0) >= 21,
+            "reason": "kyc incomplete"}
+
+
+declare_fields(rule_kyc, ("age", "region"))
+# Drops rule_verified (deny -> allow for unverified users), adds rule_kyc (allow -> deny).
+CANDIDATE = [rule_age, rule_region, rule_kyc]
+RECORDS = [
+    {"id": "ok", "age": 30, "verified": True, "region": "US"},
+    {"id": "kyc", "age": 19, "verified": True, "region": "CA"},
+    {"id": "unverified", "age": 30, "verified": False, "region": "US"},
+    {"id": "both", "age": 19, "verified": False, "region": "CA"},
+    {"id": "young", "age": 12, "verified": True, "region": "US"},
+    {"id": "invalid", "age": "x", "verified": True, "region": "CA"},
+    {"id": "missing", "verified": False},
+]
+
+
+def test_counts_diffs_and_summary() -> None:
+    diffs: list = []
+    shadow = Shadow(DEFAULT_RULES, CANDIDATE, diffs.append)
+    results = [shadow.decide(record) for record in RECORDS]
+    assert [format_result(result) for result in results] == \
+        [run_policy(record, DEFAULT_RULES) for record in RECORDS]
+    summary = shadow.summary.to_dict()
+    assert (summary["records"], summary["invalid"], summary["changed"]) == (7, 2, 3)
+    assert (summary["allow_to_deny"], summary["deny_to_allow"]) == (1, 1)
+    assert summary["reasons_added"] == {"kyc incomplete": 2}
+    assert summary["reasons_removed"] == {"account not verified": 2}
+    assert diffs == [
+        {"id": "kyc", "allowed": True, "candidate_allowed": False,
+         "added": ["kyc incomplete"], "removed": []},
+        {"id": "unverified", "allowed": False, "candidate_allowed": True,
+         "added": [], "removed": ["account not verified"]},
+        {"id": "both", "allowed": False, "candidate_allowed": False,
+         "added": ["kyc incomplete"], "removed": ["account not verified"]},
+    ]
+    assert shadow.summary.dump_text().splitlines()[0] == \
+        "shadow: 7 records, 3 changed (1 allow->deny, 1 deny->allow), 4 unchanged (2 invalid)"
+
+
+def test_primary_decisions_are_unchanged() -> None:
+    shadow = Shadow(DEFAULT_RULES, CANDIDATE)
+    assert [shadow.run_policy(r, DEFAULT_RULES) for r in RECORDS] == \
+        [run_policy(r, DEFAULT_RULES) for r in RECORDS]
+    stream = [*RECORDS, {"_error": "line 8: invalid json"}]
+    expected, got = io.StringIO(), io.StringIO()
+    with BulkWriter(expected) as writer:
+        write_decisions(stream, DEFAULT_RULES, writer)
+    with BulkWriter(got) as writer:
+        write_decisions_shadow(stream, Shadow(DEFAULT_RULES, CANDIDATE), writer)
+    assert got.getvalue() == expected.getvalue()
+    assert len(got.getvalue().splitlines()) == len(stream)
+    assert json.loads(got.getvalue().splitlines()[-1]) == {"id": None,
+                                                           "error": "line 8: invalid json"}
+
+
+def test_cli_session_compiles_each_rule_set_once(monkeypatch) -> None:
+    calls = []
+    compile_shadow = shadow_module.compile_shadow
+
+    def counting(primary, candidate):
+        calls.append(tuple(primary))
+        return compile_shadow(primary, candidate)
+
+    monkeypatch.setattr(shadow_module, "compile_shadow", counting)
+    shadow = Shadow(DEFAULT_RULES, CANDIDATE)
+    users = UserStore()
+    for record in RECORDS:
+        users.add(record)
+    lines = [f"eval {record['id']}" for record in RECORDS] * 3
+    outputs = run_session([*lines, "rules use rule_age", *lines[:3]], users, DEFAULT_RULES,
+                          shadow.run_policy)
+    assert outputs[:7] == [run_policy(record, DEFAULT_RULES) for record in RECORDS]
+    # Once in __init__, once for the session's RuleSet, once after the swap.
+    assert calls == [tuple(DEFAULT_RULES), tuple(DEFAULT_RULES), (rule_age,)]
+    assert shadow.summary.records == 3 * len(RECORDS) + 3
@@ -0,0 +1,113 @@
+import random
+
+import pytest
+
+from concurrent_store import ConcurrentUserStore
+from store import UserStore
+
+FIELDS = ("region", "verified")
+
+
+class ListStore:
+    """Naive reference: a list of records, searched linearly."""
+
+    def __init__(self) -> None:
+        self.records: list[dict] = []
+        self.written: dict[str, int] = {}  # id -> when it was last added/replaced
+        self.writes = 0
+
+    def _position(self, user_id: object) -> int | None:
+        for i, record in enumerate(self.records):
+            if str(record["id"]) == str(user_id):
+                return i
+        return None
+
+    def _write(self, record: dict) -> None:
+        self.writes += 1
+        self.written[str(record["id"])] = self.writes
+
+    def add(self, record: dict) -> None:
+        if self._position(record["id"]) is not None:
+            raise ValueError
+        self.records.append(record)
+        self._write(record)
+
+    def add_many(self, records: list) -> None:
+        keys = [str(record["id"]) for record in records]
+        if len(set(keys)) != len(keys) or any(self._position(key) is not None for key in keys):
+            raise ValueError
+        for record in records:
+            self.add(record)
+
+    def replace(self, record: dict) -> dict | None:
+        position = self._position(record["id"])
+        self._write(record)
+        if position is None:
+            self.records.append(record)
+            return None
+        old, self.records[position] = self.records[position], record
+        return old
+
+    def get(self, user_id: object) -> dict | None:
+        position = self._position(user_id)
+        return None if position is None else self.records[position]
+
+    def find(self, field: str, value: object) -> list:
+        matches = [record for record in self.records if record.get(field) == value]
+        return sorted(matches, key=lambda record: self.written[str(record["id"])])
+
+
+def random_user(rng: random.Random) -> dict:
+    user_id = rng.randrange(60)
+    user = {"id": rng.choice([user_id, str(user_id)]), "age": rng.randrange(10, 90),
+            "verified": rng.choice([True, False]), "region": rng.choice(["US", "EU", "XX"])}
+    if rng.random() < 0.1:
+        del user["region"]
+    return user
+
+
+@pytest.mark.parametrize("store_class", [UserStore, ConcurrentUserStore])
+@pytest.mark.parametrize("seed", range(5))
+def test_store_matches_list_reference(store_class: type, seed: int) -> None:
+    rng = random.Random(seed)
+    store, reference = store_class(FIELDS), ListStore()
+    for _ in range(400):
+        op = rng.choice(["add", "add_many", "replace"])
+        if op == "add_many":
+            args: tuple = ([random_user(rng) for _ in range(rng.randrange(4))],)
+        else:
+            args = (random_user(rng),)
+        outcomes = []
+        for target in (store, reference):
+            try:
+                outcomes.append(("ok", getattr(target, op)(*args)))
+            except ValueError:
+                outcomes.append(("error", None))
+        assert outcomes[0] == outcomes[1]
+
+        assert len(store) == len(reference.records)
+        assert list(store) == reference.records
+        probe = rng.randrange(70)
+        assert store.get(probe) == reference.get(probe)
+        assert store.get(str(probe)) == reference.get(probe)
+        assert (probe in store) == (reference.get(probe) is not None)
+        for field in FIELDS:
+            for value in ("US", "EU", "XX", None, True, False):
+                assert store.find(field, value) == reference.find(field, value)
+
+
+def test_find_without_index_raises() -> None:
+    store = UserStore(("region",))
+    store.add({"id": 1, "region": "US"})
+    with pytest.raises(KeyError):
+        store.find("age", 30)
+
+
+def test_add_many_duplicates_add_nothing() -> None:
+    store = UserStore(FIELDS)
+    store.add({"id": 1, "region": "US", "verified": True})
+    for batch in ([{"id": 2}, {"id": "2"}], [{"id": 3}, {"id": "1"}]):
+        with pytest.raises(ValueError):
+            store.add_many(batch)
+    assert [user["id"] for user in store] == [1]
+    assert store.find("region", None) == []
@@ -0,0 +1,73 @@
+from itertools import product
+
+import pytest
+
+from policy import (
+    DEFAULT_RULES, compile_rules, evaluate, rule_age, rule_region, rule_verified, validate,
+)
+from table import Categories, DecisionTable, Flag, Threshold, declare_domains
+
+
+def rule_senior_gold(record: dict) -> dict:
+    # Declared domains: tabulated alongside the built-ins.
+    return {"passed": record.get("age", 0) >= 65 or record.get("tier", "basic") != "gold",
+            "reason": "gold is for seniors"}
+
+
+def rule_trusted(record: dict) -> dict:
+    return {"passed": record.get("trusted", False) is True, "reason": "not trusted"}
+
+
+def rule_tier_length(record: dict) -> dict:
+    # No domain: called by the table evaluator like compile_rules would.
+    return {"passed": len(str(record.get("tier", ""))) < 6, "reason": "tier name too long"}
+
+
+declare_domains(rule_senior_gold, Threshold("age", (65,)), Categories("tier", ("gold",), "basic"))
+declare_domains(rule_trusted, Flag("trusted"))
+
+AGES = [0, 17, 17.999, 18, 18.0, 64, 65, 65.5, 120, float("nan")]
+VERIFIED = [True, False, 1, "true", None, [1]]
+REGIONS = ["US", "XX", "YY", "xx", "", 7, ["XX"]]
+TIERS = ["gold", "basic", "platinum", None, ["gold"]]
+TRUSTED = [True, False, 1]
+
+RULE_LISTS = [
+    DEFAULT_RULES,
+    [rule_region, rule_verified, rule_age],
+    [rule_age],
+    [*DEFAULT_RULES, rule_senior_gold],
+    [rule_senior_gold, rule_trusted, rule_verified],
+    [rule_tier_length, *DEFAULT_RULES, rule_senior_gold],
+    [rule_tier_length],
+    [],
+]
+
+
+def records():
+    for age, verified, region, tier, trusted in product(AGES, VERIFIED, REGIONS, TIERS, TRUSTED):
+        yield {"id": 1, "age": age, "verified": verified, "region": region, "tier": tier,
+               "trusted": trusted}
+    yield {"id": 2, "age": 30}
+
+
+@pytest.mark.parametrize("rule_list", RULE_LISTS)
+def test_table_matches_pipeline_on_every_combination(rule_list: list) -> None:
+    table = DecisionTable(rule_list)
+    compiled = compile_rules(rule_list)
+    for record in records():
+        if not validate(record)["valid"]:
+            continue
+        expected = evaluate(record, rule_list)
+        got = table.evaluate(record)
+        assert got == expected and got == compiled(record), record
+
+
+def test_table_size_limit_falls_back() -> None:
+    rules = [*DEFAULT_RULES, rule_senior_gold, rule_trusted]
+    assert DecisionTable(rules).tabulated == [0, 1, 2, 3, 4]
+    small = DecisionTable(rules, max_size=4)
+    assert len(small.tabulated) < len(rules)
+    for record in records():
+        if validate(record)["valid"]:
+            assert small.evaluate(record) == evaluate(record, rules)